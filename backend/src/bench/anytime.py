@@ -0,0 +1,105 @@
+# src/bench/anytime.py
+"""
+Anytime (early-exit) forest inference vs. the full forest, single rows
+through ModelServer.predict_from_feature_dict, on every dataset row.
+
+Modes:
+- full:        all trees
+- decisive:    stop once the top class can no longer change
+               (label always equals the full forest)
+- margin=M:    also stop once (top - second) / trees >= M
+
+Reports mean / p50 / p99 latency, mean trees used and label agreement
+with the full forest, for single rows (CompiledForest called directly)
+and for the whole dataset scored as batches through predict_matrix.
+
+Single rows are dominated by the per-depth-level numpy dispatch of the
+compiled forest, not by the number of trees, so early exit is slower
+there: ModelServer only applies it to batches (micro-batches,
+/predict_batch) and single rows always take the full traversal.
+
+Usage (from backend/):
+python -m src.bench.anytime
+python -m src.bench.anytime --margins 0.3 0.5 0.7 --chunk 32 --repeat 3
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.realtime.infer import ModelServer
+
+
+def run(server, X, repeat):
+    forest = server.forest
+    lat, preds, trees = [], [], []
+    for _ in range(repeat):
+        for i in range(len(X)):
+            x = X[i:i + 1]
+            t0 = time.perf_counter()
+            if server.anytime:
+                proba, used = forest.predict_proba_anytime(
+                    x, chunk=server.anytime_chunk, margin=server.anytime_margin
+                )
+                used = int(used[0])
+            else:
+                proba, used = forest.predict_proba(x), forest.n_trees
+            lat.append(time.perf_counter() - t0)
+            preds.append(int(np.argmax(proba[0])))
+            trees.append(used)
+    return np.array(lat) * 1e3, np.array(preds), np.array(trees)
+
+
+def main(args):
+    df = pd.read_csv(args.data).fillna(0.0)
+    rows = df.drop(columns=["label"], errors="ignore").to_dict("records")
+
+    modes = [("full", {}), ("decisive", {"anytime": True})]
+    modes += [
+        (f"margin={m}", {"anytime": True, "anytime_margin": m})
+        for m in args.margins
+    ]
+
+    servers = {}
+    for name, opts in modes:
+        servers[name] = ModelServer(model_path=args.model, anytime_chunk=args.chunk, **opts)
+        servers[name].warmup()
+
+    X = servers["full"].rows_to_matrix(rows)
+    full_preds = None
+    print("Single rows (not used by ModelServer with anytime: for reference)")
+    print(f"{'mode':<14s} {'mean ms':>8s} {'p50 ms':>8s} {'p99 ms':>8s} {'trees':>7s} {'agree':>8s}")
+    for name, server in servers.items():
+        lat, preds, trees = run(server, X, args.repeat)
+        if full_preds is None:
+            full_preds = preds
+        agree = (preds == full_preds).mean() * 100
+        print(f"{name:<14s} {lat.mean():8.3f} {np.percentile(lat, 50):8.3f} "
+              f"{np.percentile(lat, 99):8.3f} {trees.mean():7.1f} {agree:7.2f}%")
+
+    full_batch = servers["full"].predict_matrix(X)[0]
+    print(f"\nBatches of {args.batch} rows (whole dataset)")
+    print(f"{'mode':<14s} {'total ms':>9s} {'agree':>8s}")
+    for name, server in servers.items():
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            preds = np.concatenate([
+                server.predict_matrix(X[i:i + args.batch])[0]
+                for i in range(0, len(X), args.batch)
+            ])
+        total = (time.perf_counter() - t0) / args.repeat * 1e3
+        agree = (preds == full_batch).mean() * 100
+        print(f"{name:<14s} {total:9.2f} {agree:7.2f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="models/rf_baseline.joblib")
+    parser.add_argument("--data", default="dataset/final_dataset.csv")
+    parser.add_argument("--margins", type=float, nargs="+", default=[0.3, 0.5, 0.7])
+    parser.add_argument("--chunk", type=int, default=32)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args)
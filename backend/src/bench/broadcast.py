@@ -0,0 +1,165 @@
+# src/bench/broadcast.py
+"""
+Benchmark WebSocket fan-out: per-client send_json (old ConnectionManager
+behaviour) vs. encode-once BroadcastHub, with simulated clients.
+
+Reports, per client count, the encode time and the time until every
+client has received the frame, plus the per-window frame size of the
+v1 (full payload) and v2 (delta) protocols.
+
+Usage (from backend/):
+python -m src.bench.broadcast
+python -m src.bench.broadcast --clients 1 10 100 1000 --rounds 20
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from src.realtime.broadcast import BroadcastHub
+from src.realtime.encoding import encode_json, ORJSON_AVAILABLE
+from src.realtime.protocol import MSGPACK_AVAILABLE, encode_frame, make_delta
+
+
+class FakeWebSocket:
+    """Minimal stand-in for starlette's WebSocket (send side only)."""
+
+    def __init__(self):
+        self.received = 0
+        self.event = None
+
+    async def accept(self):
+        pass
+
+    async def close(self, code=1000, reason=""):
+        pass
+
+    async def send_json(self, data):
+        # what starlette does per call
+        json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        self._mark()
+        await asyncio.sleep(0)
+
+    async def send_text(self, data):
+        self._mark()
+        await asyncio.sleep(0)
+
+    def _mark(self):
+        self.received += 1
+        if self.event is not None:
+            self.event()
+
+
+def make_payload(history_len=60):
+    now = time.time()
+    history = [{"time": now - 3 * i, "label": i % 3} for i in range(history_len)]
+    return {
+        "engine_state": "RUNNING",
+        "label_id": 1,
+        "label_name": "Stressed",
+        "confidence": 0.71,
+        "features": {
+            "key_count": 14,
+            "unique_keys": 9,
+            "dwell_mean": random.random() * 0.2,
+            "flight_mean": random.random() * 0.4,
+            "key_rate": 4.67,
+            "mouse_speed_mean": random.random() * 900,
+            "mouse_clicks": 2,
+            "eye_aspect_mean": 0.27,
+            "eye_blink_rate": 3,
+            "fatigue_score": 22,
+        },
+        "proba": [0.2, 0.71, 0.09],
+        "history": history[::-1],
+    }
+
+
+async def fanout_sequential(clients, payload):
+    """Old behaviour: await send_json on each socket in turn."""
+    for ws in clients:
+        await ws.send_json(payload)
+
+
+async def fanout_hub(hub, clients, payload):
+    remaining = len(clients)
+    done = asyncio.get_running_loop().create_future()
+
+    def mark():
+        nonlocal remaining
+        remaining -= 1
+        if remaining == 0 and not done.done():
+            done.set_result(None)
+
+    for ws in clients:
+        ws.event = mark
+
+    await hub.broadcast(payload)
+    await done
+
+
+async def bench(n_clients, rounds):
+    payload = make_payload()
+
+    # --- encode cost (once per tick) ---
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        encode_json(payload)
+    encode_ms = (time.perf_counter() - t0) / rounds * 1e3
+
+    # --- old: sequential send_json per client ---
+    clients = [FakeWebSocket() for _ in range(n_clients)]
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        await fanout_sequential(clients, payload)
+    seq_ms = (time.perf_counter() - t0) / rounds * 1e3
+
+    # --- new: encode once, per-client queues ---
+    hub = BroadcastHub(queue_size=4, send_timeout=2.0)
+    clients = [FakeWebSocket() for _ in range(n_clients)]
+    for ws in clients:
+        await hub.connect(ws)
+
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        await fanout_hub(hub, clients, payload)
+    hub_ms = (time.perf_counter() - t0) / rounds * 1e3
+
+    tasks = [c.task for c in hub.clients.values()]
+    for ws in clients:
+        hub.disconnect(ws)
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    return encode_ms, seq_ms, hub_ms
+
+
+def frame_sizes():
+    prev = make_payload()
+    state = dict(prev, features=dict(prev["features"], key_count=17, dwell_mean=0.11))
+    state["history"] = prev["history"][1:] + [{"time": time.time() + 3, "label": 2}]
+    delta = make_delta(2, prev, state)
+
+    print("Frame size per window (bytes):")
+    print(f"  v1 full json     : {len(encode_frame(state)[1].encode()):6d}")
+    print(f"  v2 delta json    : {len(encode_frame(delta)[1].encode()):6d}")
+    if MSGPACK_AVAILABLE:
+        print(f"  v2 delta msgpack : {len(encode_frame(delta, 'msgpack')[1]):6d}")
+    print()
+
+
+async def main(args):
+    frame_sizes()
+    print("Encoder:", "orjson" if ORJSON_AVAILABLE else "json (stdlib)")
+    print(f"{'clients':>8s} {'encode ms':>10s} {'send_json ms':>13s} {'hub ms':>9s}")
+    for n in args.clients:
+        encode_ms, seq_ms, hub_ms = await bench(n, args.rounds)
+        print(f"{n:8d} {encode_ms:10.3f} {seq_ms:13.3f} {hub_ms:9.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args))
@@ -0,0 +1,77 @@
+# src/bench/cache.py
+"""
+Prediction-cache hit rate, replaying recorded live windows in order
+(dataset/live_collected.csv) through ModelServer.predict_from_feature_dict.
+
+For each cache size and quantization it reports hits / misses /
+evictions, mean latency, and how often the cached answer differs from
+the uncached model (only possible with quantization).
+
+Quantization settings:
+- exact:      no quantization
+- q=<value>:  the same quantum for every column
+- std*<f>:    per-column quantum = f * column std over the replay
+
+Usage (from backend/):
+python -m src.bench.cache
+python -m src.bench.cache --sizes 16 128 1024 --quanta 0.01 1.0 --std-fractions 0.02 0.05
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.realtime.infer import ModelServer
+
+
+def replay(server, rows, repeat):
+    lat, preds = [], []
+    for _ in range(repeat):
+        for row in rows:
+            t0 = time.perf_counter()
+            preds.append(server.predict_from_feature_dict(row)["pred"])
+            lat.append(time.perf_counter() - t0)
+    return np.array(lat) * 1e3, np.array(preds)
+
+
+def main(args):
+    df = pd.read_csv(args.data).fillna(0.0)
+    rows = df.drop(columns=["label"], errors="ignore").to_dict("records")
+
+    base = ModelServer(model_path=args.model)
+    base.warmup()
+    lat, reference = replay(base, rows, args.repeat)
+    print(f"Replaying {len(rows)} windows x{args.repeat} from {args.data}")
+    print(f"no cache: mean {lat.mean():.3f} ms\n")
+
+    std = df.reindex(columns=base.input_columns, fill_value=0.0).std()
+    settings = [("exact", None)]
+    settings += [(f"q={q}", q) for q in args.quanta]
+    settings += [
+        (f"std*{f}", {c: f * s for c, s in std.items()})
+        for f in args.std_fractions
+    ]
+
+    print(f"{'size':>6s} {'quantize':<12s} {'hit rate':>9s} {'hits':>6s} {'misses':>7s} "
+          f"{'evict':>6s} {'mean ms':>8s} {'changed':>8s}")
+    for size in args.sizes:
+        for name, quantum in settings:
+            server = ModelServer(model_path=args.model, cache_size=size, cache_quantum=quantum)
+            lat, preds = replay(server, rows, args.repeat)
+            st = server.cache.snapshot_stats()
+            changed = (preds != reference).mean() * 100
+            print(f"{size:6d} {name:<12s} {st['hit_rate'] * 100:8.1f}% {st['hits']:6d} "
+                  f"{st['misses']:7d} {st['evictions']:6d} {lat.mean():8.3f} {changed:7.2f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="models/rf_baseline.joblib")
+    parser.add_argument("--data", default="dataset/live_collected.csv")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 1024])
+    parser.add_argument("--quanta", type=float, nargs="+", default=[0.01, 1.0])
+    parser.add_argument("--std-fractions", type=float, nargs="+", default=[0.02, 0.1])
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,125 @@
+# src/bench/cascade.py
+"""
+Confidence cascade (src/realtime/cascade.py): forest first, LSTM only
+when the forest is unsure, vs. always running the LSTM.
+
+Every dataset row is replayed in order as one live stream
+(predict_from_feature_dict(..., stream=...)). For each forest
+threshold it reports the fraction of windows escalated to the LSTM,
+mean / p50 / p99 end-to-end latency per window, and label agreement
+with the LSTM-only run; then the same for the whole dataset scored as
+batches (predict_batch).
+
+Without --lstm, a randomly initialised SimpleLSTM (hidden 128, 2
+layers) over the forest's columns is used: the escalation fraction
+depends only on the forest, and LSTM latency does not depend on
+weights (agreement is then meaningless).
+
+The cascade only pays off when stage 0 plus the escalated fraction of
+the heavy stage costs less than the heavy stage on every window. An
+escalated window costs one LSTM pass over the last seq_len windows,
+which takes longer than one streamed step.
+
+Usage (from backend/):
+python -m src.bench.cascade
+python -m src.bench.cascade --thresholds 0.6 0.8 0.9 --batch 256
+python -m src.bench.cascade --lstm models/lstm.pth --metadata dataset/ts_data.pkl.meta.pkl
+"""
+import argparse
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+
+from src.models.model_def import SimpleLSTM
+from src.realtime.infer import ModelServer
+
+
+def random_lstm(columns, out_dir):
+    torch.manual_seed(0)
+    model = SimpleLSTM(input_dim=len(columns), hidden_dim=128, num_layers=2, output_dim=3)
+    model_path = os.path.join(out_dir, "lstm.pth")
+    metadata_path = os.path.join(out_dir, "lstm.meta.pkl")
+    torch.save(model.state_dict(), model_path)
+    pickle.dump({"columns": list(columns), "input_dim": len(columns),
+                 "num_classes": 3, "seq_len": 5}, open(metadata_path, "wb"))
+    return model_path, metadata_path
+
+
+def replay(server, rows, stream):
+    lat, preds, stages = [], [], []
+    for row in rows:
+        t0 = time.perf_counter()
+        res = server.predict_from_feature_dict(row, stream=stream)
+        lat.append(time.perf_counter() - t0)
+        preds.append(res["pred"])
+        stages.append(res.get("stage", 0))
+    return np.array(lat) * 1e3, np.array(preds), np.array(stages)
+
+
+def main(args):
+    torch.set_num_threads(args.threads)
+    df = pd.read_csv(args.data).fillna(0.0)
+    rows = df.drop(columns=["label"], errors="ignore").to_dict("records")
+
+    tmp = tempfile.TemporaryDirectory()
+    lstm_path, metadata_path = args.lstm, args.metadata
+    if lstm_path is None:
+        forest = ModelServer(model_path=args.model)
+        lstm_path, metadata_path = random_lstm(forest.input_columns, tmp.name)
+
+    heavy = ModelServer(model_path=lstm_path, metadata_path=metadata_path, device="cpu")
+    heavy.warmup()
+    stage = [{"model_path": lstm_path, "metadata_path": metadata_path}]
+    cascades = {}
+    for threshold in args.thresholds:
+        cascades[threshold] = ModelServer(model_path=args.model, cascade=stage,
+                                          cascade_threshold=threshold)
+        cascades[threshold].warmup()
+
+    print(f"Replaying {len(rows)} windows from {args.data} as one stream, "
+          f"torch threads={args.threads}\n")
+    print(f"{'mode':<16s} {'escalated':>9s} {'mean ms':>8s} {'p50 ms':>8s} {'p99 ms':>8s} {'agree':>8s}")
+
+    lat, ref, _ = replay(heavy, rows, stream="bench")
+    print(f"{'lstm only':<16s} {100.0:8.1f}% {lat.mean():8.3f} {np.percentile(lat, 50):8.3f} "
+          f"{np.percentile(lat, 99):8.3f} {100.0:7.2f}%")
+    for threshold, server in cascades.items():
+        lat, preds, stages = replay(server, rows, stream="bench")
+        escalated = (stages > 0).mean() * 100
+        agree = (preds == ref).mean() * 100
+        print(f"{'cascade @' + str(threshold):<16s} {escalated:8.1f}% {lat.mean():8.3f} "
+              f"{np.percentile(lat, 50):8.3f} {np.percentile(lat, 99):8.3f} {agree:7.2f}%")
+
+    print(f"\nBatches of {args.batch} rows (whole dataset, rows independent)")
+    print(f"{'mode':<16s} {'escalated':>9s} {'total ms':>9s}")
+    batches = [rows[i:i + args.batch] for i in range(0, len(rows), args.batch)]
+    t0 = time.perf_counter()
+    for batch in batches:
+        heavy.predict_batch(batch)
+    print(f"{'lstm only':<16s} {100.0:8.1f}% {(time.perf_counter() - t0) * 1e3:9.2f}")
+    for threshold, server in cascades.items():
+        t0 = time.perf_counter()
+        stages = [r["stage"] for batch in batches for r in server.predict_batch(batch)]
+        total = (time.perf_counter() - t0) * 1e3
+        escalated = (np.array(stages) > 0).mean() * 100
+        print(f"{'cascade @' + str(threshold):<16s} {escalated:8.1f}% {total:9.2f}")
+
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="models/rf_baseline.joblib")
+    parser.add_argument("--lstm", default=None)
+    parser.add_argument("--metadata", default=None)
+    parser.add_argument("--data", default="dataset/final_dataset.csv")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.6, 0.8, 0.9])
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--threads", type=int, default=1)
+    args = parser.parse_args()
+    main(args)
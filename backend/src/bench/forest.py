@@ -0,0 +1,131 @@
+# src/bench/forest.py
+"""
+Compiled array-backed forest (src/realtime/forest.py) vs. the original
+sklearn model (StandardScaler.transform + RandomForestClassifier).
+
+- equivalence: labels and probabilities on every dataset row plus
+  random rows around the training distribution (bit-for-bit)
+- latency: single row and batches
+- memory: tree arrays in memory, file size, and peak RSS of a fresh
+  process that loads each artifact into a ModelServer and predicts once
+
+Usage (from backend/):
+python -m src.models.compile_forest --out models/rf_baseline.npz
+python -m src.bench.forest
+python -m src.bench.forest --model models/rf_baseline.joblib --compiled models/rf_baseline.npz
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.realtime.forest import CompiledForest, compile_forest
+
+# VmHWM, not ru_maxrss: the latter survives exec and reports the parent's peak
+RSS_CHILD = r"""
+import json, sys
+from src.realtime.infer import ModelServer
+server = ModelServer(model_path=sys.argv[1])
+server.predict_from_feature_dict({})
+hwm = [l for l in open("/proc/self/status") if l.startswith("VmHWM")][0]
+print(json.dumps({
+    "maxrss_kb": int(hwm.split()[1]),
+    "sklearn": "sklearn" in sys.modules,
+}))
+"""
+
+
+def timeit(fn, n):
+    lat = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        lat.append(time.perf_counter() - t0)
+    lat = np.array(lat) * 1e3
+    return lat.mean(), np.percentile(lat, 99)
+
+
+def sklearn_bytes(clf):
+    total = 0
+    for est in clf.estimators_:
+        state = est.tree_.__getstate__()
+        total += state["nodes"].nbytes + state["values"].nbytes
+    return total
+
+
+def peak_rss(path):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+    out = subprocess.run(
+        [sys.executable, "-c", RSS_CHILD, path],
+        capture_output=True, text=True, check=True, env=env
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(args):
+    store = joblib.load(args.model)
+    clf, scaler, columns = store["model"], store.get("scaler"), store["columns"]
+    clf.n_jobs = 1
+
+    if args.compiled and os.path.exists(args.compiled):
+        forest = CompiledForest.load(args.compiled)
+    else:
+        forest = compile_forest(clf, scaler, columns)
+
+    def reference(X):
+        Xs = scaler.transform(pd.DataFrame(X, columns=columns)) if scaler is not None else X
+        return clf.predict_proba(np.asarray(Xs, dtype=np.float32))
+
+    # ---- equivalence ----
+    df = pd.read_csv(args.data).fillna(0.0)
+    X_data = df.reindex(columns=columns, fill_value=0.0).to_numpy(dtype=np.float64)
+    rng = np.random.default_rng(0)
+    X_rand = (rng.normal(size=(args.random, len(columns))) * X_data.std(axis=0) * 3
+              + X_data.mean(axis=0))
+
+    for name, X in [("dataset", X_data), ("random", X_rand)]:
+        ref, got = reference(X), forest.predict_proba(X)
+        same_pred = int((ref.argmax(axis=1) == got.argmax(axis=1)).sum())
+        print(f"Equivalence ({name}): {same_pred}/{len(X)} labels, "
+              f"probabilities bit-identical: {np.array_equal(ref, got)}, "
+              f"max |diff| {np.abs(ref - got).max():.1e}")
+
+    # ---- latency ----
+    print(f"\n{'rows':>6s} {'sklearn ms':>11s} {'p99':>8s} {'compiled ms':>12s} {'p99':>8s}")
+    for n in args.batch_sizes:
+        X = X_data[np.arange(n) % len(X_data)]
+        ref_mean, ref_p99 = timeit(lambda: reference(X), args.n)
+        cf_mean, cf_p99 = timeit(lambda: forest.predict_proba(X), args.n)
+        print(f"{n:6d} {ref_mean:11.3f} {ref_p99:8.3f} {cf_mean:12.3f} {cf_p99:8.3f}")
+
+    # ---- memory ----
+    print(f"\nTree arrays in memory: sklearn {sklearn_bytes(clf) / 1024:.0f} KiB, "
+          f"compiled {forest.nbytes / 1024:.0f} KiB")
+    print(f"File size: {args.model} {os.path.getsize(args.model) / 1024:.0f} KiB", end="")
+    if args.compiled and os.path.exists(args.compiled):
+        print(f", {args.compiled} {os.path.getsize(args.compiled) / 1024:.0f} KiB")
+        for path in (args.model, args.compiled):
+            r = peak_rss(path)
+            print(f"Peak RSS loading {path}: {r['maxrss_kb'] / 1024:.0f} MiB "
+                  f"(sklearn imported: {r['sklearn']})")
+    else:
+        print("\n(run src.models.compile_forest first for file size / RSS of the .npz)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="models/rf_baseline.joblib")
+    parser.add_argument("--compiled", default="models/rf_baseline.npz")
+    parser.add_argument("--data", default="dataset/final_dataset.csv")
+    parser.add_argument("--random", type=int, default=5000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 64, 1024])
+    parser.add_argument("--n", type=int, default=200)
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,111 @@
+# src/bench/lstm_stream.py
+"""
+Streaming SimpleLSTM (src/realtime/streaming.py) vs. recomputing the
+sequence for every window.
+
+For a stream of windows it reports, per seq_len:
+- per-window latency of model(last seq_len windows) (recompute)
+- per-window latency of one LSTMStream step ("window" and "carry" mode)
+- max |proba difference| and label agreement of each stream against
+  batch recomputation over the same sequence ("window": last seq_len
+  windows; "carry": every window so far)
+
+Without --model, a randomly initialised SimpleLSTM (hidden 128,
+2 layers) is used: latency and equivalence do not depend on weights.
+Without --data, the stream is random features.
+
+Usage (from backend/):
+python -m src.bench.lstm_stream
+python -m src.bench.lstm_stream --seq-lens 5 10 30 --windows 300
+python -m src.bench.lstm_stream --model models/lstm.pth --metadata dataset/ts_data.pkl.meta.pkl --data dataset/processed_windows.csv
+"""
+import argparse
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+
+from src.models.model_def import SimpleLSTM
+from src.realtime.streaming import LSTMStream
+
+
+def load_model(args):
+    meta = pickle.load(open(args.metadata, "rb")) if args.metadata else {}
+    input_dim = meta.get("input_dim", args.input_dim)
+    model = SimpleLSTM(
+        input_dim=input_dim,
+        hidden_dim=128,
+        num_layers=2,
+        output_dim=meta.get("num_classes", 3),
+    )
+    if args.model:
+        model.load_state_dict(torch.load(args.model, map_location="cpu"))
+    else:
+        torch.manual_seed(0)
+    model.eval()
+    return model, meta.get("columns"), input_dim
+
+
+@torch.no_grad()
+def recompute(model, seq):
+    x = torch.tensor(seq[None, :, :], dtype=torch.float32)
+    return torch.softmax(model(x), dim=1)[0].numpy()
+
+
+def main(args):
+    torch.set_num_threads(args.threads)
+    model, columns, input_dim = load_model(args)
+
+    if args.data:
+        df = pd.read_csv(args.data).fillna(0.0)
+        X = df.reindex(columns=columns, fill_value=0.0).to_numpy(dtype=np.float32)
+        X = X[np.arange(args.windows) % len(X)]
+    else:
+        X = np.random.default_rng(0).normal(size=(args.windows, input_dim)).astype(np.float32)
+
+    print(f"{args.windows} windows, {input_dim} features, torch threads={args.threads}\n")
+    print(f"{'seq_len':>7s} {'mode':<10s} {'mean ms':>8s} {'p99 ms':>8s} {'max |diff|':>11s} {'agree':>7s}")
+
+    for seq_len in args.seq_lens:
+        # ---- recompute every window ----
+        lat, ref_window = [], []
+        for t in range(len(X)):
+            seq = X[max(0, t - seq_len + 1):t + 1]
+            t0 = time.perf_counter()
+            ref_window.append(recompute(model, seq))
+            lat.append(time.perf_counter() - t0)
+        lat = np.array(lat) * 1e3
+        print(f"{seq_len:7d} {'recompute':<10s} {lat.mean():8.3f} {np.percentile(lat, 99):8.3f} "
+              f"{'-':>11s} {'-':>7s}")
+
+        # "carry" reference: every window so far (quadratic, verification only)
+        ref_carry = [recompute(model, X[:t + 1]) for t in range(len(X))]
+
+        for mode, ref in [("window", ref_window), ("carry", ref_carry)]:
+            stream = LSTMStream(model, seq_len, mode=mode)
+            lat, out = [], []
+            for x in X:
+                t0 = time.perf_counter()
+                out.append(stream.step(x))
+                lat.append(time.perf_counter() - t0)
+            lat = np.array(lat) * 1e3
+            out, ref = np.array(out), np.array(ref)
+            diff = np.abs(out - ref).max()
+            agree = (out.argmax(axis=1) == ref.argmax(axis=1)).mean() * 100
+            print(f"{seq_len:7d} {mode:<10s} {lat.mean():8.3f} {np.percentile(lat, 99):8.3f} "
+                  f"{diff:11.1e} {agree:6.1f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--metadata", default=None)
+    parser.add_argument("--data", default=None)
+    parser.add_argument("--input-dim", type=int, default=52)
+    parser.add_argument("--seq-lens", type=int, nargs="+", default=[5, 10, 30])
+    parser.add_argument("--windows", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=1)
+    args = parser.parse_args()
+    main(args)
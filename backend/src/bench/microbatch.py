@@ -0,0 +1,84 @@
+# src/bench/microbatch.py
+"""
+Throughput vs. p99 latency of /predict-style calls at several
+concurrency levels, with and without the MicroBatcher.
+
+"direct" mirrors the server without batching: each request runs
+predict_from_feature_dict on the event loop. "batched" submits to a
+MicroBatcher that scores stacked rows in a worker thread.
+
+Usage (from backend/):
+python -m src.bench.microbatch
+python -m src.bench.microbatch --concurrency 1 8 32 128 --seconds 3 --wait-ms 2
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.realtime.batching import MicroBatcher
+from src.realtime.infer import ModelServer
+
+
+async def client_loop(call, rows, offset, stop_at, latencies):
+    i = offset
+    while time.perf_counter() < stop_at:
+        t0 = time.perf_counter()
+        # yield first: a request waits for the loop like a real HTTP call
+        await asyncio.sleep(0)
+        await call(rows[i % len(rows)])
+        latencies.append(time.perf_counter() - t0)
+        i += 1
+
+
+async def run(call, rows, concurrency, seconds):
+    latencies = []
+    stop_at = time.perf_counter() + seconds
+    t0 = time.perf_counter()
+    await asyncio.gather(*[
+        client_loop(call, rows, k * 7, stop_at, latencies)
+        for k in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - t0
+    lat = np.array(latencies) * 1e3
+    return len(lat) / elapsed, np.percentile(lat, 50), np.percentile(lat, 99)
+
+
+async def main(args):
+    df = pd.read_csv(args.data).fillna(0.0)
+    rows = df.drop(columns=["label"], errors="ignore").to_dict("records")
+    server = ModelServer(model_path=args.model)
+
+    async def direct(feat):
+        return server.predict_from_feature_dict(feat)
+
+    batcher = MicroBatcher(server.predict_batch, max_batch=args.max_batch, max_wait_ms=args.wait_ms)
+    batcher.start()
+
+    print(f"{'conc':>5s} {'mode':>8s} {'req/s':>9s} {'p50 ms':>8s} {'p99 ms':>8s} {'batch':>6s}")
+    for c in args.concurrency:
+        for name, call in [("direct", direct), ("batched", batcher.submit)]:
+            rows_before, batches_before = batcher.rows, batcher.batches
+            rps, p50, p99 = await run(call, rows, c, args.seconds)
+            if name == "batched":
+                n_batches = batcher.batches - batches_before
+                mean_batch = (batcher.rows - rows_before) / max(n_batches, 1)
+            else:
+                mean_batch = 1.0
+            print(f"{c:5d} {name:>8s} {rps:9.1f} {p50:8.2f} {p99:8.2f} {mean_batch:6.1f}")
+
+    await batcher.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="models/rf_baseline.joblib")
+    parser.add_argument("--data", default="dataset/final_dataset.csv")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--wait-ms", type=float, default=2.0)
+    args = parser.parse_args()
+    asyncio.run(main(args))
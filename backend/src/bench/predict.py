@@ -0,0 +1,86 @@
+# src/bench/predict.py
+"""
+Microbenchmark single-row sklearn inference: the original DataFrame path
+(DataFrame -> scaler.transform -> predict + predict_proba) vs.
+ModelServer's fast path. Also checks that both give bit-for-bit
+identical labels and probabilities on every row of the dataset.
+
+Usage (from backend/):
+python -m src.bench.predict
+python -m src.bench.predict --model models/rf_baseline.joblib --data dataset/final_dataset.csv --n 500
+"""
+import argparse
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.realtime.infer import ModelServer
+
+
+def reference_predict(store, feat_dict):
+    """The pre-fast-path implementation, verbatim."""
+    clf, scaler, columns = store["model"], store.get("scaler"), store["columns"]
+
+    x = pd.DataFrame(
+        [[feat_dict.get(c, 0.0) for c in columns]],
+        columns=columns
+    )
+    if scaler is not None:
+        x = scaler.transform(x)
+
+    pred = int(clf.predict(x)[0])
+    proba = clf.predict_proba(x)[0].tolist()
+    return {"pred": pred, "proba": proba}
+
+
+def timeit(fn, rows, n):
+    lat = []
+    for i in range(n):
+        row = rows[i % len(rows)]
+        t0 = time.perf_counter()
+        fn(row)
+        lat.append(time.perf_counter() - t0)
+    lat = np.array(lat) * 1e3
+    return lat.mean(), np.percentile(lat, 50), np.percentile(lat, 99)
+
+
+def main(args):
+    df = pd.read_csv(args.data).fillna(0.0)
+    rows = df.drop(columns=["label"], errors="ignore").to_dict("records")
+
+    store = joblib.load(args.model)
+    server = ModelServer(model_path=args.model)
+
+    # ---- equivalence ----
+    # n_jobs=1 so the reference sums tree probabilities in a fixed order
+    # (with n_jobs=-1 the order, and so the last ulp, depends on threads)
+    store["model"].n_jobs = 1
+    mismatches = 0
+    for row in rows:
+        a = reference_predict(store, row)
+        b = server.predict_from_feature_dict(row)
+        if a["pred"] != b["pred"] or a["proba"] != b["proba"]:
+            mismatches += 1
+    print(f"Equivalence: {len(rows) - mismatches}/{len(rows)} rows bit-identical")
+
+    # ---- latency ----
+    store = joblib.load(args.model)   # original n_jobs setting
+    print(f"\n{'path':<22s} {'mean ms':>8s} {'p50 ms':>8s} {'p99 ms':>8s}")
+    for name, fn in [
+        ("before (DataFrame)", lambda r: reference_predict(store, r)),
+        ("after (fast path)", server.predict_from_feature_dict),
+    ]:
+        fn(rows[0])  # warm-up
+        mean, p50, p99 = timeit(fn, rows, args.n)
+        print(f"{name:<22s} {mean:8.3f} {p50:8.3f} {p99:8.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="models/rf_baseline.joblib")
+    parser.add_argument("--data", default="dataset/final_dataset.csv")
+    parser.add_argument("--n", type=int, default=300)
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,128 @@
+# src/bench/registry.py
+"""
+Memory and load time of 1 vs. N worker processes holding the same
+model, per artifact:
+
+- joblib:    models/rf_baseline.joblib (sklearn, private heap copy)
+- npz:       compiled forest .npz (numpy, private heap copy)
+- registry:  registry version (src/realtime/registry.py), arrays
+             memory-mapped read-only and shared between processes
+
+Each worker (spawned, like the process-pool backend) loads the model,
+warms it up and scores every dataset row, then waits until all workers
+are loaded before measuring:
+
+- load ms:  ModelServer construction
+- RSS:      resident set size; counts shared pages in full in every
+            process, so it cannot show sharing
+- PSS:      proportional set size (shared pages divided among the
+            processes mapping them); the sum over workers is the real
+            memory cost
+- model:    PSS after loading minus PSS before (imports excluded)
+
+The npz and registry artifacts are written to a temporary directory
+first.
+
+Usage (from backend/):
+python -m src.bench.registry
+python -m src.bench.registry --workers 1 4 8
+"""
+import argparse
+import multiprocessing as mp
+import os
+import tempfile
+import time
+
+
+def _memory_kib():
+    """
+    (RSS, PSS) of this process in KiB.
+    """
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                values[parts[0]] = int(parts[1])
+    return values["Rss:"], values["Pss:"]
+
+
+def _worker(model_path, rows, loaded, done, results):
+    from src.realtime.infer import ModelServer
+
+    _, pss_before = _memory_kib()
+    t0 = time.perf_counter()
+    server = ModelServer(model_path=model_path)
+    load_ms = (time.perf_counter() - t0) * 1e3
+
+    server.warmup()
+    server.predict_matrix(server.rows_to_matrix(rows))
+    for row in rows:
+        server.predict_from_feature_dict(row)
+
+    loaded.wait()
+    rss, pss = _memory_kib()
+    results.put((load_ms, rss, pss, pss - pss_before))
+    done.wait()
+
+
+def run(ctx, model_path, rows, n):
+    loaded, done = ctx.Barrier(n), ctx.Barrier(n + 1)
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(target=_worker, args=(model_path, rows, loaded, done, results))
+        for _ in range(n)
+    ]
+    for p in procs:
+        p.start()
+    out = [results.get() for _ in range(n)]
+    done.wait()
+    for p in procs:
+        p.join()
+    return out
+
+
+def main(args):
+    import pandas as pd
+
+    from src.realtime.infer import ModelServer
+    from src.realtime.registry import ModelRegistry
+
+    df = pd.read_csv(args.data).fillna(0.0)
+    rows = df.drop(columns=["label"], errors="ignore").to_dict("records")
+
+    tmp = tempfile.TemporaryDirectory()
+    forest = ModelServer(model_path=args.model).forest
+    npz_path = os.path.join(tmp.name, "model.npz")
+    forest.save(npz_path)
+    registry = ModelRegistry(os.path.join(tmp.name, "registry"))
+    manifest = registry.publish(forest, "model", source=args.model)
+    registry_path = registry.path("model", manifest["version"])
+
+    artifacts = [("joblib", args.model), ("npz", npz_path), ("registry", registry_path)]
+
+    ctx = mp.get_context("spawn")
+    print(f"{forest.n_trees} trees, {forest.nbytes / 1024:.0f} KiB of arrays; "
+          f"{len(rows)} rows scored per worker\n")
+    print(f"{'artifact':<9s} {'workers':>7s} {'load ms':>8s} {'RSS MiB':>8s} {'PSS MiB':>8s} "
+          f"{'model MiB':>9s} {'total PSS':>10s} {'total model':>12s}")
+    for name, path in artifacts:
+        for n in args.workers:
+            out = run(ctx, path, rows, n)
+            load_ms = sum(o[0] for o in out) / n
+            rss = sum(o[1] for o in out) / n / 1024
+            pss = sum(o[2] for o in out) / n / 1024
+            model = sum(o[3] for o in out) / n / 1024
+            print(f"{name:<9s} {n:7d} {load_ms:8.1f} {rss:8.1f} {pss:8.1f} {model:9.2f} "
+                  f"{pss * n:10.1f} {model * n:12.2f}")
+
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="models/rf_baseline.joblib")
+    parser.add_argument("--data", default="dataset/final_dataset.csv")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+    main(args)
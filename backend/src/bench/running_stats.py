@@ -0,0 +1,129 @@
+# src/bench/running_stats.py
+"""
+Error of the streaming statistics (src/realtime/running_stats.py)
+against the exact feature_extractor.safe_stats, on the raw sessions.
+
+Every array the offline extractor passes to safe_stats is recorded
+while it builds the windows of each session (sliding_windows_from_session,
+10 s windows every 5 s by default) and once over the whole session;
+each array is then also fed sample by sample to a RunningStats.
+
+Per sample stream it reports the number of arrays and their largest
+size, the worst relative error of mean / std / max / quartiles, and
+the worst and mean quartile error as a fraction of the exact
+interquartile range (of the range when the IQR is 0), plus the cost of
+one add().
+
+Usage (from backend/):
+python -m src.bench.running_stats
+python -m src.bench.running_stats --sessions dataset/raw_demo --window 3 --step 0.5
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from src.data import feature_extractor
+from src.realtime.running_stats import RunningStats
+
+# safe_stats inputs, in call order, per extractor
+STREAMS = {
+    "extract_keystroke_features": ("dwell", "flight"),
+    "extract_mouse_features": ("mouse_speed", "mouse_acc"),
+    "extract_screen_features": ("window_dwell",),
+    "extract_face_features": ("eye", "mouth", "brow"),
+}
+NAMES = ("mean", "std", "q25", "median", "q75", "max")
+
+
+def record_inputs(sessions, window, step):
+    """
+    {stream name: [np.ndarray, ...]} of every safe_stats input.
+    """
+    recorded = defaultdict(list)
+    exact = feature_extractor.safe_stats
+    calls = {"frame": None, "index": 0}
+
+    def recording_safe_stats(arr):
+        frame = sys._getframe(1)
+        if frame is not calls["frame"]:
+            calls["frame"], calls["index"] = frame, 0
+        name = STREAMS[frame.f_code.co_name][calls["index"]]
+        calls["index"] += 1
+        recorded[name].append(np.array(arr, dtype=float))
+        return exact(arr)
+
+    feature_extractor.safe_stats = recording_safe_stats
+    try:
+        for path in sessions:
+            with open(path) as f:
+                streams = json.load(f)
+            feature_extractor.sliding_windows_from_session(streams, window_size=window, step=step)
+            # whole session as one window
+            ts = [ev["ts"] for evs in streams.values() for ev in evs]
+            feature_extractor.extract_window_features(streams, min(ts), max(ts))
+    finally:
+        feature_extractor.safe_stats = exact
+    return recorded
+
+
+def compare(arrays):
+    rel = defaultdict(float)
+    q_errors = []
+    q_rel = 0.0
+    add_sec, n_added = 0.0, 0
+    for arr in arrays:
+        if len(arr) == 0:
+            continue
+        exact = dict(zip(NAMES, feature_extractor.safe_stats(arr)))
+        stats = RunningStats()
+        t0 = time.perf_counter()
+        for x in arr.tolist():
+            stats.add(x)
+        add_sec += time.perf_counter() - t0
+        n_added += len(arr)
+        est = {k.split("_", 1)[1]: v for k, v in stats.summary("s").items()}
+
+        for name in ("mean", "std", "max"):
+            scale = max(abs(exact[name]), 1e-12)
+            rel[name] = max(rel[name], abs(est[name] - exact[name]) / scale)
+        spread = (exact["q75"] - exact["q25"]) or (arr.max() - arr.min())
+        for name in ("q25", "median", "q75"):
+            err = abs(est[name] - exact[name])
+            q_errors.append(err / spread if spread else float(err > 0))
+            q_rel = max(q_rel, err / max(abs(exact[name]), 1e-12))
+    rel["quartile"] = q_rel
+    q_errors = np.array(q_errors) if q_errors else np.zeros(1)
+    return rel, q_errors, (add_sec / n_added * 1e6 if n_added else 0.0)
+
+
+def main(args):
+    sessions = sorted(glob.glob(os.path.join(args.sessions, "*.json")))
+    recorded = record_inputs(sessions, args.window, args.step)
+    print(f"{len(sessions)} sessions, {args.window:g} s windows every {args.step:g} s\n")
+
+    print(f"{'stream':<13s} {'arrays':>6s} {'max n':>6s} {'mean rel':>9s} {'std rel':>9s} "
+          f"{'max rel':>9s} {'q rel':>9s} {'q worst %IQR':>13s} {'q mean %IQR':>12s} {'add us':>7s}")
+    worst = []
+    for name, arrays in recorded.items():
+        rel, q_errors, add_us = compare(arrays)
+        worst.append(q_errors)
+        print(f"{name:<13s} {len(arrays):6d} {max(len(a) for a in arrays):6d} "
+              f"{rel['mean']:9.1e} {rel['std']:9.1e} {rel['max']:9.1e} {rel['quartile']:9.1e} "
+              f"{q_errors.max() * 100:13.2f} {q_errors.mean() * 100:12.2f} {add_us:7.2f}")
+    worst = np.concatenate(worst)
+    print(f"\nall quartiles: worst {worst.max() * 100:.2f}% of IQR, mean {worst.mean() * 100:.2f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", default="dataset/raw_demo")
+    parser.add_argument("--window", type=float, default=10.0)
+    parser.add_argument("--step", type=float, default=5.0)
+    args = parser.parse_args()
+    main(args)
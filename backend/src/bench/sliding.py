@@ -0,0 +1,209 @@
+# src/bench/sliding.py
+"""
+Sliding windows (src/realtime/sliding.py) vs. tumbling windows.
+
+1. equivalence: synthetic keyboard / mouse / eye streams are fed hop by
+   hop to the sliding engines; after every hop their features are
+   compared with window_features / EyeTracker semantics recomputed
+   from scratch over the events inside the window.
+2. cost per hop: incremental update (add new events, evict old ones,
+   read features) vs. recomputing the window from its raw events, at
+   --rate mouse moves per second.
+3. input-to-prediction latency, live: real collectors and the
+   aggregator (no OS hooks; a thread calls the pynput callbacks) with a
+   mouse that moves slowly, then 4x faster from a random instant. The
+   latency is the time from the change until collect_features()
+   returns a window whose mouse_speed_mean is past the midpoint,
+   tumbling (one window of --window s) vs. sliding (--window s every
+   --hop s).
+
+Usage (from backend/):
+python -m src.bench.sliding
+python -m src.bench.sliding --window 3 --hop 0.5 --rate 1000 --trials 5
+"""
+import argparse
+import math
+import random
+import threading
+import time
+
+import numpy as np
+
+from src.realtime.sliding import SlidingEye, SlidingKeyboard, SlidingMouse
+from src.realtime.window_features import keyboard_features, mouse_features, pair_keys
+
+
+# -------------------------------------------------
+# Synthetic streams
+# -------------------------------------------------
+def streams(duration, rate, rng):
+    n = int(duration * rate)
+    t = np.sort(rng.uniform(0, duration, n))
+    t += np.cumsum(rng.random(n) < 0.002) * 0.8      # pauses (idle gaps)
+    dup = np.flatnonzero(rng.random(n - 1) < 0.02) + 1
+    t[dup] = t[dup - 1]                               # same-timestamp moves
+    t = t[t < duration]
+    mouse = (t, np.cumsum(rng.integers(-4, 5, len(t))), np.cumsum(rng.integers(-4, 5, len(t))))
+    clicks = np.sort(rng.uniform(0, duration, int(duration)))
+
+    keys = []
+    k = 0.0
+    while k < duration:
+        k += rng.uniform(0.05, 0.3)
+        code = int(rng.integers(0, 30))
+        hold = rng.uniform(0.03, 0.2)
+        keys.append((k, code, 1))
+        keys.append((k + hold, code, 0))
+    keys.sort()
+    keys = [e for e in keys if e[0] < duration]
+
+    eye_t = np.arange(0, duration, 1 / 30)
+    eye = (eye_t, rng.normal(0.27, 0.03, len(eye_t)), (rng.random(len(eye_t)) < 0.01).astype(int))
+    return mouse, clicks, keys, eye
+
+
+def dwell_pairs(keys, now):
+    held, pairs = {}, []
+    for t, code, down in keys:
+        if t > now:
+            break
+        if down:
+            held[code] = t
+        elif code in held:
+            pairs.append((held.pop(code), t))
+    return pairs
+
+
+def _close(a, b):
+    return all(math.isclose(a[k], b[k], rel_tol=1e-6, abs_tol=1e-6) for k in a)
+
+
+def check(window, hop, rate, rng, duration=20.0):
+    (mt, mx, my), clicks, keys, (et, ear, blink) = streams(duration, rate, rng)
+    mouse, keyboard, eye = SlidingMouse(), SlidingKeyboard(), SlidingEye()
+    mi = ci = ki = ei = 0
+    windows = 0
+    for now in np.arange(hop, duration, hop):
+        while mi < len(mt) and mt[mi] <= now:
+            mouse.add_move(mt[mi], mx[mi], my[mi]); mi += 1
+        while ci < len(clicks) and clicks[ci] <= now:
+            mouse.add_click(clicks[ci]); ci += 1
+        while ki < len(keys) and keys[ki][0] <= now:
+            keyboard.add(*keys[ki]); ki += 1
+        while ei < len(et) and et[ei] <= now:
+            eye.add(et[ei], ear[ei], blink[ei]); ei += 1
+        t_min = now - window
+        for engine in (mouse, keyboard, eye):
+            engine.evict(t_min)
+
+        inside = (mt >= t_min) & (mt <= now)
+        n_clicks = int(((clicks >= t_min) & (clicks <= now)).sum())
+        expected = mouse_features(mt[inside], mx[inside], my[inside], n_clicks=n_clicks)
+        assert _close(mouse.features(), expected), f"mouse differs at {now:.1f}"
+
+        kin = [e for e in keys if t_min <= e[0] <= now]
+        kt, kc, kd = (np.array(c) for c in zip(*kin)) if kin else (np.empty(0), np.empty(0, int), np.empty(0, int))
+        _, flight, _ = pair_keys(kt, kc, kd)
+        # dwell is timed at the release: pair over the whole history
+        dwell = np.array([r - p for p, r in dwell_pairs(keys, now) if r >= t_min])
+        assert _close(keyboard.features(window), keyboard_features(kc, kd, dwell, flight, window)), \
+            f"keyboard differs at {now:.1f}"
+
+        ein = (et >= t_min) & (et <= now)
+        assert math.isclose(eye.features()["eye_aspect_mean"], float(ear[ein].mean()), rel_tol=1e-9)
+        assert eye.features()["eye_blink_rate"] == int(blink[ein].sum())
+        windows += 1
+    return windows
+
+
+def cost(window, hop, rate, rng, duration=30.0):
+    (mt, mx, my), _, _, _ = streams(duration, rate, rng)
+    engine = SlidingMouse()
+    incremental, scratch = [], []
+    i = 0
+    for now in np.arange(hop, duration, hop):
+        j = np.searchsorted(mt, now, side="right")
+        t0 = time.perf_counter()
+        for t, x, y in zip(mt[i:j].tolist(), mx[i:j].tolist(), my[i:j].tolist()):
+            engine.add_move(t, x, y)
+        engine.evict(now - window)
+        engine.features()
+        t1 = time.perf_counter()
+        lo = np.searchsorted(mt, now - window)
+        mouse_features(mt[lo:j], mx[lo:j], my[lo:j])
+        t2 = time.perf_counter()
+        i = j
+        if now >= window:
+            incremental.append(t1 - t0)
+            scratch.append(t2 - t1)
+    return np.median(incremental) * 1e3, np.median(scratch) * 1e3
+
+
+# -------------------------------------------------
+# Live step-change latency
+# -------------------------------------------------
+def live_latency(window, hop, rate, trials):
+    from src.realtime.aggregator import RealTimeAggregator
+
+    agg = RealTimeAggregator(sensors=("mouse",), hop_sec=hop)
+    step = {"speed": 1.0, "changed_at": None}
+    stop = threading.Event()
+
+    def move():
+        x = 0.0
+        while not stop.is_set():
+            x += step["speed"]
+            agg.mouse.on_move(int(x), 0)
+            time.sleep(1.0 / rate)
+
+    mover = threading.Thread(target=move, daemon=True)
+    mover.start()
+    try:
+        agg.collect_features(window_sec=window)     # settle
+        if hop is not None:
+            for _ in range(int(window / hop)):
+                agg.collect_features(window_sec=window)
+        slow = agg.collect_features(window_sec=window)["mouse_speed_mean"]
+        threshold = slow * 2.5                       # midpoint of 1x .. 4x
+
+        latencies = []
+        for _ in range(trials):
+            time.sleep(random.uniform(0, hop or window))
+            step["speed"], changed = 4.0, time.time()
+            while agg.collect_features(window_sec=window)["mouse_speed_mean"] < threshold:
+                pass
+            latencies.append(time.time() - changed)
+
+            step["speed"] = 1.0                      # back to slow, wait it out
+            while agg.collect_features(window_sec=window)["mouse_speed_mean"] > slow * 1.2:
+                pass
+    finally:
+        stop.set()
+        mover.join()
+    return latencies
+
+
+def main(args):
+    rng = np.random.default_rng(0)
+    n = check(args.window, args.hop, args.rate, rng)
+    print(f"✅ sliding features match a from-scratch recompute ({n} windows)\n")
+
+    inc, scratch = cost(args.window, args.hop, args.rate, rng)
+    print(f"per hop, mouse at {args.rate:.0f} moves/s ({args.window:g} s window, {args.hop:g} s hop): "
+          f"incremental {inc:.2f} ms, recompute {scratch:.2f} ms\n")
+
+    print(f"{'windows':<26s} {'mean s':>7s} {'min s':>7s} {'max s':>7s}")
+    for name, hop in (("tumbling", None), ("sliding", args.hop)):
+        lat = live_latency(args.window, hop, args.rate, args.trials)
+        label = f"{name} {args.window:g} s" + (f" / {hop:g} s hop" if hop else "")
+        print(f"{label:<26s} {np.mean(lat):7.2f} {np.min(lat):7.2f} {np.max(lat):7.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--window", type=float, default=3.0)
+    parser.add_argument("--hop", type=float, default=0.5)
+    parser.add_argument("--rate", type=float, default=1000.0, help="mouse moves per second")
+    parser.add_argument("--trials", type=int, default=5)
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,104 @@
+# src/bench/startup.py
+"""
+Cold-start budget: import time, model-load time and time-to-first-
+prediction, each measured in a fresh interpreter (nothing cached in
+sys.modules).
+
+Reports, per run:
+- import_ms:      `import src.realtime.infer`
+- load_ms:        ModelServer(model_path)
+- warmup_ms:      ModelServer.warmup() (0 with --no-warmup)
+- first_ms:       first predict_from_feature_dict after that
+- steady_ms:      median of the next 50 predictions
+- server_ms:      `import src.realtime.realtime_server` (separate process;
+                  sensors are not started by an import)
+- heavy modules present in sys.modules after loading the model
+
+Usage (from backend/):
+python -m src.bench.startup
+python -m src.bench.startup --model models/rf_baseline.joblib --runs 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+HEAVY = ("torch", "pandas", "joblib", "sklearn", "cv2", "mediapipe", "pynput")
+
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from src.realtime.infer import ModelServer
+t1 = time.perf_counter()
+server = ModelServer(model_path=sys.argv[1], metadata_path=sys.argv[2] or None)
+t2 = time.perf_counter()
+if sys.argv[3] == "1":
+    server.warmup()
+t3 = time.perf_counter()
+feat = {c: 0.5 for c in server.input_columns}
+server.predict_from_feature_dict(feat)
+t4 = time.perf_counter()
+steady = []
+for _ in range(50):
+    s = time.perf_counter()
+    server.predict_from_feature_dict(feat)
+    steady.append(time.perf_counter() - s)
+steady.sort()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1e3,
+    "load_ms": (t2 - t1) * 1e3,
+    "warmup_ms": (t3 - t2) * 1e3,
+    "first_ms": (t4 - t3) * 1e3,
+    "steady_ms": steady[len(steady) // 2] * 1e3,
+    "modules": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY,)
+
+SERVER_CHILD = r"""
+import json, time
+t0 = time.perf_counter()
+import src.realtime.realtime_server
+print(json.dumps({"server_ms": (time.perf_counter() - t0) * 1e3}))
+"""
+
+
+def run_child(code, *argv, env=None):
+    out = subprocess.run(
+        [sys.executable, "-c", code, *argv],
+        capture_output=True, text=True, check=True, env=env
+    ).stdout
+    # the child may print banners before the JSON line
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(args):
+    env = dict(os.environ, COGNITIVESENSE_MODEL=args.model)
+    if args.metadata:
+        env["COGNITIVESENSE_METADATA"] = args.metadata
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+
+    for warm in ([False] if args.no_warmup else [False, True]):
+        runs = [
+            run_child(CHILD, args.model, args.metadata or "", "1" if warm else "0", env=env)
+            for _ in range(args.runs)
+        ]
+        print(f"\nwarmup={'on' if warm else 'off'}  ({args.runs} runs, median)")
+        for key in ("import_ms", "load_ms", "warmup_ms", "first_ms", "steady_ms"):
+            print(f"  {key:10s} {np.median([r[key] for r in runs]):9.2f}")
+        print(f"  modules    {', '.join(runs[0]['modules'])}")
+
+    server = [run_child(SERVER_CHILD, env=env)["server_ms"] for _ in range(args.runs)]
+    print(f"\nserver import  {np.median(server):9.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="models/rf_baseline.joblib")
+    parser.add_argument("--metadata", default=None)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--no-warmup", action="store_true")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,99 @@
+# src/bench/window_clock.py
+"""
+Window timing under load: chained sleeps vs. the deadline clock
+(src/realtime/window_clock.py).
+
+A consumer loop asks for --windows windows of --period seconds and,
+after each one, does simulated work (model call, broadcast): a uniform
+--work fraction of the period, plus a spike of --spike periods with
+probability --spike-rate.
+
+- chained: time.sleep(period), then the work (what collect_features
+  did before the clock; live_data_collector also slept an extra
+  window after each write)
+- deadline: RealTimeAggregator(sensors=()).collect_features(), whose
+  window_start / window_end give the span of each window
+
+Reported per loop: windows emitted vs. due in the elapsed time, window
+length error (mean / max |length - period|), drift of the last window
+end from the grid, and for the clock the lateness percentiles and
+skipped deadlines.
+
+Usage (from backend/):
+python -m src.bench.window_clock
+python -m src.bench.window_clock --period 0.25 --windows 40 --work 0.1 0.4 --spike 1.5 --spike-rate 0.05
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+
+def chained(period, windows, work):
+    ends = [time.time()]
+    for _ in range(windows):
+        time.sleep(period)
+        ends.append(time.time())
+        work()
+    return np.diff(ends), ends[-1] - ends[0]
+
+
+def deadline(period, windows, work):
+    from src.realtime.aggregator import RealTimeAggregator
+
+    agg = RealTimeAggregator(sensors=())
+    lengths, lateness = [], []
+    t0 = time.time()
+    for _ in range(windows):
+        features = agg.collect_features(window_sec=period)
+        lengths.append(features["window_end"] - features["window_start"])
+        lateness.append(agg.clock.last_lateness)
+        work()
+    return np.array(lengths), features["window_end"] - t0, np.array(lateness), agg.clock.skipped
+
+
+def report(name, period, lengths, elapsed):
+    err = np.abs(lengths - period)
+    drift = elapsed - len(lengths) * period
+    print(f"{name:<9s} {len(lengths):4d}/{int(elapsed // period):<4d} "
+          f"{err.mean() * 1e3:9.1f} {err.max() * 1e3:9.1f} {drift * 1e3:9.1f}", end="")
+
+
+def main(args):
+    rng = random.Random(args.seed)
+
+    def work():
+        if rng.random() < args.spike_rate:
+            time.sleep(args.spike * args.period)
+        else:
+            time.sleep(rng.uniform(*args.work) * args.period)
+
+    print(f"{args.windows} windows of {args.period:g} s, work {args.work[0]:g}-{args.work[1]:g} "
+          f"of a period, {args.spike_rate:.0%} spikes of {args.spike:g} periods\n")
+    print(f"{'loop':<9s} {'emitted/due':>9s} {'len err':>9s} {'max err':>9s} {'drift':>9s}   (ms)")
+
+    rng.seed(args.seed)
+    lengths, elapsed = chained(args.period, args.windows, work)
+    report("chained", args.period, lengths, elapsed)
+    print()
+
+    rng.seed(args.seed)
+    lengths, elapsed, lateness, skipped = deadline(args.period, args.windows, work)
+    report("deadline", args.period, lengths, elapsed)
+    p50, p99 = np.percentile(lateness, [50, 99]) * 1e3
+    print(f"   lateness p50 {p50:.2f} ms, p99 {p99:.2f} ms, max {lateness.max() * 1e3:.2f} ms; "
+          f"{skipped} deadlines skipped")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--period", type=float, default=0.25)
+    parser.add_argument("--windows", type=int, default=40)
+    parser.add_argument("--work", type=float, nargs=2, default=(0.1, 0.4),
+                        help="work after each window, as a fraction of the period (min max)")
+    parser.add_argument("--spike", type=float, default=1.5, help="spike length in periods")
+    parser.add_argument("--spike-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args)
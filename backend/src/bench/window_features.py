@@ -0,0 +1,215 @@
+# src/bench/window_features.py
+"""
+Flush time of the keyboard / mouse collectors against events per
+window: vectorized window features (src/realtime/window_features.py,
+the shipped flush) vs. the per-event Python loops the collectors used
+before, for the same features.
+
+Events are synthetic: a random-walk mouse path sampled at 1 kHz with
+pauses, and overlapping key presses (auto-repeat included). Events are
+pushed through the collectors' rings, so each flush includes the drain.
+Both implementations are checked to give the same features (chunked
+into several windows for the keyboard, to exercise the carried
+held-key state).
+
+Usage (from backend/):
+python -m src.bench.window_features
+python -m src.bench.window_features --events 100 1000 10000 100000 --repeat 5
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from src.realtime.ringbuffer import EventRing
+from src.realtime.window_features import (
+    distribution,
+    keyboard_features,
+    mouse_features,
+    pair_keys,
+    IDLE_GAP_SEC,
+)
+
+
+# -------------------------------------------------
+# Synthetic events
+# -------------------------------------------------
+def mouse_events(n, rng):
+    dt = np.full(n, 0.001)
+    dt[rng.random(n) < 0.002] = 0.8           # pauses
+    dt[rng.random(n) < 0.01] = 0.0            # same-timestamp moves
+    t = 1.7e9 + np.cumsum(dt)
+    x = np.cumsum(rng.integers(-3, 4, n)) + 500
+    y = np.cumsum(rng.integers(-3, 4, n)) + 500
+    return t, x.astype(np.int32), y.astype(np.int32)
+
+
+def key_events(n, rng):
+    """
+    n events: presses and their releases, keys overlapping, some
+    presses repeated (auto-repeat) before the release.
+    """
+    events = []
+    t = 1.7e9
+    while len(events) < n:
+        t += rng.uniform(0.05, 0.2)
+        code = int(rng.integers(0, 60))
+        hold = rng.uniform(0.05, 0.15)
+        events.append((t, code, 1))
+        if rng.random() < 0.05:
+            events.append((t + hold / 2, code, 1))
+        events.append((t + hold, code, 0))
+    events.sort(key=lambda e: e[0])
+    events = events[:n]
+    t, code, down = zip(*events)
+    return np.array(t), np.array(code, dtype=np.int32), np.array(down, dtype=np.int8)
+
+
+# -------------------------------------------------
+# Per-event reference (pre-vectorization flush)
+# -------------------------------------------------
+def mouse_features_loop(t, x, y, n_clicks=0, idle_gap=IDLE_GAP_SEC):
+    speed, acc, jerk = [], [], []
+    path = 0.0
+    idle = []
+    prev_v = prev_a = None
+    for i in range(1, len(t)):
+        dt = t[i] - t[i - 1]
+        dist = math.hypot(x[i] - x[i - 1], y[i] - y[i - 1])
+        path += dist
+        if dt >= idle_gap:
+            idle.append(dt)
+        if dt <= 0:
+            continue
+        v = dist / dt
+        speed.append(v)
+        if prev_v is not None:
+            a = (v - prev_v) / dt
+            acc.append(a)
+            if prev_a is not None:
+                jerk.append((a - prev_a) / dt)
+            prev_a = a
+        prev_v = v
+    displacement = math.hypot(x[-1] - x[0], y[-1] - y[0]) if len(t) > 1 else 0.0
+    features = {
+        "mouse_speed_mean": sum(speed) / max(len(speed), 1),
+        "mouse_clicks": n_clicks,
+        "mouse_move_count": len(t),
+        "mouse_path_length": path,
+        "mouse_straightness": displacement / path if path > 0 else 0.0,
+        "mouse_idle_count": len(idle),
+        "mouse_idle_total": sum(idle),
+        "mouse_idle_max": max(idle, default=0.0),
+    }
+    features.update(distribution("mouse_speed", np.array(speed)))
+    features.update(distribution("mouse_acc", np.array(acc)))
+    features.update(distribution("mouse_jerk", np.array(jerk)))
+    return features
+
+
+def pair_keys_loop(t, code, down, held):
+    held = dict(held)
+    last_release = None
+    dwell, flight = [], []
+    for ti, c, d in zip(t.tolist(), code.tolist(), down.tolist()):
+        if d:
+            held[c] = ti
+            if last_release is not None:
+                flight.append(ti - last_release)
+        else:
+            pressed = held.pop(c, None)
+            if pressed is not None:
+                dwell.append(ti - pressed)
+            last_release = ti
+    return np.array(dwell), np.array(flight), held
+
+
+# -------------------------------------------------
+# Benchmark
+# -------------------------------------------------
+def _ring(fields, columns):
+    ring = EventRing(fields, capacity=len(columns[0]))
+    for row in zip(*columns):
+        ring.push(*row)
+    return ring
+
+
+def _same(a, b):
+    return a.keys() == b.keys() and all(math.isclose(a[k], b[k], rel_tol=1e-6, abs_tol=1e-9) for k in a)
+
+
+def check(rng, n=5000, chunks=7):
+    t, x, y = mouse_events(n, rng)
+    assert _same(mouse_features(t, x, y), mouse_features_loop(t, x, y)), "mouse features differ"
+
+    t, code, down = key_events(n, rng)
+    held_v = held_l = {}
+    for part in np.array_split(np.arange(n), chunks):
+        dv, fv, held_v = pair_keys(t[part], code[part], down[part], held_v)
+        dl, fl, held_l = pair_keys_loop(t[part], code[part], down[part], held_l)
+        # dwell comes out grouped by key rather than in time order
+        assert np.allclose(np.sort(dv), np.sort(dl)), "dwell differs"
+        assert np.allclose(fv, fl), "flight differs"
+        assert held_v == held_l, "carried keys differ"
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e3
+
+
+def main(args):
+    rng = np.random.default_rng(0)
+    check(rng)
+    print("✅ vectorized features match the per-event loops\n")
+
+    print(f"{'events':>8s} {'mouse vec ms':>13s} {'mouse loop ms':>14s} {'speedup':>8s} "
+          f"{'keys vec ms':>12s} {'keys loop ms':>13s} {'speedup':>8s}")
+    for n in args.events:
+        mt, mx, my = mouse_events(n, rng)
+        kt, kc, kd = key_events(n, rng)
+        mouse_ring = _ring([("t", np.float64), ("x", np.int32), ("y", np.int32)], (mt, mx, my))
+        key_ring = _ring([("t", np.float64), ("code", np.int32), ("down", np.int8)], (kt, kc, kd))
+
+        def refill(ring):
+            # re-publish the same n events without pushing them again
+            ring.tail = ring.head - n
+
+        def mouse_vec():
+            refill(mouse_ring)
+            ev = mouse_ring.drain()
+            mouse_features(ev["t"], ev["x"], ev["y"])
+
+        def mouse_loop():
+            refill(mouse_ring)
+            ev = mouse_ring.drain()
+            mouse_features_loop(ev["t"].tolist(), ev["x"].tolist(), ev["y"].tolist())
+
+        def keys_vec():
+            refill(key_ring)
+            ev = key_ring.drain()
+            dwell, flight, _ = pair_keys(ev["t"], ev["code"], ev["down"])
+            keyboard_features(ev["code"], ev["down"], dwell, flight)
+
+        def keys_loop():
+            refill(key_ring)
+            ev = key_ring.drain()
+            dwell, flight, _ = pair_keys_loop(ev["t"], ev["code"], ev["down"], {})
+            keyboard_features(ev["code"], ev["down"], dwell, flight)
+
+        mv, ml = timed(mouse_vec, args.repeat), timed(mouse_loop, args.repeat)
+        kv, kl = timed(keys_vec, args.repeat), timed(keys_loop, args.repeat)
+        print(f"{n:8d} {mv:13.3f} {ml:14.3f} {ml / mv:7.1f}x {kv:12.3f} {kl:13.3f} {kl / kv:7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args)
@@ -91,7 +91,8 @@ def main(args):
     meta = {
         "columns": feature_cols,
         "input_dim": len(feature_cols),
-        "num_classes": len(set(df["label"]))
+        "num_classes": len(set(df["label"])),
+        "seq_len": args.seq_len
     }
 
     with open(args.out_ts, "wb") as f:
@@ -44,3 +44,89 @@ def eval_lstm(model_path, pkldata):
             trues.append(it['y'])
     from sklearn.metrics import classification_report
     print(classification_report(trues, preds))
+
+def eval_lstm_quantized(model_path, quantized_path, pkldata, batch_size=64, repeat=5):
+    """
+    fp32 SimpleLSTM (.pth) vs. its scripted int8 export (.pt, from
+    src/models/export_lstm.py) on the same test sequences (CPU):
+    accuracy delta, label agreement, per-batch latency and file size.
+    """
+    import os
+    import pickle
+    import time
+    data = pickle.load(open(pkldata, "rb"))
+    test_items = data['test']
+    input_dim = test_items[0]['X'].shape[1]
+    num_classes = int(max(d['y'] for d in test_items) + 1)
+
+    fp32 = SimpleLSTM(input_dim=input_dim, hidden_dim=128, num_layers=2, output_dim=num_classes)
+    fp32.load_state_dict(torch.load(model_path, map_location="cpu"))
+    fp32.eval()
+    int8 = torch.jit.load(quantized_path, map_location="cpu")
+    int8.eval()
+
+    # sequences can differ in length: batch those of equal length
+    by_len = {}
+    for it in test_items:
+        by_len.setdefault(it['X'].shape[0], []).append(it)
+    batches = []
+    for items in by_len.values():
+        for i in range(0, len(items), batch_size):
+            chunk = items[i:i + batch_size]
+            X = torch.tensor(np.stack([it['X'] for it in chunk]), dtype=torch.float32)
+            batches.append((X, np.array([it['y'] for it in chunk])))
+
+    results = {}
+    with torch.no_grad():
+        for name, model in [("fp32", fp32), ("int8", int8)]:
+            model(batches[0][0])  # warm up
+            preds, trues, lat = [], [], []
+            for _ in range(repeat):
+                preds, trues = [], []
+                for X, y in batches:
+                    t0 = time.perf_counter()
+                    logits = model(X)
+                    lat.append(time.perf_counter() - t0)
+                    preds.append(logits.argmax(dim=1).numpy())
+                    trues.append(y)
+            preds, trues = np.concatenate(preds), np.concatenate(trues)
+            lat = np.array(lat) * 1e3
+            results[name] = {
+                "preds": preds,
+                "acc": float((preds == trues).mean()),
+                "lat_mean": lat.mean(),
+                "lat_p95": np.percentile(lat, 95),
+            }
+
+    size32 = os.path.getsize(model_path) / 1024
+    size8 = os.path.getsize(quantized_path) / 1024
+    r32, r8 = results["fp32"], results["int8"]
+    agree = (r32["preds"] == r8["preds"]).mean() * 100
+
+    print(f"{len(test_items)} test sequences, batches of {batch_size}, torch threads={torch.get_num_threads()}")
+    print(f"{'model':<6s} {'accuracy':>9s} {'batch ms':>9s} {'p95 ms':>8s} {'size KiB':>9s}")
+    print(f"{'fp32':<6s} {r32['acc']:9.4f} {r32['lat_mean']:9.3f} {r32['lat_p95']:8.3f} {size32:9.0f}")
+    print(f"{'int8':<6s} {r8['acc']:9.4f} {r8['lat_mean']:9.3f} {r8['lat_p95']:8.3f} {size8:9.0f}")
+    print(f"accuracy delta {r8['acc'] - r32['acc']:+.4f} | label agreement {agree:.1f}% | "
+          f"latency x{r32['lat_mean'] / r8['lat_mean']:.2f} faster | size x{size32 / size8:.2f} smaller")
+    return results
+
+
+if __name__ == "__main__":
+    # from backend/src: PYTHONPATH=. python eval/evaluate.py --lstm ../models/lstm.pth --quantized ../models/lstm.int8.pt --data ../dataset/ts_data.pkl
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--baseline", default=None, help="joblib model (with --csv)")
+    parser.add_argument("--csv", default=None)
+    parser.add_argument("--lstm", default=None, help="fp32 .pth model (with --data)")
+    parser.add_argument("--quantized", default=None, help="int8 .pt export to compare with --lstm")
+    parser.add_argument("--data", default=None)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    if args.baseline:
+        eval_baseline(args.baseline, args.csv)
+    if args.lstm and args.quantized:
+        eval_lstm_quantized(args.lstm, args.quantized, args.data, batch_size=args.batch_size)
+    elif args.lstm:
+        eval_lstm(args.lstm, args.data)
@@ -0,0 +1,58 @@
+import argparse
+import os
+
+import joblib
+import numpy as np
+
+from src.realtime.forest import compile_forest
+
+
+def main(args):
+    print("🔄 Loading model:", args.model)
+    store = joblib.load(args.model)
+
+    clf = store["model"]
+    scaler = store.get("scaler", None)
+    columns = store.get("columns", None)
+
+    if columns is None:
+        raise ValueError("Saved model must include feature 'columns'")
+
+    # -----------------------------
+    # Flatten trees + fold scaler into thresholds
+    # -----------------------------
+    forest = compile_forest(clf, scaler, columns)
+
+    print(f"🌲 Trees: {forest.n_trees} | Nodes: {len(forest.feature)} | Depth: {forest.max_depth}")
+
+    # -----------------------------
+    # Sanity check on random raw inputs around the training data
+    # -----------------------------
+    rng = np.random.default_rng(0)
+    mean = scaler.mean_ if scaler is not None else np.zeros(len(columns))
+    scale = scaler.scale_ if scaler is not None else np.ones(len(columns))
+    X = rng.normal(size=(1000, len(columns))) * scale * 2 + mean
+
+    X32 = ((X - mean) / scale if scaler is not None else X).astype(np.float32)
+    clf.n_jobs = 1
+    if not np.array_equal(clf.predict_proba(X32), forest.predict_proba(X)):
+        raise RuntimeError("Compiled forest does not match the original model")
+
+    # -----------------------------
+    # Save (.npz, loadable by ModelServer without sklearn)
+    # -----------------------------
+    out_dir = os.path.dirname(args.out)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    forest.save(args.out)
+
+    print("✅ Compiled forest saved to:", args.out,
+          f"({os.path.getsize(args.out) / 1024:.0f} KiB, was {os.path.getsize(args.model) / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="models/rf_baseline.joblib")
+    parser.add_argument("--out", default="models/rf_baseline.npz")
+    args = parser.parse_args()
+    main(args)
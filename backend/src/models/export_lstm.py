@@ -0,0 +1,94 @@
+# src/models/export_lstm.py
+"""
+Export a trained SimpleLSTM (.pth) as a scripted, dynamically quantized
+(int8 weights, fp32 activations) TorchScript model for CPU serving.
+
+nn.LSTM and nn.Linear weights are stored as int8 and activations are
+quantized on the fly, so no calibration data is needed. The metadata
+(columns, input_dim, num_classes, seq_len) is embedded in the file, so
+ModelServer can load it on its own.
+
+Usage (from backend/):
+python -m src.models.export_lstm --model models/lstm.pth
+python -m src.models.export_lstm --model models/lstm.pth --metadata dataset/ts_data.pkl.meta.pkl --out models/lstm.int8.pt
+"""
+import argparse
+import json
+import os
+import pickle
+
+import torch
+import torch.nn as nn
+
+from src.models.model_def import SimpleLSTM
+
+
+def quantize(model):
+    """
+    Dynamic int8 quantization of the LSTM and Linear layers, scripted.
+    """
+    model.eval()
+    qmodel = torch.ao.quantization.quantize_dynamic(
+        model, {nn.LSTM, nn.Linear}, dtype=torch.qint8
+    )
+    return torch.jit.script(qmodel)
+
+
+def main(args):
+    print("🔄 Loading model:", args.model)
+    meta = pickle.load(open(args.metadata, "rb"))
+
+    input_dim = meta.get("input_dim")
+    if input_dim is None:
+        raise ValueError("metadata must contain 'input_dim' for LSTM")
+
+    model = SimpleLSTM(
+        input_dim=input_dim,
+        hidden_dim=128,
+        num_layers=2,
+        output_dim=meta.get("num_classes", 3),
+    )
+    model.load_state_dict(torch.load(args.model, map_location="cpu"))
+    model.eval()
+
+    scripted = quantize(model)
+
+    # -----------------------------
+    # Sanity check on random inputs (int8 is close, not identical)
+    # -----------------------------
+    seq_len = meta.get("seq_len", 5)
+    torch.manual_seed(0)
+    X = torch.randn(1000, seq_len, input_dim)
+    with torch.no_grad():
+        p32 = torch.softmax(model(X), dim=1)
+        p8 = torch.softmax(scripted(X), dim=1)
+    agree = (p32.argmax(dim=1) == p8.argmax(dim=1)).float().mean().item() * 100
+    print(f"🔍 fp32 vs int8 on random inputs: max |proba diff| {(p32 - p8).abs().max():.2e}, "
+          f"label agreement {agree:.1f}%")
+
+    # -----------------------------
+    # Save next to the .pth, metadata embedded
+    # -----------------------------
+    out = args.out or os.path.splitext(args.model)[0] + ".int8.pt"
+    embedded = {
+        "columns": meta.get("columns"),
+        "input_dim": input_dim,
+        "num_classes": meta.get("num_classes", 3),
+        "seq_len": seq_len,
+        "quantization": "dynamic-int8",
+        "source": os.path.basename(args.model),
+    }
+    torch.jit.save(scripted, out, _extra_files={"metadata.json": json.dumps(embedded)})
+
+    print("✅ Quantized model saved to:", out,
+          f"({os.path.getsize(out) / 1024:.0f} KiB, was {os.path.getsize(args.model) / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", required=True)
+    parser.add_argument("--metadata", default="dataset/ts_data.pkl.meta.pkl")
+    parser.add_argument("--out", default=None,
+                        help="default: <model>.int8.pt next to the .pth")
+    args = parser.parse_args()
+    main(args)
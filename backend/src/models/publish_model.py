@@ -0,0 +1,77 @@
+# src/models/publish_model.py
+"""
+Publish a trained forest into the local model registry
+(src/realtime/registry.py) as a new version, or list / verify versions.
+
+The joblib model is compiled (scaler folded in, see
+src/realtime/forest.py) and stored as memory-mappable .npy arrays with a
+manifest of columns, classes, content hash and the sha256 of the
+training data. Serve it with COGNITIVESENSE_MODEL=models/registry/<name>
+(latest version) or .../<name>/v<N>.
+
+Usage (from backend/):
+python -m src.models.publish_model --model models/rf_baseline.joblib --data dataset/final_dataset.csv
+python -m src.models.publish_model --name rf_baseline --list
+python -m src.models.publish_model --name rf_baseline --verify
+"""
+import argparse
+import os
+
+from src.realtime.registry import ModelRegistry
+
+
+def main(args):
+    registry = ModelRegistry(args.registry)
+    name = args.name or os.path.splitext(os.path.basename(args.model))[0]
+
+    if args.list:
+        for version in registry.versions(name):
+            m = registry.manifest(name, version)
+            data = m["training_data"]["sha256"][:12] if m["training_data"] else "-"
+            print(f"v{version}  {m['content_hash'][:12]}  trees={m['n_trees']}  "
+                  f"columns={len(m['columns'])}  data={data}")
+        return
+
+    if args.verify:
+        registry.verify(name, args.version)
+        print(f"✅ {registry.path(name, args.version)}: all hashes match")
+        return
+
+    if args.model.endswith(".npz"):
+        from src.realtime.forest import CompiledForest
+        forest = CompiledForest.load(args.model)
+    else:
+        import joblib
+        from src.realtime.forest import compile_forest
+
+        print("🔄 Loading model:", args.model)
+        store = joblib.load(args.model)
+        if store.get("columns") is None:
+            raise ValueError("Saved model must include feature 'columns'")
+        forest = compile_forest(store["model"], store.get("scaler"), store["columns"])
+
+    known = set(registry.versions(name))
+    manifest = registry.publish(forest, name, training_data=args.data, source=args.model)
+    path = registry.path(name, manifest["version"])
+
+    if manifest["version"] in known:
+        print(f"ℹ️ Same content already published as {path}")
+    else:
+        size = sum(os.path.getsize(os.path.join(path, a["file"]))
+                   for a in manifest["arrays"].values())
+        print(f"✅ Published {path} ({size / 1024:.0f} KiB, "
+              f"content {manifest['content_hash'][:12]})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="models/rf_baseline.joblib",
+                        help=".joblib (compiled on the fly) or compiled .npz")
+    parser.add_argument("--name", default=None, help="default: model file name")
+    parser.add_argument("--data", default=None, help="training data, recorded by hash")
+    parser.add_argument("--registry", default="models/registry")
+    parser.add_argument("--list", action="store_true")
+    parser.add_argument("--verify", action="store_true")
+    parser.add_argument("--version", type=int, default=None)
+    args = parser.parse_args()
+    main(args)
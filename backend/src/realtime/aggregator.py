@@ -1,8 +1,9 @@
 import time
 
-from src.realtime.keyboard_listener import KeyboardCollector
-from src.realtime.mouse_listener import MouseCollector
-from src.realtime.eye_tracker import EyeTracker
+from src.realtime.metrics import COLLECT, EYE_FLUSH, KEYBOARD_FLUSH, MOUSE_FLUSH
+from src.realtime.window_clock import WindowClock
+
+SENSORS = ("keyboard", "mouse", "eye")
 
 
 def _clamp(x, lo=0.0, hi=1.0):
@@ -10,52 +11,212 @@ def _clamp(x, lo=0.0, hi=1.0):
 
 
 class RealTimeAggregator:
-    def __init__(self):
-        self.keyboard = KeyboardCollector()
-        self.mouse = MouseCollector()
-        self.eye = EyeTracker()   # 👁️ EAR + Blink rate
+    def __init__(self, sensors=SENSORS, stats="exact", hop_sec=None):
+        """
+        sensors: subset of SENSORS to enable. Each collector (and its
+        pynput / cv2 / mediapipe import) is only loaded when enabled;
+        a disabled sensor contributes no features (the model fills 0.0).
+        stats:   "exact" (buffer events, compute features at flush) or
+                 "streaming" (running statistics updated per event,
+                 O(1) flush; see src/realtime/running_stats.py)
+        hop_sec: None for tumbling windows (one window of window_sec
+                 every window_sec). A number gives sliding windows:
+                 every hop_sec, the last window_sec of input, updated
+                 incrementally (src/realtime/sliding.py; needs
+                 stats="exact").
+        """
+        unknown = set(sensors) - set(SENSORS)
+        if unknown:
+            raise ValueError(f"Unknown sensors: {sorted(unknown)}")
+        if hop_sec is not None:
+            if hop_sec <= 0:
+                raise ValueError("hop_sec must be > 0")
+            if stats != "exact":
+                raise ValueError("Sliding windows need stats='exact' (raw events)")
+        self.hop_sec = hop_sec
+
+        # input from `input_since` onwards first shows up in the latest
+        # features (their age measures input-to-prediction latency)
+        self.input_since = None
+        self._drained_at = time.time()
+
+        # deadlines every window_sec (tumbling) or hop_sec (sliding),
+        # shared by every caller of collect_features
+        self.clock = None
+
+        self.keyboard = None
+        self.mouse = None
+        self.eye = None
+
+        if "keyboard" in sensors:
+            from src.realtime.keyboard_listener import KeyboardCollector
+            self.keyboard = KeyboardCollector(stats=stats)
+        if "mouse" in sensors:
+            from src.realtime.mouse_listener import MouseCollector
+            self.mouse = MouseCollector(stats=stats)
+        if "eye" in sensors:
+            from src.realtime.eye_tracker import EyeTracker
+            self.eye = EyeTracker()   # 👁️ EAR + Blink rate
+
+        if hop_sec is not None:
+            from src.realtime.sliding import SlidingEye, SlidingKeyboard, SlidingMouse
+            self._sliding_keyboard = SlidingKeyboard()
+            self._sliding_mouse = SlidingMouse()
+            self._sliding_eye = SlidingEye()
 
     def start(self):
-        self.keyboard.start()
-        self.mouse.start()
+        if self.keyboard is not None:
+            self.keyboard.start()
+        if self.mouse is not None:
+            self.mouse.start()
 
-    def collect_features(self, label=None):
+    def collect_features(self, label=None, window_sec=3):
         """
-        Collect features over a 3-second sliding window.
-        Optionally attach label (for dataset collection).
+        Collect features over a `window_sec`-second window (default 3).
+        Blocks until the next deadline of self.clock, which ticks every
+        `window_sec` (tumbling) or `hop_sec` (sliding) whatever the
+        caller does between calls. Optionally attach label (for dataset
+        collection).
+
+        features["window_start"] / ["window_end"] (epoch seconds) give
+        the span actually covered: since the previous call for
+        tumbling windows (longer than window_sec after a missed
+        deadline), the last window_sec for sliding ones.
         """
-        time.sleep(3)
+        period = window_sec if self.hop_sec is None else self.hop_sec
+        if self.clock is None or self.clock.period != period:
+            self.clock = WindowClock(period)
+        self.clock.wait()
+
+        t_start = time.perf_counter()
+        now = time.time()
+        self.input_since, self._drained_at = self._drained_at, now
+
+        if self.hop_sec is None:
+            window_start = self.input_since
+            # rates over the real span, not the nominal one
+            features, eye_feats = self._flush(now - window_start)
+        else:
+            window_start = now - window_sec
+            features, eye_feats = self._slide(now, window_sec)
+        features["window_start"] = window_start
+        features["window_end"] = now
+
+        # ---------------- Fatigue Score (🔥 NEW) ----------------
+        # eye only: without it the defaults below would read as ~60
+        if self.eye is not None:
+            ear = eye_feats.get("eye_aspect_mean", 0.0)
+            blinks = eye_feats.get("eye_blink_rate", 0)
+
+            ear_component = _clamp((0.28 - ear) / 0.10)
+            blink_component = _clamp(blinks / 8.0)
+
+            fatigue_score = int(100 * (0.6 * ear_component + 0.4 * blink_component))
+            features["fatigue_score"] = fatigue_score
+
+        # ---------------- Optional label ----------------
+        if label is not None:
+            features["label"] = int(label)
+
+        # everything after the wait: flushes + derived features
+        COLLECT.observe(time.perf_counter() - t_start)
+        return features
 
+    def _flush(self, window_sec):
+        """
+        Tumbling window: everything since the last flush.
+        """
         features = {}
 
         # ---------------- Keyboard features ----------------
-        kb_feats = self.keyboard.flush()
-        features.update(kb_feats)
+        if self.keyboard is not None:
+            t0 = time.perf_counter()
+            features.update(self.keyboard.flush(window_sec=window_sec))
+            KEYBOARD_FLUSH.observe(time.perf_counter() - t0)
 
         # ---------------- Mouse features ----------------
-        mouse_feats = self.mouse.flush()
-        features.update(mouse_feats)
+        if self.mouse is not None:
+            t0 = time.perf_counter()
+            features.update(self.mouse.flush())
+            MOUSE_FLUSH.observe(time.perf_counter() - t0)
 
         # ---------------- Eye features ----------------
         # eye_feats = {
         #   "eye_aspect_mean": float,
         #   "eye_blink_rate": int
         # }
-        eye_feats = self.eye.flush()
+        eye_feats = {}
+        if self.eye is not None:
+            t0 = time.perf_counter()
+            eye_feats = self.eye.flush()
+            EYE_FLUSH.observe(time.perf_counter() - t0)
         features.update(eye_feats)
+        return features, eye_feats
 
-        # ---------------- Fatigue Score (🔥 NEW) ----------------
-        ear = eye_feats.get("eye_aspect_mean", 0.0)
-        blinks = eye_feats.get("eye_blink_rate", 0)
-
-        ear_component = _clamp((0.28 - ear) / 0.10)
-        blink_component = _clamp(blinks / 8.0)
-
-        fatigue_score = int(100 * (0.6 * ear_component + 0.4 * blink_component))
-        features["fatigue_score"] = fatigue_score
-
-        # ---------------- Optional label ----------------
-        if label is not None:
-            features["label"] = int(label)
+    def _slide(self, now, window_sec):
+        """
+        Sliding window: add the events since the last hop, evict those
+        older than `window_sec`.
+        """
+        features = {}
+        t_min = now - window_sec
+
+        if self.keyboard is not None:
+            t0 = time.perf_counter()
+            ev = self.keyboard.drain()
+            engine = self._sliding_keyboard
+            for t, code, down in zip(ev["t"].tolist(), ev["code"].tolist(), ev["down"].tolist()):
+                engine.add(t, code, down)
+            engine.evict(t_min)
+            features.update(engine.features(window_sec))
+            KEYBOARD_FLUSH.observe(time.perf_counter() - t0)
+
+        if self.mouse is not None:
+            t0 = time.perf_counter()
+            moves, clicks = self.mouse.drain()
+            engine = self._sliding_mouse
+            for t, x, y in zip(moves["t"].tolist(), moves["x"].tolist(), moves["y"].tolist()):
+                engine.add_move(t, x, y)
+            for t in clicks["t"].tolist():
+                engine.add_click(t)
+            engine.evict(t_min)
+            features.update(engine.features())
+            MOUSE_FLUSH.observe(time.perf_counter() - t0)
+
+        eye_feats = {}
+        if self.eye is not None:
+            t0 = time.perf_counter()
+            samples = self.eye.drain()
+            engine = self._sliding_eye
+            for t, ear, blink in zip(samples["t"].tolist(), samples["ear"].tolist(),
+                                     samples["blink"].tolist()):
+                engine.add(t, ear, blink)
+            engine.evict(t_min)
+            eye_feats = engine.features()
+            EYE_FLUSH.observe(time.perf_counter() - t0)
+        features.update(eye_feats)
+        return features, eye_feats
 
-        return features
+    def buffered(self):
+        """
+        Events waiting for the next flush, per enabled sensor.
+        """
+        return {
+            name: sensor.buffered()
+            for name, sensor in (
+                ("keyboard", self.keyboard),
+                ("mouse", self.mouse),
+                ("eye", self.eye),
+            )
+            if sensor is not None
+        }
+
+    def lost(self):
+        """
+        Events lost to ring buffer overflow, per enabled input sensor.
+        """
+        return {
+            name: sensor.lost()
+            for name, sensor in (("keyboard", self.keyboard), ("mouse", self.mouse))
+            if sensor is not None
+        }
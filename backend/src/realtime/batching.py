@@ -0,0 +1,149 @@
+"""Dynamic micro-batching for /predict.
+
+Concurrent requests are held for at most `max_wait_ms` (or until
+`max_batch` rows are waiting), stacked into one matrix and scored with
+a single ModelServer.predict_batch call in a worker thread; each
+caller's future is then resolved with its own row.
+
+If the batch call fails (e.g. one request sent a non-numeric value),
+its rows are scored one by one so only the bad request fails.
+"""
+
+import asyncio
+import time
+from collections import deque
+
+import numpy as np
+
+
+class MicroBatcher:
+    def __init__(self, predict_batch, max_batch=64, max_wait_ms=2.0):
+        """
+        predict_batch: callable(list of feature dicts) -> list of results
+                       (normally ModelServer.predict_batch)
+        """
+        self.predict_batch = predict_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = None
+        self._task = None
+
+        # metrics
+        self.batches = 0
+        self.rows = 0
+        self.errors = 0
+        self.batch_sizes = {}                   # size -> count
+        self._queue_delays = deque(maxlen=2048)  # seconds, most recent
+
+    # --------------------------------------------------
+    # LIFECYCLE
+    # --------------------------------------------------
+    def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    # --------------------------------------------------
+    # SUBMIT
+    # --------------------------------------------------
+    async def submit(self, feat_dict):
+        if self._task is None:
+            self.start()
+        fut = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((feat_dict, fut, time.perf_counter()))
+        return await fut
+
+    # --------------------------------------------------
+    # BATCH LOOP
+    # --------------------------------------------------
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    # drain whatever is already waiting, without waiting
+                    while len(batch) < self.max_batch and not self._queue.empty():
+                        batch.append(self._queue.get_nowait())
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._score(batch)
+
+    async def _score(self, batch):
+        started = time.perf_counter()
+        for _, _, enqueued in batch:
+            self._queue_delays.append(started - enqueued)
+
+        rows = [feat for feat, _, _ in batch]
+        try:
+            results = await asyncio.to_thread(self.predict_batch, rows)
+        except Exception as e:
+            if len(rows) == 1:
+                results = [e]
+            else:
+                # isolate the failing row(s)
+                results = await asyncio.to_thread(self._score_each, rows)
+
+        for (_, fut, _), res in zip(batch, results):
+            if isinstance(res, Exception):
+                self.errors += 1
+                if not fut.done():
+                    fut.set_exception(res)
+            elif not fut.done():
+                fut.set_result(res)
+
+        n = len(batch)
+        self.batches += 1
+        self.rows += n
+        self.batch_sizes[n] = self.batch_sizes.get(n, 0) + 1
+
+    def _score_each(self, rows):
+        """
+        One predict_batch call per row; a row's exception is returned
+        in place of its result.
+        """
+        results = []
+        for row in rows:
+            try:
+                results.append(self.predict_batch([row])[0])
+            except Exception as e:
+                results.append(e)
+        return results
+
+    # --------------------------------------------------
+    # METRICS
+    # --------------------------------------------------
+    def snapshot_stats(self):
+        delays = np.array(self._queue_delays) * 1e3
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1e3,
+            "batches": self.batches,
+            "rows": self.rows,
+            "errors": self.errors,
+            "mean_batch_size": self.rows / self.batches if self.batches else 0.0,
+            "batch_sizes": dict(sorted(self.batch_sizes.items())),
+            "queue_delay_ms": {
+                "mean": float(delays.mean()) if len(delays) else 0.0,
+                "p50": float(np.percentile(delays, 50)) if len(delays) else 0.0,
+                "p99": float(np.percentile(delays, 99)) if len(delays) else 0.0,
+            },
+        }
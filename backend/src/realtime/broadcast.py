@@ -0,0 +1,334 @@
+"""WebSocket broadcast hub.
+
+Every client gets a bounded queue and its own sender task, so
+`broadcast()` only enqueues and never waits on a socket. A slow client
+loses its oldest (stale) frames when its queue is full, and is evicted
+after repeated send timeouts; the other clients are unaffected.
+
+Each distinct frame (v1 full payload, v2 delta, v2 snapshot, per
+subscription projection and encoding) is built and encoded once per
+broadcast and that same frame is queued for every client that needs
+it. See src/realtime/protocol.py.
+"""
+
+import asyncio
+import time
+
+from fastapi import WebSocket
+
+from src.realtime.metrics import BROADCAST, ENCODE
+from src.realtime.protocol import (
+    MSGPACK_AVAILABLE,
+    encode_frame,
+    is_empty_delta,
+    make_delta,
+    make_snapshot,
+    normalize_fields,
+    project,
+)
+
+
+class ClientConnection:
+    def __init__(self, websocket: WebSocket, queue_size, protocol=1, encoding="json"):
+        self.websocket = websocket
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.task = None
+        self.closed = False
+
+        self.protocol = protocol
+        self.encoding = encoding
+
+        # subscription (see protocol.py)
+        self.fields = None
+        self.min_interval = 0.0
+        self.on_change = False
+
+        # last state queued for this client (projected) and its seq
+        self.last_state = None
+        self.last_seq = None
+        self.last_queued_at = 0.0
+
+        self.sent = 0
+        self.dropped = 0
+        self.skipped = 0
+        self.timeouts = 0
+        self.consecutive_timeouts = 0
+
+
+class BroadcastHub:
+    def __init__(self, queue_size=4, send_timeout=2.0, max_timeouts=3):
+        """
+        queue_size:   frames buffered per client before dropping the oldest
+        send_timeout: seconds a single send may take
+        max_timeouts: consecutive send timeouts before the client is evicted
+        """
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.max_timeouts = max_timeouts
+
+        self.clients = {}
+
+        # last broadcast state (for snapshots) and its sequence number
+        self.state = None
+        self.seq = 0
+        self._projections = {}
+        self._deltas = {}
+        self._frames = {}
+
+        self.stats = {
+            "connections_total": 0,
+            "frames_broadcast": 0,
+            "frames_sent": 0,
+            "frames_dropped": 0,
+            "frames_skipped": 0,
+            "snapshots_queued": 0,
+            "send_timeouts": 0,
+            "send_errors": 0,
+            "evictions": 0,
+        }
+
+    @property
+    def active_connections(self):
+        return list(self.clients)
+
+    # --------------------------------------------------
+    # CONNECT / DISCONNECT
+    # --------------------------------------------------
+    async def connect(self, websocket: WebSocket, protocol=1, encoding="json"):
+        await websocket.accept()
+
+        if protocol == 1 or (encoding == "msgpack" and not MSGPACK_AVAILABLE):
+            encoding = "json"
+
+        client = ClientConnection(websocket, self.queue_size, protocol, encoding)
+        client.task = asyncio.create_task(self._sender(client))
+        self.clients[websocket] = client
+        self.stats["connections_total"] += 1
+        return client
+
+    def disconnect(self, websocket: WebSocket):
+        client = self.clients.pop(websocket, None)
+        if client is None:
+            return
+        # the flag also covers a cancel swallowed by wait_for (py < 3.12)
+        client.closed = True
+        if client.task is not None:
+            if client.task is not asyncio.current_task():
+                client.task.cancel()
+
+    async def evict(self, client: ClientConnection, reason=""):
+        self.stats["evictions"] += 1
+        self.disconnect(client.websocket)
+        try:
+            await asyncio.wait_for(
+                client.websocket.close(code=1013, reason=reason),
+                timeout=self.send_timeout
+            )
+        except Exception:
+            pass
+
+    # --------------------------------------------------
+    # SUBSCRIPTIONS
+    # --------------------------------------------------
+    def subscribe(self, websocket: WebSocket, fields=None, max_rate=None, on_change=False):
+        """
+        Change what a client receives; raises ValueError on bad input.
+        The client immediately gets its new projection.
+        """
+        client = self.clients.get(websocket)
+        if client is None:
+            return
+
+        fields = normalize_fields(fields)
+        if max_rate is not None and max_rate <= 0:
+            raise ValueError("max_rate must be > 0")
+
+        client.fields = fields
+        client.min_interval = 1.0 / max_rate if max_rate else 0.0
+        client.on_change = bool(on_change)
+        client.last_state = None
+        client.last_seq = None
+
+        self.send_snapshot(websocket)
+
+    # --------------------------------------------------
+    # FRAMES (built / encoded at most once per broadcast)
+    # --------------------------------------------------
+    def _project(self, fields):
+        proj = self._projections.get(fields)
+        if proj is None:
+            proj = project(self.state, fields)
+            self._projections[fields] = proj
+        return proj
+
+    def _frame(self, key, build):
+        frame = self._frames.get(key)
+        if frame is None:
+            t0 = time.perf_counter()
+            message, encoding = build()
+            frame = encode_frame(message, encoding)
+            ENCODE.observe(time.perf_counter() - t0)
+            self._frames[key] = frame
+        return frame
+
+    def _full_frame(self, client):
+        return self._frame(
+            ("full", client.fields),
+            lambda: (self._project(client.fields), "json")
+        )
+
+    def _snapshot_frame(self, client):
+        return self._frame(
+            ("snapshot", client.fields, client.encoding),
+            lambda: (
+                make_snapshot(self.seq, self._project(client.fields), client.encoding),
+                client.encoding
+            )
+        )
+
+    def _delta(self, client):
+        """
+        Delta from the client's last queued state to the current one,
+        shared by all clients with the same fields and last seq.
+        """
+        key = (client.fields, client.last_seq)
+        delta = self._deltas.get(key)
+        if delta is None:
+            delta = make_delta(
+                self.seq,
+                client.last_state,
+                self._project(client.fields),
+                base=client.last_seq
+            )
+            self._deltas[key] = delta
+        return delta
+
+    def _delta_frame(self, client):
+        delta = self._delta(client)
+        return self._frame(
+            ("delta", client.fields, client.encoding, client.last_seq),
+            lambda: (delta, client.encoding)
+        )
+
+    # --------------------------------------------------
+    # FAN-OUT
+    # --------------------------------------------------
+    def send_to(self, websocket: WebSocket, message):
+        """
+        Queue a one-off message (e.g. an error) for one client.
+        """
+        client = self.clients.get(websocket)
+        if client is not None:
+            self._enqueue(client, encode_frame(message, client.encoding))
+
+    def send_snapshot(self, websocket: WebSocket):
+        """
+        Queue the current state for one client (on connect / resync /
+        subscribe). Never blocks.
+        """
+        client = self.clients.get(websocket)
+        if client is None or self.state is None:
+            return
+        if client.protocol == 1:
+            self._enqueue(client, self._full_frame(client))
+        else:
+            self._enqueue_snapshot(client)
+        self._mark_queued(client, time.monotonic())
+
+    async def broadcast(self, message):
+        t0 = time.perf_counter()
+        self._broadcast(message)
+        BROADCAST.observe(time.perf_counter() - t0)
+
+    def _broadcast(self, message):
+        self.state = message
+        self.seq += 1
+        self._projections = {}
+        self._deltas = {}
+        self._frames = {}
+
+        self.stats["frames_broadcast"] += 1
+        now = time.monotonic()
+
+        for client in list(self.clients.values()):
+            if now - client.last_queued_at < client.min_interval:
+                self._skip(client)
+                continue
+
+            if client.on_change and client.last_state is not None:
+                if is_empty_delta(self._delta(client)):
+                    self._skip(client)
+                    continue
+
+            if client.protocol == 1:
+                self._enqueue(client, self._full_frame(client))
+            elif client.last_state is None:
+                self._enqueue_snapshot(client)
+            else:
+                self._enqueue(client, self._delta_frame(client))
+
+            self._mark_queued(client, now)
+
+    def _skip(self, client: ClientConnection):
+        client.skipped += 1
+        self.stats["frames_skipped"] += 1
+
+    def _mark_queued(self, client: ClientConnection, now):
+        client.last_state = self._project(client.fields)
+        client.last_seq = self.seq
+        client.last_queued_at = now
+
+    def _enqueue(self, client: ClientConnection, frame):
+        if not client.queue.full():
+            client.queue.put_nowait(frame)
+            return
+
+        if client.protocol == 1:
+            # drop the stalest frame, keep the newest
+            client.queue.get_nowait()
+            client.dropped += 1
+            self.stats["frames_dropped"] += 1
+            client.queue.put_nowait(frame)
+        else:
+            # deltas can't be skipped: replace the backlog with a snapshot
+            self._enqueue_snapshot(client)
+
+    def _enqueue_snapshot(self, client: ClientConnection):
+        while not client.queue.empty():
+            client.queue.get_nowait()
+            client.dropped += 1
+            self.stats["frames_dropped"] += 1
+        client.queue.put_nowait(self._snapshot_frame(client))
+        self.stats["snapshots_queued"] += 1
+
+    async def _sender(self, client: ClientConnection):
+        ws = client.websocket
+        while not client.closed:
+            kind, data = await client.queue.get()
+            send = ws.send_text if kind == "text" else ws.send_bytes
+            try:
+                await asyncio.wait_for(send(data), timeout=self.send_timeout)
+            except asyncio.TimeoutError:
+                client.timeouts += 1
+                client.consecutive_timeouts += 1
+                self.stats["send_timeouts"] += 1
+                if client.consecutive_timeouts >= self.max_timeouts:
+                    await self.evict(client, "too slow")
+                    return
+                continue
+            except Exception:
+                self.stats["send_errors"] += 1
+                self.disconnect(client.websocket)
+                return
+
+            client.sent += 1
+            client.consecutive_timeouts = 0
+            self.stats["frames_sent"] += 1
+
+    def snapshot_stats(self):
+        return {
+            **self.stats,
+            "seq": self.seq,
+            "connections_active": len(self.clients),
+            "queued_frames": sum(c.queue.qsize() for c in self.clients.values()),
+        }
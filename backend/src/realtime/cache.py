@@ -0,0 +1,86 @@
+"""LRU cache of single-row predictions.
+
+Many live windows are identical (all zeros while the user reads) or
+nearly so. The cache maps a canonical encoding of the raw feature row,
+in model column order, to the prediction. With `quantum` set (a scalar,
+or one value per column), values are snapped to multiples of it first,
+so near-identical rows share an entry (the cached answer is then the
+one for the first such row).
+
+A cache belongs to one loaded model; a hot-reload builds a new
+ModelServer and therefore starts with an empty cache.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PredictionCache:
+    def __init__(self, max_size=1024, quantum=None):
+        self.max_size = max_size
+        self.quantum = None if quantum is None else np.asarray(quantum, dtype=np.float64)
+
+        if self.quantum is not None:
+            # quantum 0 = keep that column exact
+            self._exact = self.quantum <= 0
+            self._step = np.where(self._exact, 1.0, self.quantum)
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, row):
+        """
+        Hashable key for a raw float64 row (model column order).
+        """
+        if self.quantum is not None:
+            row = np.where(self._exact, row, np.rint(row / self._step) * self._step)
+        # + 0.0 folds -0.0 into 0.0 so both encode the same
+        return (row + 0.0).tobytes()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def reset(self):
+        """
+        clear() and zero the counters (after warm-up predictions).
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def snapshot_stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "quantum": None if self.quantum is None else self.quantum.tolist(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,167 @@
+"""Confidence cascade over several models.
+
+Stage 0 is the ModelServer the cascade belongs to (normally the cheap
+forest); further stages are heavier models (e.g. the LSTM). A window is
+scored by stage 0 and escalated to the next stage only while the
+current answer's confidence (max class probability) is below that
+stage's threshold; the last stage always answers. Results carry the
+index of the stage that answered ("stage").
+
+Batches escalate only their unconfident rows. Inputs use the union of
+all stages' columns (stage 0 first); each stage reads its own.
+
+LSTM stages after stage 0 with streams in "window" mode are lazy: the
+cascade keeps the last seq_len windows of each stream and only runs
+the LSTM over them when a window escalates (the same answer as stepping
+the stream every window). In "carry" mode the stream has to see every
+window, so those stages are stepped each time.
+"""
+
+import os
+import threading
+from collections import deque
+
+import numpy as np
+
+
+class Cascade:
+    def __init__(self, stages):
+        """
+        stages: [(ModelServer, threshold), ...] in escalation order; the
+                last stage's threshold is ignored.
+        """
+        if not stages:
+            raise ValueError("Cascade needs at least one stage")
+
+        self.stages = stages
+
+        # union of input columns, stage 0 first; per-stage indices into it
+        columns = []
+        for server, _ in stages:
+            columns += [c for c in server.input_columns if c not in columns]
+        self.columns = columns
+        col_index = {c: i for i, c in enumerate(columns)}
+        self._indices = [
+            np.array([col_index[c] for c in server.input_columns], dtype=np.intp)
+            for server, _ in stages
+        ]
+        self._identity = [
+            np.array_equal(idx, np.arange(len(columns))) for idx in self._indices
+        ]
+
+        # recent windows of each stream, for lazy LSTM stages
+        self._lazy = [
+            k > 0 and server.model_type == "lstm" and server.lstm_mode == "window"
+            for k, (server, _) in enumerate(stages)
+        ]
+        self._history = {}
+        self._lock = threading.Lock()
+
+        self.answered = [0] * len(stages)
+
+    def _confident(self, k, proba):
+        return k == len(self.stages) - 1 or max(proba) >= self.stages[k][1]
+
+    # -------------------------------------------------
+    # Single window
+    # -------------------------------------------------
+    def predict(self, feat_dict, stream=None):
+        if stream is not None and any(self._lazy):
+            seq_len = max(s.seq_len for (s, _), lazy in zip(self.stages, self._lazy) if lazy)
+            with self._lock:
+                history = self._history.get(stream)
+                if history is None:
+                    history = self._history[stream] = deque(maxlen=seq_len)
+                history.append(feat_dict)
+
+        for k, (server, _) in enumerate(self.stages):
+            if self._lazy[k] and stream is not None:
+                with self._lock:
+                    rows = list(self._history[stream])[-server.seq_len:]
+                result = server.predict_sequence(rows)
+            else:
+                result = server._predict_one(feat_dict, stream)
+
+            if self._confident(k, result["proba"]):
+                break
+
+        # carried LSTM state must see every window, answered or not
+        if stream is not None:
+            for server, _ in self.stages[k + 1:]:
+                if server.model_type == "lstm" and server.lstm_mode == "carry":
+                    server._predict_one(feat_dict, stream)
+
+        with self._lock:
+            self.answered[k] += 1
+        return dict(result, stage=k)
+
+    def reset_stream(self, stream_id):
+        with self._lock:
+            self._history.pop(stream_id, None)
+        for server, _ in self.stages:
+            server._reset_stream(stream_id)
+
+    # -------------------------------------------------
+    # Batches (rows are independent)
+    # -------------------------------------------------
+    def predict_matrix(self, X):
+        """
+        X: raw float64 matrix over self.columns.
+        Returns (pred, proba, stage) arrays, one row per input.
+        """
+        n = len(X)
+        pred = np.zeros(n, dtype=int)
+        proba = None
+        stage = np.zeros(n, dtype=int)
+
+        todo = np.arange(n)
+        for k, (server, threshold) in enumerate(self.stages):
+            if len(todo) == 0:
+                break
+            idx = self._indices[k]
+            Xk = X[todo] if self._identity[k] else X[np.ix_(todo, idx)]
+            p, pr = server._predict_matrix_one(Xk)
+
+            if proba is None:
+                proba = np.zeros((n, pr.shape[1]))
+            done = (
+                np.ones(len(todo), dtype=bool) if k == len(self.stages) - 1
+                else pr.max(axis=1) >= threshold
+            )
+            rows = todo[done]
+            pred[rows] = p[done]
+            proba[rows] = pr[done]
+            stage[rows] = k
+            with self._lock:
+                self.answered[k] += int(done.sum())
+            todo = todo[~done]
+
+        if proba is None:
+            proba = np.zeros((0, 0))
+        return pred, proba, stage
+
+    def add_answered(self, stage):
+        """
+        Count answers given by another copy of this cascade (process-pool
+        workers each run their own); `stage` as from predict_matrix.
+        """
+        counts = np.bincount(stage, minlength=len(self.stages))
+        with self._lock:
+            for k, c in enumerate(counts.tolist()):
+                self.answered[k] += c
+
+    def snapshot_stats(self):
+        total = sum(self.answered)
+        return {
+            "windows": total,
+            "escalated": (total - self.answered[0]) / total if total else 0.0,
+            "stages": [
+                {
+                    "model": os.path.basename(server.model_path),
+                    "threshold": threshold if k < len(self.stages) - 1 else None,
+                    "answered": self.answered[k],
+                    "fraction": self.answered[k] / total if total else 0.0,
+                }
+                for k, (server, threshold) in enumerate(self.stages)
+            ],
+        }
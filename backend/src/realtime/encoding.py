@@ -0,0 +1,39 @@
+"""JSON encoding for WebSocket fan-out and large request bodies.
+
+Messages are encoded once per broadcast and the same text frame is
+sent to every client. orjson is used when installed (several times
+faster than the stdlib encoder); otherwise falls back to `json`.
+"""
+
+import json
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _default(obj):
+    # numpy scalars / arrays that slipped into a payload
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def encode_json(message) -> str:
+    """
+    Encode a message to a JSON text frame.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(message, default=_default).decode("utf-8")
+    return json.dumps(message, default=_default, separators=(",", ":"))
+
+
+def decode_json(data):
+    """
+    Decode a JSON request body (bytes or str).
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -1,20 +1,40 @@
-import cv2
 import time
 import numpy as np
 import threading
 
-try:
-    import mediapipe as mp
-    MP_AVAILABLE = True
-except:
-    MP_AVAILABLE = False
+from src.realtime.ringbuffer import EventRing
+
+# cv2 / mediapipe are imported on first EyeTracker() (they take seconds
+# to import); importing this module stays cheap.
+cv2 = None
+mp = None
+
+
+def _load_vision():
+    """
+    Import cv2 + mediapipe once. Returns True if both are usable.
+    """
+    global cv2, mp
+    if cv2 is not None and mp is not None:
+        return True
+    try:
+        import cv2 as _cv2
+        import mediapipe as _mp
+    except Exception:
+        return False
+    cv2, mp = _cv2, _mp
+    return True
 
 
 class EyeTracker:
     def __init__(self):
-        self.safe_mode = not MP_AVAILABLE
-        self.ear_values = []
-        self.blink_count = 0
+        self.safe_mode = not _load_vision()
+        # one sample per processed frame with a face: (time, EAR, blink
+        # detected on this frame); written by _run, drained by flush()
+        self.samples = EventRing(
+            [("t", np.float64), ("ear", np.float64), ("blink", np.int8)],
+            capacity=1024,
+        )
         self.prev_ear = None
 
         # thresholds
@@ -22,8 +42,12 @@ class EyeTracker:
         self.MIN_BLINK_GAP = 0.25
         self.last_blink_time = 0
 
+        # frames read per second, updated about once a second
+        self.fps = 0.0
+        self._frames = 0
+
         if self.safe_mode:
-            print("⚠️ EyeTracker SAFE MODE (mediapipe not available)")
+            print("⚠️ EyeTracker SAFE MODE (cv2 / mediapipe not available)")
             return
 
         self.cap = cv2.VideoCapture(0)
@@ -50,10 +74,17 @@ class EyeTracker:
     # BACKGROUND CAMERA LOOP (VERY IMPORTANT)
     # --------------------------------------------------
     def _run(self):
+        fps_start = time.monotonic()
         while self.running:
             self.update()
             time.sleep(0.03)  # ~30 FPS
 
+            elapsed = time.monotonic() - fps_start
+            if elapsed >= 1.0:
+                self.fps = self._frames / elapsed
+                self._frames = 0
+                fps_start += elapsed
+
     def update(self):
         if self.safe_mode:
             return
@@ -61,6 +92,7 @@ class EyeTracker:
         ret, frame = self.cap.read()
         if not ret:
             return
+        self._frames += 1
 
         frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         results = self.face_mesh.process(frame_rgb)
@@ -75,17 +107,18 @@ class EyeTracker:
         eye = [(landmarks[i].x, landmarks[i].y) for i in eye_ids]
 
         ear = self._compute_ear(eye)
-        self.ear_values.append(ear)
 
         # -------- BLINK DETECTION --------
         now = time.time()
+        blink = 0
         if ear < self.BLINK_THRESH:
             if self.prev_ear and self.prev_ear >= self.BLINK_THRESH:
                 if now - self.last_blink_time > self.MIN_BLINK_GAP:
-                    self.blink_count += 1
+                    blink = 1
                     self.last_blink_time = now
 
         self.prev_ear = ear
+        self.samples.push(now, ear, blink)
 
     def _compute_ear(self, eye):
         A = np.linalg.norm(np.array(eye[1]) - np.array(eye[5]))
@@ -96,20 +129,22 @@ class EyeTracker:
     # --------------------------------------------------
     # WINDOW FLUSH (called by aggregator)
     # --------------------------------------------------
+    def buffered(self):
+        return len(self.samples)
+
+    def drain(self):
+        return self.samples.drain()
+
     def flush(self):
-        if not self.ear_values:
+        samples = self.samples.drain()
+        if not len(samples["t"]):
             return {
                 "eye_aspect_mean": 0.0,
                 "eye_blink_rate": 0
             }
 
-        mean_ear = float(np.mean(self.ear_values))
-        blinks = int(self.blink_count)
-
-        # reset window
-        self.ear_values = []
-        self.blink_count = 0
-        self.prev_ear = None
+        mean_ear = float(samples["ear"].mean())
+        blinks = int(samples["blink"].sum())
 
         return {
             "eye_aspect_mean": mean_ear,
@@ -0,0 +1,287 @@
+"""Array-backed Random Forest predictor (numpy only, no sklearn).
+
+compile_forest() flattens a fitted RandomForestClassifier (+ optional
+StandardScaler) into contiguous arrays shared by all trees:
+
+    feature[n]    split feature index (leaves: 0, never used)
+    threshold[n]  split threshold on the RAW feature value (scaler folded in)
+    left[n]       left child node id  (leaves point to themselves)
+    right[n]      right child node id (leaves point to themselves)
+    value[n, k]   normalized class probabilities (used at leaves)
+    roots[t]      root node id of each tree
+
+Folding the scaler: sklearn tests float32((x - mean) / scale) <= t.
+That predicate is monotone in x, so for every split there is a largest
+float64 x for which it holds; it is found by bisection over the float64
+bit patterns and stored as the raw threshold. `x <= threshold` then
+takes exactly the branch sklearn takes, so predictions (and, with the
+same summation order, probabilities) are bit-identical.
+
+The predictor walks every tree for every row at once, one depth level
+per step (max_depth steps in total). That wins for single rows and
+small batches; for large batches sklearn's per-tree C loop is faster
+when it is available.
+"""
+
+import numpy as np
+
+# bisection keys: float64 bit patterns mapped to order-preserving uint64
+_SIGN = np.uint64(0x8000000000000000)
+
+
+def _to_key(x):
+    b = np.ascontiguousarray(x, dtype=np.float64).view(np.uint64)
+    return np.where(b & _SIGN, ~b, b | _SIGN)
+
+
+def _from_key(k):
+    b = np.where(k & _SIGN, k & ~_SIGN, ~k)
+    return b.view(np.float64)
+
+
+def fold_thresholds(threshold, mean, scale):
+    """
+    Largest raw x per split with float32((x - mean) / scale) <= threshold.
+    mean / scale: per-split arrays (0 / 1 when there is no scaler).
+    """
+    def holds(x):
+        with np.errstate(over="ignore", invalid="ignore"):
+            z = ((x - mean) / scale).astype(np.float32)
+        return z.astype(np.float64) <= threshold
+
+    big = np.finfo(np.float64).max
+    lo = _to_key(np.full(threshold.shape, -big))   # predicate true
+    hi = _to_key(np.full(threshold.shape, big))    # predicate false
+
+    for _ in range(64):
+        active = hi - lo > 1
+        if not active.any():
+            break
+        mid = lo + (hi - lo) // np.uint64(2)
+        ok = holds(_from_key(mid))
+        lo = np.where(active & ok, mid, lo)
+        hi = np.where(active & ~ok, mid, hi)
+
+    return _from_key(lo)
+
+
+class CompiledForest:
+    def __init__(self, feature, threshold, left, right, value, roots,
+                 max_depth, classes, columns, tables=None):
+        """
+        tables: precomputed (feature as intp, next-node table), e.g.
+                memory-mapped from the model registry, so that processes
+                share them instead of each deriving a private copy.
+        """
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes = classes
+        self.columns = list(columns)
+
+        # traversal tables: next node = _next[2 * node + (x <= threshold)]
+        if tables is None:
+            tables = self.traversal_tables()
+        self._feature, self._next = tables
+
+    def traversal_tables(self):
+        return (
+            self.feature.astype(np.intp),
+            np.stack([self.right, self.left], axis=1).astype(np.intp).ravel(),
+        )
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (
+            self.feature, self.threshold, self.left, self.right,
+            self.value, self.roots, self._feature, self._next
+        ))
+
+    # --------------------------------------------------
+    # PREDICTION
+    # --------------------------------------------------
+    def apply(self, X, roots=None):
+        """
+        Leaf node ids, shape (n_trees, n_rows), for raw float64 rows X.
+        `roots` selects a subset of trees (default: all).
+        """
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        n_rows, n_cols = X.shape
+        flat = X.ravel()
+        offsets = (np.arange(n_rows, dtype=np.intp) * n_cols)[np.newaxis, :]
+
+        roots = self.roots if roots is None else roots
+        node = np.repeat(roots.astype(np.intp)[:, np.newaxis], n_rows, axis=1)
+        for _ in range(self.max_depth):
+            go_left = flat[offsets + self._feature[node]] <= self.threshold[node]
+            node = self._next[2 * node + go_left]
+        return node
+
+    def predict_proba(self, X, roots=None):
+        """
+        Mean of the per-tree leaf probabilities, summed in tree order
+        (as RandomForestClassifier.predict_proba with n_jobs=1).
+        """
+        leaves = self.apply(X, roots)
+        roots = self.roots if roots is None else roots
+        return self.value[leaves].sum(axis=0) / len(roots)
+
+    def predict_proba_anytime(self, X, chunk=32, margin=None):
+        """
+        Early-exit evaluation: trees are added in chunks (stored order)
+        and a row stops as soon as
+
+        - its top class can no longer change: with s the running sums of
+          leaf probabilities (each tree adds at most 1 to a class),
+          s_top - s_second > trees left. The label then equals the full
+          forest's; or
+        - `margin` is set and (s_top - s_second) / trees used >= margin.
+          Stops much earlier, but the label may differ from the full forest.
+
+        Without a margin, chunk sizes grow to the fewest trees that could
+        possibly satisfy the bound (at least half the forest up front).
+        Returns (proba averaged over the trees used, trees_used per row).
+        """
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        n_rows, n_trees = len(X), self.n_trees
+        n_classes = self.value.shape[1]
+
+        sums = np.zeros((n_rows, n_classes))
+        used = np.zeros(n_rows, dtype=np.intp)
+        active = np.arange(n_rows)
+
+        start = 0
+        step = chunk if margin is not None else max(chunk, n_trees // 2 + 1)
+        while active.size and start < n_trees:
+            stop = min(start + step, n_trees)
+            leaves = self.apply(X[active], self.roots[start:stop])
+            sums[active] += self.value[leaves].sum(axis=0)
+            used[active] = stop
+            start = stop
+
+            if n_classes < 2:
+                continue
+            top2 = np.partition(sums[active], -2, axis=1)[:, -2:]
+            gap = top2[:, 1] - top2[:, 0]
+            left = n_trees - stop
+
+            done = gap > left + 1e-9
+            if margin is not None:
+                done |= gap >= margin * stop
+            active, gap = active[~done], gap[~done]
+
+            if active.size and margin is None:
+                # gap + m > left - m cannot hold for fewer trees than this
+                step = max(chunk, int((left - gap.max()) // 2) + 1)
+
+        return sums / used[:, np.newaxis], used
+
+    def predict(self, X):
+        return self.classes[np.argmax(self.predict_proba(X), axis=1)]
+
+    # --------------------------------------------------
+    # PERSISTENCE (.npz, no pickle)
+    # --------------------------------------------------
+    def save(self, path):
+        np.savez(
+            path,
+            feature=self.feature,
+            threshold=self.threshold,
+            left=self.left,
+            right=self.right,
+            value=self.value,
+            roots=self.roots,
+            max_depth=np.array(self.max_depth),
+            classes=self.classes,
+            columns=np.array(self.columns, dtype=str),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as d:
+            return cls(
+                feature=d["feature"],
+                threshold=d["threshold"],
+                left=d["left"],
+                right=d["right"],
+                value=d["value"],
+                roots=d["roots"],
+                max_depth=d["max_depth"],
+                classes=d["classes"],
+                columns=d["columns"].tolist(),
+            )
+
+
+def compile_forest(clf, scaler=None, columns=None):
+    """
+    Flatten a fitted RandomForestClassifier (single output) and an
+    optional StandardScaler into a CompiledForest.
+    """
+    if type(clf).__name__ not in ("RandomForestClassifier", "ExtraTreesClassifier") \
+            or getattr(clf, "n_outputs_", 1) != 1:
+        raise ValueError("Only single-output RandomForestClassifier is supported")
+    if scaler is not None and type(scaler).__name__ != "StandardScaler":
+        raise ValueError(f"Cannot fold {type(scaler).__name__} into thresholds")
+
+    n_features = clf.n_features_in_
+    mean = np.zeros(n_features)
+    scale = np.ones(n_features)
+    if scaler is not None:
+        if scaler.with_mean:
+            mean = scaler.mean_
+        if scaler.with_std:
+            scale = scaler.scale_
+
+    n_classes = clf.n_classes_
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset, max_depth = 0, 0
+
+    for est in clf.estimators_:
+        tree = est.tree_
+        n = tree.node_count
+        is_leaf = tree.children_left == -1
+        ids = np.arange(offset, offset + n)
+
+        value = tree.value[:, 0, :n_classes]
+        normalizer = value.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(tree.threshold)
+        lefts.append(np.where(is_leaf, ids, tree.children_left + offset))
+        rights.append(np.where(is_leaf, ids, tree.children_right + offset))
+        values.append(value / normalizer)
+        roots.append(offset)
+
+        offset += n
+        max_depth = max(max_depth, tree.max_depth)
+
+    feature = np.concatenate(features)
+    threshold = np.concatenate(thresholds)
+    leaf = np.concatenate(lefts) == np.arange(offset)
+
+    raw = fold_thresholds(threshold, mean[feature], scale[feature])
+    raw[leaf] = 0.0
+
+    index_dtype = np.int32
+    feature_dtype = np.int16 if n_features < np.iinfo(np.int16).max else np.int32
+
+    return CompiledForest(
+        feature=feature.astype(feature_dtype),
+        threshold=raw,
+        left=np.concatenate(lefts).astype(index_dtype),
+        right=np.concatenate(rights).astype(index_dtype),
+        value=np.concatenate(values),
+        roots=np.array(roots, dtype=index_dtype),
+        max_depth=max_depth,
+        classes=np.asarray(clf.classes_),
+        columns=columns if columns is not None else [str(i) for i in range(n_features)],
+    )
@@ -1,32 +1,100 @@
+import copy
 import os
-import time
 import pickle
-import joblib
+import threading
+import time
 import numpy as np
-import torch
-import pandas as pd
 import warnings
 warnings.filterwarnings("ignore", category=UserWarning)
 
+from src.realtime.cache import PredictionCache
+from src.realtime.metrics import (
+    PREDICT, PREDICT_BATCH, PREDICTIONS_BATCH, PREDICTIONS_SINGLE, SCALE
+)
 
-from src.models.model_def import SimpleLSTM
-from src.realtime.aggregator import RealTimeAggregator
+# Heavy dependencies are imported where they are needed:
+# joblib (+ sklearn) for .joblib models, torch for .pth / .pt models,
+# pandas only for the non-StandardScaler fallback path, and the
+# sensor stack (pynput / cv2 / mediapipe) only for predict_live.
 
 
 class ModelServer:
-    def __init__(self, model_path, metadata_path=None, device=None):
+    # batches up to this size skip joblib and use the compiled forest
+    # (beyond it sklearn's per-tree C loop is faster)
+    SMALL_BATCH = 256
+
+    def __init__(self, model_path, metadata_path=None, device=None,
+                 anytime=False, anytime_margin=None, anytime_chunk=32,
+                 cache_size=0, cache_quantum=None, lstm_mode="window",
+                 cascade=None, cascade_threshold=0.9, batch_n_jobs=None):
+        """
+        anytime:        early-exit forest inference for batches (stop
+                        once the label can no longer change; see
+                        CompiledForest.predict_proba_anytime); proba is
+                        averaged over the trees used. Single rows always
+                        take the full traversal: they are bound by
+                        per-depth numpy dispatch, not tree count, so
+                        early exit only pays off on batches (and large
+                        forests).
+        anytime_margin: also stop once (top - second) / trees >= margin
+                        (faster, may disagree with the full forest)
+        anytime_chunk:  trees evaluated per step
+        cache_size:     LRU cache of single-row predictions (0 = off;
+                        sklearn / compiled-forest models)
+        cache_quantum:  snap features to multiples of this before the
+                        cache lookup (near-identical rows share an entry);
+                        a scalar or {column: quantum}
+        lstm_mode:      streaming LSTM state for predict_from_feature_dict
+                        (..., stream=id): "window" (= model over the last
+                        seq_len windows) or "carry" (= model over the whole
+                        stream); see src/realtime/streaming.py
+        cascade:        heavier models to escalate to when this one is not
+                        confident: [{"model_path", "metadata_path",
+                        "threshold"}, ...] in order (the last stage always
+                        answers); results gain a "stage" field. See
+                        src/realtime/cascade.py
+        cascade_threshold: confidence (max probability) at which this
+                        model's answer is kept
+        batch_n_jobs:   joblib jobs for sklearn batch scoring (None = as
+                        trained; process-pool workers use 1)
+        """
         self.model_path = model_path
+        self.metadata_path = metadata_path
         self.metadata = {}
+        self.manifest = None
+        self.forest = None
+
+        self.anytime = anytime
+        self.anytime_margin = anytime_margin
+        self.anytime_chunk = anytime_chunk
+
+        # constructor options to carry over to reloaded / worker copies
+        self.options = {
+            "anytime": anytime,
+            "anytime_margin": anytime_margin,
+            "anytime_chunk": anytime_chunk,
+            "cache_size": cache_size,
+            "cache_quantum": cache_quantum,
+            "lstm_mode": lstm_mode,
+            "cascade": cascade,
+            "cascade_threshold": cascade_threshold,
+            "batch_n_jobs": batch_n_jobs,
+        }
+
+        self.cache = None
+        self.cascade = None
 
         if metadata_path and os.path.exists(metadata_path):
             self.metadata = pickle.load(open(metadata_path, "rb"))
 
-        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.device = device or "cpu"
 
         # --------------------------------------------------
-        # Load model (sklearn or LSTM)
+        # Load model (sklearn, compiled forest or LSTM)
         # --------------------------------------------------
         if model_path.endswith(".joblib"):
+            import joblib
+
             store = joblib.load(model_path)
             self.model_type = "sklearn"
 
@@ -37,8 +105,36 @@ class ModelServer:
             if self.columns is None:
                 raise ValueError("Saved model must include feature 'columns'")
 
+            self._compile_sklearn_fast_path()
+
+        elif model_path.endswith(".npz"):
+            # forest exported by src/models/compile_forest.py: numpy only,
+            # sklearn is never imported
+            from src.realtime.forest import CompiledForest
+
+            self.model_type = "forest"
+            self.forest = CompiledForest.load(model_path)
+            self.columns = self.forest.columns
+            self.classes = self.forest.classes
+            self._init_row_buffers()
+
+        elif os.path.isdir(model_path):
+            # model registry version (or latest version of a model):
+            # arrays are memory-mapped read-only and shared between processes
+            from src.realtime.registry import load_forest
+
+            self.model_type = "forest"
+            self.forest, self.manifest = load_forest(model_path)
+            self.columns = self.forest.columns
+            self.classes = self.forest.classes
+            self._init_row_buffers()
+
         elif model_path.endswith(".pth"):
+            import torch
+            from src.models.model_def import SimpleLSTM
+
             self.model_type = "lstm"
+            self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
 
             input_dim = self.metadata.get("input_dim")
             num_classes = self.metadata.get("num_classes", 3)
@@ -58,21 +154,229 @@ class ModelServer:
             )
             self.model.to(self.device)
             self.model.eval()
+            self._init_streams(lstm_mode)
+
+        elif model_path.endswith(".pt"):
+            # scripted int8 SimpleLSTM exported by src/models/export_lstm.py;
+            # dynamic quantization only runs on CPU
+            import json
+            import torch
+
+            self.model_type = "lstm"
+            self.device = "cpu"
+
+            extra = {"metadata.json": ""}
+            self.model = torch.jit.load(model_path, map_location="cpu", _extra_files=extra)
+            self.model.eval()
+
+            # metadata embedded at export; an explicit metadata file wins
+            if not self.metadata and extra["metadata.json"]:
+                self.metadata = json.loads(extra["metadata.json"])
+
+            self._init_streams(lstm_mode)
 
         else:
             raise ValueError("Unknown model type")
 
+        if cache_size > 0:
+            if isinstance(cache_quantum, dict):
+                # per-column quanta in model column order (0 = exact)
+                cache_quantum = [
+                    cache_quantum.get(c, 0.0) for c in self.input_columns
+                ]
+            self.cache = PredictionCache(max_size=cache_size, quantum=cache_quantum)
+
+        if cascade:
+            self._init_cascade(cascade, cascade_threshold)
+
         # --------------------------------------------------
-        # Real-time feature aggregator
+        # Real-time feature aggregator (created on first predict_live;
+        # the server's InferenceProducer owns its own aggregator)
         # --------------------------------------------------
-        self.realtime_aggregator = RealTimeAggregator()
-        self.realtime_aggregator.start()
+        self.realtime_aggregator = None
+
+    def _init_cascade(self, cascade, cascade_threshold):
+        from src.realtime.cascade import Cascade
+
+        stages = [(self, cascade_threshold)]
+        for stage in cascade:
+            server = ModelServer(
+                model_path=stage["model_path"],
+                metadata_path=stage.get("metadata_path"),
+                device=self.device if self.model_type == "lstm" else None,
+                lstm_mode=self.options["lstm_mode"],
+                batch_n_jobs=self.options["batch_n_jobs"],
+            )
+            stages.append((server, stage.get("threshold", cascade_threshold)))
+
+        n_classes = {server._n_classes() for server, _ in stages}
+        if len(n_classes) > 1:
+            raise ValueError("Cascade stages must predict the same classes")
+
+        self.cascade = Cascade(stages)
+
+    def _n_classes(self):
+        if self.model_type == "lstm":
+            return self.metadata.get("num_classes", 3)
+        return len(self.classes)
+
+    def _init_streams(self, lstm_mode):
+        # per-stream recurrent state (predict_from_feature_dict(stream=...))
+        from src.realtime.streaming import MODES
+        if lstm_mode not in MODES:
+            raise ValueError(f"Unknown lstm_mode: {lstm_mode}")
+        self.seq_len = self.metadata.get("seq_len", 5)
+        self.lstm_mode = lstm_mode
+        self._streams = {}
+        self._streams_lock = threading.Lock()
+
+    # ======================================================
+    # SKLEARN FAST PATH (single row, no DataFrame)
+    # ======================================================
+    def _init_row_buffers(self):
+        self._col_index = {c: i for i, c in enumerate(self.columns)}
+        self._n_cols = len(self.columns)
+        self._buffers = threading.local()
+
+    def _compile_sklearn_fast_path(self):
+        """
+        Precompute everything the per-row path needs:
+        column -> index map, StandardScaler parameters, per-thread
+        preallocated row buffers and the compiled array-backed forest.
+
+        Only tree ensembles that compile (src/realtime/forest.py) take
+        the fast path: their answers are bit-identical to the DataFrame
+        path. Any other estimator (or scaler other than StandardScaler)
+        keeps the DataFrame path, float64 and clf.predict.
+        """
+        self._init_row_buffers()
+        self.classes = getattr(self.clf, "classes_", None)
+
+        compilable = hasattr(self.clf, "predict_proba") and (
+            self.scaler is None or
+            type(self.scaler).__name__ == "StandardScaler"
+        )
+
+        # Forest: flatten into arrays with the scaler folded into the
+        # thresholds; bit-identical to predict_proba with n_jobs=1
+        # (see src/realtime/forest.py)
+        if compilable:
+            from src.realtime.forest import compile_forest
+            try:
+                self.forest = compile_forest(self.clf, self.scaler, self.columns)
+            except ValueError:
+                self.forest = None
+        self._fast_path = self.forest is not None
+
+        self._mean = None
+        self._scale = None
+        if self.scaler is not None and self._fast_path:
+            if self.scaler.with_mean:
+                self._mean = self.scaler.mean_
+            if self.scaler.with_std:
+                self._scale = self.scaler.scale_
+
+        # one row is far too small to amortize joblib's thread pool;
+        # batches keep the trained n_jobs (or batch_n_jobs) on a
+        # shallow copy
+        self._batch_clf = self.clf
+        if getattr(self.clf, "n_jobs", None) is not None:
+            batch_n_jobs = self.options["batch_n_jobs"]
+            if batch_n_jobs is not None:
+                self.clf.n_jobs = batch_n_jobs
+            if self.clf.n_jobs != 1:
+                self._batch_clf = copy.copy(self.clf)
+                self.clf.n_jobs = 1
+
+    def _row_buffer(self):
+        buf = self._buffers
+        if not hasattr(buf, "row64"):
+            buf.row64 = np.zeros((1, self._n_cols), dtype=np.float64)
+        return buf.row64
+
+    def _forest_proba(self, X):
+        """
+        Compiled-forest probabilities for raw rows, SMALL_BATCH rows at
+        a time (bounds the (n_trees, rows, classes) gather). Early exit
+        only for more than one row.
+        """
+        if self.anytime and len(X) > 1:
+            predict = lambda x: self.forest.predict_proba_anytime(
+                x, chunk=self.anytime_chunk, margin=self.anytime_margin
+            )[0]
+        else:
+            predict = self.forest.predict_proba
+
+        if len(X) <= self.SMALL_BATCH:
+            return predict(X)
+        return np.concatenate([
+            predict(X[i:i + self.SMALL_BATCH])
+            for i in range(0, len(X), self.SMALL_BATCH)
+        ])
+
+    def _predict_fast(self, feat_dict):
+        t0 = time.perf_counter()
+        row64 = self._row_buffer()
+
+        # same values the DataFrame path would hold (missing -> 0.0)
+        row64.fill(0.0)
+        col_index = self._col_index
+        for k, v in feat_dict.items():
+            i = col_index.get(k)
+            if i is not None:
+                row64[0, i] = v
+
+        t1 = time.perf_counter()
+        SCALE.observe(t1 - t0)
+
+        if self.cache is None:
+            res = self._score_row(row64)
+            PREDICT.observe(time.perf_counter() - t1)
+            return res
+
+        key = self.cache.key(row64[0])
+        res = self.cache.get(key)
+        if res is None:
+            res = self._score_row(row64)
+            self.cache.put(key, res)
+        PREDICT.observe(time.perf_counter() - t1)
+        # callers own the returned dict
+        return dict(res, proba=list(res["proba"]))
+
+    def _score_row(self, row64):
+        # full traversal even with anytime (see __init__); raw
+        # features: the scaler is folded into the thresholds
+        proba = self.forest.predict_proba(row64)[0]
+        pred = int(self.classes[np.argmax(proba)])
+
+        return {"pred": pred, "proba": proba.tolist()}
 
     # ======================================================
     # PREDICT FROM FEATURE DICT (FIXED + CLEAN)
     # ======================================================
-    def predict_from_feature_dict(self, feat_dict):
+    def predict_from_feature_dict(self, feat_dict, stream=None):
+        """
+        stream: LSTM only. Successive windows of one live source share an
+                id and are scored with its carried state (one LSTM step
+                per window). None scores the row on its own.
+        """
+        if self.cascade is not None:
+            return self.cascade.predict(feat_dict, stream)
+        return self._predict_one(feat_dict, stream)
+
+    def _predict_one(self, feat_dict, stream=None):
+        PREDICTIONS_SINGLE.inc()
+
+        if self.model_type == "forest":
+            return self._predict_fast(feat_dict)
+
         if self.model_type == "sklearn":
+            if self._fast_path:
+                return self._predict_fast(feat_dict)
+
+            import pandas as pd
+
+            t0 = time.perf_counter()
             # Build feature vector WITH COLUMN NAMES
             x = pd.DataFrame(
                 [[feat_dict.get(c, 0.0) for c in self.columns]],
@@ -83,6 +387,9 @@ class ModelServer:
             if self.scaler is not None:
                 x = self.scaler.transform(x)
 
+            t1 = time.perf_counter()
+            SCALE.observe(t1 - t0)
+
             pred = int(self.clf.predict(x)[0])
 
             proba = (
@@ -91,40 +398,254 @@ class ModelServer:
                 else None
             )
 
+            PREDICT.observe(time.perf_counter() - t1)
             return {"pred": pred, "proba": proba}
 
         # ---------------- LSTM PATH ----------------
         else:
+            import torch
+
             input_cols = self.metadata.get("columns")
             if input_cols is None:
                 raise ValueError("metadata must include 'columns' for LSTM")
 
+            t0 = time.perf_counter()
             x = np.array(
-                [[feat_dict.get(c, 0.0) for c in input_cols]],
+                [feat_dict.get(c, 0.0) for c in input_cols],
                 dtype=float
             )
+            t1 = time.perf_counter()
+            SCALE.observe(t1 - t0)
 
-            x_t = torch.tensor(x, dtype=torch.float32).to(self.device)
+            if stream is not None:
+                with self._streams_lock:
+                    state = self._stream(stream)
+                    probs = state.step(x)
+                PREDICT.observe(time.perf_counter() - t1)
+                return {"pred": int(np.argmax(probs)), "proba": probs.tolist()}
+
+            # on its own: a length-1 sequence (batch, seq, features)
+            x_t = torch.tensor(x[None, None, :], dtype=torch.float32).to(self.device)
 
             with torch.no_grad():
                 logits = self.model(x_t)
                 pred = int(torch.argmax(logits, dim=1).cpu().numpy()[0])
                 probs = torch.softmax(logits, dim=1).cpu().numpy()[0].tolist()
 
+            PREDICT.observe(time.perf_counter() - t1)
             return {"pred": pred, "proba": probs}
 
+    def _stream(self, stream_id):
+        from src.realtime.streaming import LSTMStream
+
+        state = self._streams.get(stream_id)
+        if state is None:
+            state = LSTMStream(self.model, self.seq_len, mode=self.lstm_mode, device=self.device)
+            self._streams[stream_id] = state
+        return state
+
+    def predict_sequence(self, rows):
+        """
+        LSTM only: score one sequence of feature dicts (oldest first) as a
+        whole, without touching any stream state.
+        """
+        import torch
+
+        X = np.array(
+            [[r.get(c, 0.0) for c in self.metadata["columns"]] for r in rows],
+            dtype=float
+        )
+        x_t = torch.tensor(X[None, :, :], dtype=torch.float32).to(self.device)
+        with torch.no_grad():
+            probs = torch.softmax(self.model(x_t), dim=1).cpu().numpy()[0]
+        return {"pred": int(np.argmax(probs)), "proba": probs.tolist()}
+
+    def reset_stream(self, stream_id):
+        """
+        Forget a stream's state (e.g. after a gap in its windows).
+        """
+        if self.cascade is not None:
+            self.cascade.reset_stream(stream_id)
+        else:
+            self._reset_stream(stream_id)
+
+    def _reset_stream(self, stream_id):
+        if self.model_type == "lstm":
+            with self._streams_lock:
+                self._streams.pop(stream_id, None)
+
+    # ======================================================
+    # BATCH PREDICTION (vectorized)
+    # ======================================================
+    @property
+    def input_columns(self):
+        if self.cascade is not None:
+            return self.cascade.columns
+        if self.model_type in ("sklearn", "forest"):
+            return self.columns
+        input_cols = self.metadata.get("columns")
+        if input_cols is None:
+            raise ValueError("metadata must include 'columns' for LSTM")
+        return input_cols
+
+    def rows_to_matrix(self, rows):
+        """
+        rows: list of feature dicts, or a columnar dict
+              {column: [values...]} (all lists the same length)
+        Returns a float64 (n_rows, n_columns) matrix in model column
+        order; missing features are 0.0.
+        """
+        columns = self.input_columns
+        col_index = {c: i for i, c in enumerate(columns)}
+
+        if isinstance(rows, dict):
+            lengths = {len(v) for v in rows.values()}
+            if len(lengths) > 1:
+                raise ValueError("Columnar input: all columns must have the same length")
+            n = lengths.pop() if lengths else 0
+
+            X = np.zeros((n, len(columns)), dtype=np.float64)
+            for c, values in rows.items():
+                i = col_index.get(c)
+                if i is not None:
+                    X[:, i] = values
+            return X
+
+        X = np.zeros((len(rows), len(columns)), dtype=np.float64)
+        for r, feat_dict in enumerate(rows):
+            for k, v in feat_dict.items():
+                i = col_index.get(k)
+                if i is not None:
+                    X[r, i] = v
+        return X
+
+    def predict_matrix(self, X):
+        """
+        X: raw (unscaled) float64 matrix from rows_to_matrix.
+        Returns (pred int array, proba float array), one row per input.
+        """
+        t0 = time.perf_counter()
+        if self.cascade is not None:
+            pred, proba, _ = self.cascade.predict_matrix(X)
+        else:
+            pred, proba = self._predict_matrix_one(X)
+        PREDICT_BATCH.observe(time.perf_counter() - t0)
+        PREDICTIONS_BATCH.inc(len(X))
+        return pred, proba
+
+    def _predict_matrix_one(self, X):
+        if len(X) == 0:
+            return np.zeros(0, dtype=int), np.zeros((0, 0))
+
+        if self.model_type == "forest" or (
+            self.forest is not None and len(X) <= self.SMALL_BATCH
+        ):
+            # small (micro-)batches: single-threaded, no joblib overhead
+            proba = self._forest_proba(X)
+            pred = self.classes[np.argmax(proba, axis=1)]
+            return pred.astype(int), proba
+
+        if self.model_type == "sklearn":
+            if self.scaler is not None:
+                if self._fast_path:
+                    X = X.copy()
+                    if self._mean is not None:
+                        X -= self._mean
+                    if self._scale is not None:
+                        X /= self._scale
+                else:
+                    import pandas as pd
+                    X = self.scaler.transform(
+                        pd.DataFrame(X, columns=self.columns)
+                    )
+
+            if self.forest is None:
+                # not a tree ensemble: float64 and the model's own
+                # predict, like the single-row DataFrame path
+                return self._batch_clf.predict(X).astype(int), self._batch_clf.predict_proba(X)
+
+            # trees evaluate on float32 (sklearn's DTYPE)
+            proba = self._batch_clf.predict_proba(X.astype(np.float32))
+            pred = self.clf.classes_[np.argmax(proba, axis=1)]
+            return pred.astype(int), proba
+
+        # ---------------- LSTM PATH ----------------
+        import torch
+
+        # each row is a length-1 sequence
+        x_t = torch.tensor(X[:, None, :], dtype=torch.float32).to(self.device)
+        with torch.no_grad():
+            logits = self.model(x_t)
+            proba = torch.softmax(logits, dim=1).cpu().numpy()
+        return np.argmax(proba, axis=1), proba
+
+    def predict_batch(self, rows):
+        """
+        Score many feature dicts (or a columnar dict) in one vectorized
+        call. Returns [{"pred", "proba"}, ...] in input order (plus
+        "stage" with a cascade).
+        """
+        return self.predict_batch_matrix(self.rows_to_matrix(rows))
+
+    def predict_batch_matrix(self, X):
+        """
+        predict_batch() for a matrix already built by rows_to_matrix.
+        """
+        if self.cascade is not None:
+            t0 = time.perf_counter()
+            pred, proba, stage = self.cascade.predict_matrix(X)
+            PREDICT_BATCH.observe(time.perf_counter() - t0)
+            PREDICTIONS_BATCH.inc(len(X))
+            return [
+                {"pred": int(p), "proba": pr, "stage": int(k)}
+                for p, pr, k in zip(pred, proba.tolist(), stage)
+            ]
+
+        pred, proba = self.predict_matrix(X)
+        return [
+            {"pred": int(p), "proba": pr}
+            for p, pr in zip(pred, proba.tolist())
+        ]
+
+    def warmup(self, rounds=3):
+        """
+        Run a few throwaway predictions so lazy imports, first-call
+        allocations and (for torch) kernel selection happen now rather
+        than on the first real request.
+        """
+        feat = {c: 0.0 for c in self.input_columns}
+        for _ in range(rounds):
+            self.predict_from_feature_dict(feat)
+            self.predict_batch([feat, feat])
+
+        # later cascade stages only run on escalation
+        if self.cascade is not None:
+            for server, _ in self.cascade.stages[1:]:
+                server.warmup(rounds)
+                if server.model_type == "lstm":
+                    server.predict_sequence([feat, feat])
+            self.cascade.answered = [0] * len(self.cascade.stages)
+
+        # throwaway rows must not count as (or be served from) the cache
+        if self.cache is not None:
+            self.cache.reset()
+
     # ======================================================
     # REAL-TIME LIVE PREDICTION
     # ======================================================
     def predict_live(self, window_sec=3):
         """
-        Collect real-time keyboard/mouse/eye features
-        and run prediction
+        Collect one window of real-time keyboard/mouse/eye features
+        and run prediction (blocks until the aggregator's next window
+        deadline, at most `window_sec`)
         """
-        time.sleep(window_sec)
+        if self.realtime_aggregator is None:
+            from src.realtime.aggregator import RealTimeAggregator
+            self.realtime_aggregator = RealTimeAggregator()
+            self.realtime_aggregator.start()
 
-        feat_dict = self.realtime_aggregator.collect_features()
-        result = self.predict_from_feature_dict(feat_dict)
+        feat_dict = self.realtime_aggregator.collect_features(window_sec=window_sec)
+        result = self.predict_from_feature_dict(feat_dict, stream="live")
 
         return {
             "features": feat_dict,
@@ -1,29 +1,73 @@
 from pynput import keyboard
+import threading
 import time
-from collections import defaultdict
+
+import numpy as np
+
+from src.realtime.ringbuffer import EventRing
+from src.realtime.running_stats import KeyWindowStats, WINDOW_STATS
+from src.realtime.window_features import keyboard_features, pair_keys
+
+
+def key_code(key):
+    """
+    Small int for a pynput key: virtual key code when known, else the
+    character's code point, else -1.
+    """
+    vk = getattr(key, "vk", None)
+    if vk is None:
+        # keyboard.Key members wrap a KeyCode
+        vk = getattr(getattr(key, "value", None), "vk", None)
+    if vk is None:
+        char = getattr(key, "char", None)
+        vk = ord(char[0]) if char else -1
+    return vk
+
 
 class KeyboardCollector:
-    def __init__(self):
+    """
+    The pynput callbacks only append (time, key code, down) to a
+    fixed-capacity ring (src/realtime/ringbuffer.py); flush() drains it
+    and pairs presses with releases in one vectorized pass
+    (src/realtime/window_features.py). Held keys and the last release
+    are kept across flushes, so a key pressed in one window and
+    released in the next still yields its dwell time.
+
+    stats="streaming" skips the ring: the callbacks update running
+    statistics (src/realtime/running_stats.py) under a short lock and
+    flush() only swaps them out, O(1) whatever the event rate.
+    """
+
+    def __init__(self, capacity=4096, overflow="drop_oldest", stats="exact"):
+        if stats not in WINDOW_STATS:
+            raise ValueError(f"Unknown window stats: {stats} (use one of {WINDOW_STATS})")
+        self.stats = stats
+        self._streaming = stats == "streaming"
+        self._window = KeyWindowStats()
+        self._lock = threading.Lock()
+
+        self.events = EventRing(
+            [("t", np.float64), ("code", np.int32), ("down", np.int8)],
+            capacity=capacity,
+            overflow=overflow,
+        )
+
+        # consumer (flush) state: keys still down at the last flush
         self.press_times = {}
-        self.dwell_times = []
-        self.flight_times = []
-        self.keys_pressed = []
-        self.last_release_time = None
 
     def on_press(self, key):
-        t = time.time()
-        self.press_times[key] = t
-        self.keys_pressed.append(key)
-
-        if self.last_release_time:
-            self.flight_times.append(t - self.last_release_time)
+        if self._streaming:
+            with self._lock:
+                self._window.press(time.time(), key_code(key))
+            return
+        self.events.push(time.time(), key_code(key), 1)
 
     def on_release(self, key):
-        t = time.time()
-        if key in self.press_times:
-            self.dwell_times.append(t - self.press_times[key])
-            del self.press_times[key]
-        self.last_release_time = t
+        if self._streaming:
+            with self._lock:
+                self._window.release(time.time(), key_code(key))
+            return
+        self.events.push(time.time(), key_code(key), 0)
 
     def start(self):
         self.listener = keyboard.Listener(
@@ -32,13 +76,29 @@ class KeyboardCollector:
         )
         self.listener.start()
 
-    def flush(self):
-        data = {
-            "key_count": len(self.keys_pressed),
-            "unique_keys": len(set(self.keys_pressed)),
-            "dwell_mean": sum(self.dwell_times) / max(len(self.dwell_times), 1),
-            "flight_mean": sum(self.flight_times) / max(len(self.flight_times), 1),
-            "key_rate": len(self.keys_pressed) / 3.0
-        }
-        self.__init__()  # reset
-        return data
+    def buffered(self):
+        if self._streaming:
+            return self._window.events
+        return len(self.events)
+
+    def lost(self):
+        return self.events.lost
+
+    def drain(self):
+        """
+        Raw events since the last drain (sliding windows, exact stats).
+        """
+        return self.events.drain()
+
+    def flush(self, window_sec=3.0):
+        if self._streaming:
+            with self._lock:
+                window = self._window
+                self._window = window.next_window()
+            return window.features(window_sec)
+
+        ev = self.events.drain()
+        dwell, flight, self.press_times = pair_keys(
+            ev["t"], ev["code"], ev["down"], self.press_times
+        )
+        return keyboard_features(ev["code"], ev["down"], dwell, flight, window_sec)
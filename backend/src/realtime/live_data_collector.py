@@ -1,4 +1,3 @@
-import time
 import csv
 import os
 
@@ -24,25 +23,34 @@ def main():
 
     print("\n⏺️ Collecting data... Press CTRL+C to stop.\n")
 
+    # appending to an existing file keeps its columns (new window
+    # features it has no column for are left out)
+    header = None
+    if os.path.exists(OUTPUT_CSV) and os.path.getsize(OUTPUT_CSV) > 0:
+        with open(OUTPUT_CSV, newline="") as f:
+            header = next(csv.reader(f), None)
+
     with open(OUTPUT_CSV, "a", newline="") as f:
         writer = None
 
         try:
             while True:
-                features = agg.collect_features(label=label)
+                features = agg.collect_features(label=label, window_sec=WINDOW_SEC)
 
                 if writer is None:
                     writer = csv.DictWriter(
-                        f, fieldnames=features.keys()
+                        f, fieldnames=header or list(features.keys()),
+                        extrasaction="ignore", restval=0.0
                     )
-                    if f.tell() == 0:
+                    if header is None:
                         writer.writeheader()
 
                 writer.writerow(features)
                 f.flush()
 
+                # no sleep here: collect_features waits for the next
+                # window deadline itself
                 print(f"✅ Saved window | label={label}")
-                time.sleep(WINDOW_SEC)
 
         except KeyboardInterrupt:
             print("\n🛑 Stopped data collection.")
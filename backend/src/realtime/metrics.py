@@ -0,0 +1,261 @@
+"""Prometheus metrics (text exposition format 0.0.4), no dependencies.
+
+Two kinds of metrics:
+
+- instruments updated on the hot path: per-stage latency histograms
+  (STAGE_SECONDS) and the prediction counter. Label children are
+  resolved once at import (`STAGE_SECONDS.labels("predict")`), so an
+  update is a bisect plus two additions under an uncontended lock
+  (well under a microsecond).
+- callback metrics, read only when /metrics is scraped: values the
+  server already tracks (producer windows, broadcast hub counters,
+  collector buffer sizes, camera FPS) cost nothing between scrapes.
+
+Usage:
+    t0 = time.perf_counter()
+    ...
+    PREDICT.observe(time.perf_counter() - t0)
+"""
+
+import threading
+from bisect import bisect_left
+
+# seconds: 50 us .. 5 s
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(v):
+    if v == float("inf"):
+        return "+Inf"
+    if isinstance(v, float) and v.is_integer() and abs(v) < 1e15:
+        return str(int(v))
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+# -------------------------------------------------
+# Hot-path instruments
+# -------------------------------------------------
+class _CounterChild:
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, n=1):
+        with self._lock:
+            self.value += n
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # last: +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """
+        Child for these label values (create once, keep the reference).
+        """
+        values = tuple(str(v) for v in values)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def samples(self):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, n=1):
+        self.labels().inc(n)
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            yield self.name + "_total", _format_labels(self.labelnames, values), child.value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, values, [("le", _format_value(bound))])
+                yield self.name + "_bucket", labels, cumulative
+            labels = _format_labels(self.labelnames, values)
+            yield self.name + "_sum", labels, total
+            yield self.name + "_count", labels, cumulative
+
+
+# -------------------------------------------------
+# Scrape-time callbacks
+# -------------------------------------------------
+class CallbackMetric:
+    """
+    Value(s) computed at scrape time. `fn` returns a number, or a list
+    of (label values tuple, number); None (or an exception) skips it.
+    """
+
+    def __init__(self, name, help, kind, fn, labelnames=()):
+        if kind not in ("counter", "gauge"):
+            raise ValueError(f"Unsupported callback metric type: {kind}")
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.fn = fn
+        self.labelnames = tuple(labelnames)
+
+    def samples(self):
+        try:
+            value = self.fn()
+        except Exception:
+            return
+        if value is None:
+            return
+        name = self.name + "_total" if self.kind == "counter" else self.name
+        if not isinstance(value, (list, tuple)):
+            value = [((), value)]
+        for values, v in value:
+            if v is not None:
+                yield name, _format_labels(self.labelnames, values), v
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            # re-registering a name (e.g. module reload) replaces it
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def callback(self, name, help, kind, fn, labelnames=()):
+        return self.register(CallbackMetric(name, help, kind, fn, labelnames))
+
+    def render(self):
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            # text format 0.0.4: counter families carry the _total name
+            family = metric.name + "_total" if metric.kind == "counter" else metric.name
+            lines.append(f"# HELP {family} {metric.help}")
+            lines.append(f"# TYPE {family} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# -------------------------------------------------
+# Pipeline instruments (shared by aggregator, model server, hub)
+# -------------------------------------------------
+STAGE_SECONDS = REGISTRY.histogram(
+    "cognitivesense_stage_seconds",
+    "Latency of each pipeline stage in seconds",
+    ["stage"],
+)
+COLLECT = STAGE_SECONDS.labels("collect")
+KEYBOARD_FLUSH = STAGE_SECONDS.labels("keyboard_flush")
+MOUSE_FLUSH = STAGE_SECONDS.labels("mouse_flush")
+EYE_FLUSH = STAGE_SECONDS.labels("eye_flush")
+SCALE = STAGE_SECONDS.labels("scale")
+PREDICT = STAGE_SECONDS.labels("predict")
+PREDICT_BATCH = STAGE_SECONDS.labels("predict_batch")
+ENCODE = STAGE_SECONDS.labels("encode")
+BROADCAST = STAGE_SECONDS.labels("broadcast")
+
+# age of the oldest input first reflected in a published prediction:
+# about window_sec for tumbling windows, hop_sec for sliding ones
+INPUT_TO_PREDICTION = REGISTRY.histogram(
+    "cognitivesense_input_to_prediction_seconds",
+    "Time from the oldest new sensor input of a window to its prediction",
+    buckets=(0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 4.0, 5.0, 7.5, 10.0),
+)
+
+# window clock (src/realtime/window_clock.py): how late each window was
+# emitted after its deadline, and deadlines missed entirely
+WINDOW_LATENESS = REGISTRY.histogram(
+    "cognitivesense_window_lateness_seconds",
+    "Delay between a window's deadline and its emission",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+WINDOWS_SKIPPED = REGISTRY.counter(
+    "cognitivesense_windows_skipped",
+    "Window deadlines passed without emitting a window",
+)
+WINDOWS_SKIPPED.labels()   # export 0 before the first skip
+
+PREDICTIONS = REGISTRY.counter(
+    "cognitivesense_predictions",
+    "Rows scored by the model",
+    ["mode"],
+)
+PREDICTIONS_SINGLE = PREDICTIONS.labels("single")
+PREDICTIONS_BATCH = PREDICTIONS.labels("batch")
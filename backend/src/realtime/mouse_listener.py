@@ -1,18 +1,53 @@
 from pynput import mouse
+import threading
 import time
-import math
+
+import numpy as np
+
+from src.realtime.ringbuffer import EventRing
+from src.realtime.running_stats import MouseWindowStats, WINDOW_STATS
+from src.realtime.window_features import mouse_features
+
 
 class MouseCollector:
-    def __init__(self):
-        self.positions = []
-        self.clicks = 0
+    """
+    The pynput callbacks only append (time, x, y) to fixed-capacity
+    rings (src/realtime/ringbuffer.py), one for moves and one for
+    button presses; flush() drains both and computes the window
+    features in one vectorized pass (src/realtime/window_features.py).
+
+    stats="streaming" skips the rings: the callbacks update running
+    statistics (src/realtime/running_stats.py) under a short lock and
+    flush() only swaps them out, O(1) whatever the event rate.
+    """
+
+    def __init__(self, capacity=16384, overflow="drop_oldest", stats="exact"):
+        if stats not in WINDOW_STATS:
+            raise ValueError(f"Unknown window stats: {stats} (use one of {WINDOW_STATS})")
+        self.stats = stats
+        self._streaming = stats == "streaming"
+        self._window = MouseWindowStats()
+        self._lock = threading.Lock()
+
+        fields = [("t", np.float64), ("x", np.int32), ("y", np.int32)]
+        self.moves = EventRing(fields, capacity=capacity, overflow=overflow)
+        self.clicks = EventRing(fields, capacity=1024, overflow=overflow)
 
     def on_move(self, x, y):
-        self.positions.append((x, y, time.time()))
+        if self._streaming:
+            with self._lock:
+                self._window.add(time.time(), x, y)
+            return
+        self.moves.push(time.time(), x, y)
 
     def on_click(self, x, y, button, pressed):
-        if pressed:
-            self.clicks += 1
+        if not pressed:
+            return
+        if self._streaming:
+            with self._lock:
+                self._window.clicks += 1
+            return
+        self.clicks.push(time.time(), x, y)
 
     def start(self):
         self.listener = mouse.Listener(
@@ -21,19 +56,27 @@ class MouseCollector:
         )
         self.listener.start()
 
+    def buffered(self):
+        if self._streaming:
+            return self._window.moves + self._window.clicks
+        return len(self.moves) + len(self.clicks)
+
+    def lost(self):
+        return self.moves.lost + self.clicks.lost
+
+    def drain(self):
+        """
+        Raw (moves, clicks) since the last drain (sliding windows,
+        exact stats).
+        """
+        return self.moves.drain(), self.clicks.drain()
+
     def flush(self):
-        speed = []
-        for i in range(1, len(self.positions)):
-            x1, y1, t1 = self.positions[i - 1]
-            x2, y2, t2 = self.positions[i]
-            dist = math.hypot(x2 - x1, y2 - y1)
-            dt = t2 - t1
-            if dt > 0:
-                speed.append(dist / dt)
-
-        data = {
-            "mouse_speed_mean": sum(speed) / max(len(speed), 1),
-            "mouse_clicks": self.clicks
-        }
-        self.__init__()
-        return data
+        if self._streaming:
+            with self._lock:
+                window, self._window = self._window, MouseWindowStats()
+            return window.features()
+
+        moves = self.moves.drain()
+        clicks = self.clicks.drain()
+        return mouse_features(moves["t"], moves["x"], moves["y"], n_clicks=len(clicks["t"]))
@@ -0,0 +1,138 @@
+"""Shared real-time inference producer.
+
+One background task owns the RealTimeAggregator and runs the model once
+per window. Every consumer (/ws/live sockets, /predict_live) reads the
+published result instead of collecting its own window, so clients never
+steal each other's input and the event loop is never blocked by sensor
+sleeps or model calls.
+"""
+
+import asyncio
+import time
+from collections import deque
+
+from src.realtime.metrics import INPUT_TO_PREDICTION
+
+
+class InferenceProducer:
+    def __init__(self, model_server, aggregator=None, label_map=None,
+                 window_sec=3, history_len=60, sensors=None, window_stats="exact",
+                 hop_sec=None):
+        self.model_server = model_server
+        self.aggregator = aggregator
+        self.sensors = sensors
+        self.window_stats = window_stats
+        self.hop_sec = hop_sec
+        self.label_map = label_map or {}
+        self.window_sec = window_sec
+
+        self.history = deque(maxlen=history_len)
+        self.latest = None
+        self.subscribers = []
+        self.windows = 0
+        self.errors = 0
+
+        self._task = None
+
+    # --------------------------------------------------
+    # SUBSCRIPTIONS
+    # --------------------------------------------------
+    def subscribe(self, callback):
+        """
+        Register an async callback(payload) called once per window.
+        """
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    # --------------------------------------------------
+    # LIFECYCLE
+    # --------------------------------------------------
+    def start(self):
+        if self._task is not None:
+            return
+
+        if self.aggregator is None:
+            from src.realtime.aggregator import RealTimeAggregator, SENSORS
+            self.aggregator = RealTimeAggregator(
+                sensors=SENSORS if self.sensors is None else self.sensors,
+                stats=self.window_stats,
+                hop_sec=self.hop_sec
+            )
+            self.aggregator.start()
+
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    # --------------------------------------------------
+    # PRODUCER LOOP
+    # --------------------------------------------------
+    async def _run(self):
+        while True:
+            try:
+                payload = await asyncio.to_thread(self._produce_window)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                print("⚠️ Inference producer error:", e)
+                await asyncio.sleep(1)
+                continue
+
+            self.latest = payload
+            self.windows += 1
+
+            for callback in list(self.subscribers):
+                try:
+                    await callback(payload)
+                except Exception as e:
+                    print("⚠️ Subscriber error:", e)
+
+    def _produce_window(self):
+        """
+        Blocking part: wait for the window, flush sensors, predict.
+        Runs in a worker thread.
+        """
+        feat_dict = self.aggregator.collect_features(window_sec=self.window_sec)
+        # consecutive windows form one stream (stateful LSTM models)
+        result = self.model_server.predict_from_feature_dict(feat_dict, stream="live")
+
+        input_since = getattr(self.aggregator, "input_since", None)
+        if input_since is not None:
+            INPUT_TO_PREDICTION.observe(time.time() - input_since)
+        return self._build_payload(feat_dict, result)
+
+    def _build_payload(self, feat_dict, result):
+        pred = result["pred"]
+        proba = result.get("proba")
+
+        self.history.append({
+            "time": time.time(),
+            "label": pred
+        })
+
+        return {
+            "engine_state": "RUNNING",
+            "label_id": pred,
+            "label_name": self.label_map.get(pred, "Unknown"),
+            "confidence": max(proba) if proba else None,
+            "features": feat_dict,
+            "proba": proba,
+            "stage": result.get("stage"),
+            "history": list(self.history)
+        }
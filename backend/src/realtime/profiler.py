@@ -0,0 +1,145 @@
+"""On-demand sampling profiler for the live server.
+
+profile() starts one daemon thread that wakes every `interval` seconds,
+snapshots the stack of every other thread (sys._current_frames(): the
+event loop, the producer's worker thread, EyeTracker._run, the pynput
+listeners, ...) and counts identical stacks. Nothing is installed
+between calls: no trace / profile hooks, no thread, no cost.
+
+Output is the collapsed-stack format understood by flamegraph.pl,
+speedscope and similar tools, one line per distinct stack:
+
+    <thread>;<outermost frame>;...;<innermost frame> <samples>
+
+Frames are "function (file:first line)"; lines=True uses the line
+being executed instead (finer, but spreads a function over many
+stacks).
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+MAX_DURATION = 60.0
+MIN_INTERVAL = 0.001
+
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+
+class SamplingProfiler:
+    def __init__(self, max_duration=MAX_DURATION):
+        self.max_duration = max_duration
+        self._lock = threading.Lock()
+
+        self.runs = 0
+        self.last = None
+
+    @property
+    def running(self):
+        return self._lock.locked()
+
+    def profile(self, duration=5.0, interval=0.005, lines=False):
+        """
+        Sample all threads for `duration` seconds (blocking; call from a
+        worker thread). Raises ProfilerBusy if a profile is already
+        running. Returns (collapsed stacks text, stats dict).
+        """
+        duration = min(max(float(duration), 0.0), self.max_duration)
+        interval = max(float(interval), MIN_INTERVAL)
+
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already running")
+        try:
+            stacks = Counter()
+            done = threading.Event()
+            stats = {}
+
+            sampler = threading.Thread(
+                target=self._sample,
+                args=(stacks, duration, interval, lines, done, stats),
+                name="profiler-sampler",
+                daemon=True,
+            )
+            sampler.start()
+            done.wait()
+
+            self.runs += 1
+            self.last = stats
+            return self._collapse(stacks), stats
+        finally:
+            self._lock.release()
+
+    def _sample(self, stacks, duration, interval, lines, done, stats):
+        me = threading.get_ident()
+        names = {}
+        labels = {}
+        ticks = 0
+        busy = 0.0
+
+        start = time.perf_counter()
+        deadline = start + duration
+        next_tick = start
+        try:
+            while True:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                if now < next_tick:
+                    time.sleep(next_tick - now)
+                next_tick += interval
+
+                t0 = time.perf_counter()
+                frames = sys._current_frames()
+                if not names.keys() >= frames.keys():
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in frames.items():
+                    if ident == me:
+                        continue
+                    stacks[(names.get(ident, f"thread-{ident}"),
+                            self._stack(frame, lines, labels))] += 1
+                del frames
+                busy += time.perf_counter() - t0
+                ticks += 1
+        finally:
+            elapsed = time.perf_counter() - start
+            stats.update({
+                "duration_sec": elapsed,
+                "interval_ms": interval * 1e3,
+                "ticks": ticks,
+                "samples": sum(stacks.values()),
+                "stacks": len(stacks),
+                # sampler time holding the GIL, share of wall time
+                "overhead": busy / elapsed if elapsed else 0.0,
+            })
+            done.set()
+
+    @staticmethod
+    def _stack(frame, lines, labels):
+        """
+        Frame labels, outermost first. `labels` caches the formatted
+        label per (code, line) for the whole run.
+        """
+        out = []
+        while frame is not None:
+            code = frame.f_code
+            key = (code, frame.f_lineno if lines else code.co_firstlineno)
+            label = labels.get(key)
+            if label is None:
+                label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{key[1]})"
+                labels[key] = label
+            out.append(label)
+            frame = frame.f_back
+        out.reverse()
+        return tuple(out)
+
+    @staticmethod
+    def _collapse(stacks):
+        lines = [
+            ";".join((thread.replace(";", ":"),) + frames) + f" {count}"
+            for (thread, frames), count in stacks.most_common()
+        ]
+        return "\n".join(lines) + ("\n" if lines else "")
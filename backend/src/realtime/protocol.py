@@ -0,0 +1,171 @@
+"""/ws/live wire protocol.
+
+Version 1 (default, legacy): every frame is the full prediction payload
+(label, proba, features and the whole 60-entry history).
+
+Version 2 (opt-in with `/ws/live?protocol=2`): the client gets one full
+snapshot on connect, then small deltas holding only what changed:
+
+    {"type": "snapshot", "v": 2, "seq": 41, "encoding": "json",
+     "state": {...full payload...}}
+
+    {"type": "delta", "v": 2, "seq": 42, "base": 41,
+     "changed":  {"label_id": 1, "label_name": "Stressed", ...},
+     "features": {"key_count": 12, ...},        # changed keys only
+     "history":  [{"time": ..., "label": 1}]}   # appended records
+
+`seq` increases by one per window and `base` is the seq of the state
+the delta applies to. A client whose last seq is not `base` (or that
+sees any inconsistency) sends `{"type": "resync"}` and receives a new
+snapshot.
+The server also replaces queued deltas with a snapshot when it has to
+drop frames for a slow v2 client.
+
+`encoding=msgpack` (v2 only, needs the `msgpack` package) sends the same
+frames as binary MessagePack instead of JSON text.
+
+Subscriptions (both versions): after connecting, a client may send
+
+    {"type": "subscribe", "fields": ["label", "fatigue"],
+     "max_rate": 1.0, "on_change": true}
+
+fields:    field groups to receive (see FIELD_GROUPS; default: all)
+max_rate:  at most this many frames per second (default: every window)
+on_change: skip windows where the subscribed fields did not change
+
+Each distinct projection is built and encoded once per window and shared
+by every client subscribed to it. A v2 client that skipped windows gets
+a delta against the last state it was sent (its `base`).
+"""
+
+from src.realtime.encoding import encode_json
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+
+PROTOCOL_VERSION = 2
+ENCODINGS = ("json", "msgpack")
+
+# fields diffed as whole values (everything except features / history)
+_SCALAR_FIELDS = ("engine_state", "label_id", "label_name", "confidence", "stage", "proba")
+
+# subscription field groups -> payload keys
+# ("fatigue" is only features.fatigue_score, for small clients like the PiP)
+FIELD_GROUPS = {
+    "label": ("engine_state", "label_id", "label_name", "confidence", "stage"),
+    "proba": ("proba",),
+    "features": ("features",),
+    "fatigue": (),
+    "history": ("history",),
+}
+
+
+def normalize_fields(fields):
+    """
+    Validate a subscription's field groups.
+    Returns a sorted tuple, or None for "everything".
+    """
+    if fields is None:
+        return None
+    unknown = [f for f in fields if f not in FIELD_GROUPS]
+    if unknown:
+        raise ValueError(f"Unknown field groups: {unknown}")
+    fields = tuple(sorted(set(fields)))
+    if set(fields) >= {"label", "proba", "features", "history"}:
+        return None
+    return fields
+
+
+def project(state, fields):
+    """
+    Keep only the subscribed field groups of a payload.
+    """
+    if fields is None or state is None:
+        return state
+
+    out = {}
+    for group in fields:
+        for key in FIELD_GROUPS[group]:
+            if key in state:
+                out[key] = state[key]
+
+    if "fatigue" in fields and "features" not in fields:
+        features = state.get("features") or {}
+        if "fatigue_score" in features:
+            out["features"] = {"fatigue_score": features["fatigue_score"]}
+
+    return out
+
+
+def make_snapshot(seq, state, encoding="json"):
+    return {
+        "type": "snapshot",
+        "v": PROTOCOL_VERSION,
+        "seq": seq,
+        "encoding": encoding,
+        "state": state,
+    }
+
+
+def is_empty_delta(delta):
+    return not any(k in delta for k in ("changed", "features", "history"))
+
+
+def make_delta(seq, prev, state, base=None):
+    """
+    Build the delta frame that turns `prev` (seq `base`, default
+    seq - 1) into `state`.
+    """
+    if base is None:
+        base = seq - 1
+    delta = {"type": "delta", "v": PROTOCOL_VERSION, "seq": seq, "base": base}
+    prev = prev or {}
+
+    changed = {}
+    for key in _SCALAR_FIELDS:
+        if key in state and state[key] != prev.get(key):
+            changed[key] = state[key]
+    if changed:
+        delta["changed"] = changed
+
+    features = state.get("features")
+    if features is not None:
+        prev_features = prev.get("features") or {}
+        changed_features = {
+            k: v for k, v in features.items()
+            if k not in prev_features or prev_features[k] != v
+        }
+        if changed_features:
+            delta["features"] = changed_features
+
+    history = state.get("history")
+    if history:
+        prev_history = prev.get("history") or []
+        last_time = prev_history[-1]["time"] if prev_history else None
+        new_records = [
+            r for r in history
+            if last_time is None or r["time"] > last_time
+        ]
+        if new_records:
+            delta["history"] = new_records
+
+    return delta
+
+
+def encode_frame(message, encoding="json"):
+    """
+    Returns ("text", str) or ("bytes", bytes) ready for the socket.
+    """
+    if encoding == "msgpack":
+        return ("bytes", msgpack.packb(message, use_bin_type=True, default=_msgpack_default))
+    return ("text", encode_json(message))
+
+
+def _msgpack_default(obj):
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Type is not msgpack serializable: {type(obj).__name__}")
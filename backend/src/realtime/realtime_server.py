@@ -1,24 +1,46 @@
 """Realtime Server for CognitiveSense AI
 FastAPI realtime server exposing:
 - /predict           -> POST single feature-dict (manual / testing)
-- /predict_live      -> POST auto real-time prediction (keyboard/mouse)
+- /predict_batch     -> POST many feature-dicts (or columnar dict), vectorized
+- /predict_live      -> POST latest real-time prediction (keyboard/mouse/eye)
 - /ws/live           -> WebSocket streaming real-time predictions
+                        (?protocol=2 for snapshot + delta frames)
+- /admin/reload      -> POST hot-swap the model without a restart
+                        (admin: X-Admin-Token, see ADMIN_TOKEN)
+- /metrics           -> Prometheus text exposition (stage latencies,
+                        counters, buffer / camera gauges)
+- /admin/profile     -> POST sample all threads for N seconds, returns
+                        collapsed stacks (flamegraph input; admin)
+
+A single InferenceProducer (started with the app) owns the sensor
+aggregator and runs the model once per window; HTTP and WebSocket
+clients only consume its published results.
 
 Run:
 uvicorn src.realtime.realtime_server:app --reload --port 8000
 """
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request, Header, Depends
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from src.realtime.infer import ModelServer
+from src.realtime.producer import InferenceProducer
+from src.realtime.broadcast import BroadcastHub
+from src.realtime.protocol import ENCODINGS, PROTOCOL_VERSION
+from src.realtime.encoding import decode_json, encode_json
+from src.realtime.batching import MicroBatcher
+from src.realtime.workers import ProcessPoolModelServer
+from src.realtime.reload import ModelReloader
+from src.realtime.metrics import REGISTRY as METRICS
+from src.realtime.profiler import ProfilerBusy, SamplingProfiler
 
 import asyncio
+import hmac
+import json
+import math
 import os
 import time
-from collections import deque
-from typing import List
 
 # -------------------------------------------------
 # App & CORS
@@ -48,10 +70,76 @@ DEFAULT_METADATA = os.environ.get(
 if not os.path.exists(DEFAULT_MODEL_PATH):
     raise RuntimeError("Model file not found")
 
+# Anytime (early-exit) forest inference: COGNITIVESENSE_ANYTIME=1 stops
+# once the label is decided; COGNITIVESENSE_ANYTIME_MARGIN (e.g. 0.5)
+# also stops once the vote margin is reached. Batches only (micro-batches,
+# /predict_batch): single rows always run the full forest
+ANYTIME = os.environ.get("COGNITIVESENSE_ANYTIME", "0") == "1"
+ANYTIME_MARGIN = os.environ.get("COGNITIVESENSE_ANYTIME_MARGIN")
+
+# LRU cache of single-row predictions: COGNITIVESENSE_CACHE_SIZE entries
+# (0 = off), features snapped to COGNITIVESENSE_CACHE_QUANTUM (optional)
+CACHE_SIZE = int(os.environ.get("COGNITIVESENSE_CACHE_SIZE", 0))
+CACHE_QUANTUM = os.environ.get("COGNITIVESENSE_CACHE_QUANTUM")
+
+# Streaming LSTM state for the live producer: "window" (last seq_len
+# windows, as trained) or "carry" (whole stream)
+LSTM_MODE = os.environ.get("COGNITIVESENSE_LSTM_MODE", "window")
+
+# Confidence cascade: COGNITIVESENSE_CASCADE is a JSON list of heavier
+# stages, e.g. [{"model_path": "models/lstm.pth", "metadata_path": ...}],
+# used when the main model's confidence is below
+# COGNITIVESENSE_CASCADE_THRESHOLD
+CASCADE = os.environ.get("COGNITIVESENSE_CASCADE")
+CASCADE_THRESHOLD = float(os.environ.get("COGNITIVESENSE_CASCADE_THRESHOLD", 0.9))
+
+_t0 = time.perf_counter()
 model_server = ModelServer(
     model_path=DEFAULT_MODEL_PATH,
-    metadata_path=DEFAULT_METADATA
+    metadata_path=DEFAULT_METADATA,
+    anytime=ANYTIME,
+    anytime_margin=float(ANYTIME_MARGIN) if ANYTIME_MARGIN else None,
+    cache_size=CACHE_SIZE,
+    cache_quantum=float(CACHE_QUANTUM) if CACHE_QUANTUM else None,
+    lstm_mode=LSTM_MODE,
+    cascade=json.loads(CASCADE) if CASCADE else None,
+    cascade_threshold=CASCADE_THRESHOLD
 )
+MODEL_LOAD_SEC = time.perf_counter() - _t0
+
+# Optional process-pool backend for /predict and /predict_batch:
+# COGNITIVESENSE_INFERENCE_WORKERS worker processes (0 = in-process)
+INFERENCE_WORKERS = int(os.environ.get("COGNITIVESENSE_INFERENCE_WORKERS", 0))
+
+worker_pool = None
+if INFERENCE_WORKERS > 0:
+    worker_pool = ProcessPoolModelServer(model_server, n_workers=INFERENCE_WORKERS)
+
+
+def inference_backend():
+    """
+    Where request-driven predictions run (the live producer always
+    predicts in-process).
+    """
+    return worker_pool if worker_pool is not None else model_server
+
+# Largest batch scored in one vectorized call; bigger /predict_batch
+# requests must use ?stream=true (scored in chunks of this size)
+MAX_BATCH_SIZE = int(os.environ.get("COGNITIVESENSE_MAX_BATCH", 10000))
+
+# Opt-in micro-batching of concurrent /predict calls:
+# hold requests up to COGNITIVESENSE_MICROBATCH_MS (0 = off) or until
+# COGNITIVESENSE_MICROBATCH_SIZE rows are waiting
+MICROBATCH_MS = float(os.environ.get("COGNITIVESENSE_MICROBATCH_MS", 0))
+MICROBATCH_SIZE = int(os.environ.get("COGNITIVESENSE_MICROBATCH_SIZE", 64))
+
+batcher = None
+if MICROBATCH_MS > 0:
+    batcher = MicroBatcher(
+        lambda rows: inference_backend().predict_batch(rows),
+        max_batch=MICROBATCH_SIZE,
+        max_wait_ms=MICROBATCH_MS
+    )
 
 # -------------------------------------------------
 # Label mapping (HUMAN READABLE)
@@ -63,33 +151,205 @@ LABEL_MAP = {
 }
 
 # -------------------------------------------------
-# State history (for graphs)
+# Shared inference producer (one window loop for all clients)
 # -------------------------------------------------
-STATE_HISTORY = deque(maxlen=60)  # ~ last 3 min (3s window)
+WINDOW_SEC = float(os.environ.get("COGNITIVESENSE_WINDOW_SEC", 3))
+
+# Sliding windows: publish the last WINDOW_SEC of input every HOP_SEC
+# seconds (e.g. 0.5). Unset: tumbling windows, one every WINDOW_SEC.
+HOP_SEC = os.environ.get("COGNITIVESENSE_HOP_SEC")
+HOP_SEC = float(HOP_SEC) if HOP_SEC else None
+
+# Enabled sensors, e.g. "keyboard,mouse" to run without the camera
+# ("" = none).
+# Disabled sensors are never imported (pynput / cv2 / mediapipe).
+SENSORS = tuple(
+    s.strip() for s in
+    os.environ.get("COGNITIVESENSE_SENSORS", "keyboard,mouse,eye").split(",")
+    if s.strip()
+)
+
+# Keyboard / mouse window statistics: "exact" (features computed from
+# the buffered events at each flush) or "streaming" (running estimates
+# updated per event, constant-time flush)
+WINDOW_STATS = os.environ.get("COGNITIVESENSE_WINDOW_STATS", "exact")
+
+# State history: one entry per published window (every HOP_SEC with
+# sliding windows), sized to cover the last 3 minutes
+HISTORY_SEC = 180
+
+producer = InferenceProducer(
+    model_server,
+    label_map=LABEL_MAP,
+    window_sec=WINDOW_SEC,
+    history_len=math.ceil(HISTORY_SEC / (HOP_SEC or WINDOW_SEC)),
+    sensors=SENSORS,
+    window_stats=WINDOW_STATS,
+    hop_sec=HOP_SEC
+)
+
+# State history (for graphs)
+STATE_HISTORY = producer.history
 
 # -------------------------------------------------
-# WebSocket Connection Manager
+# Model hot-reload (POST /admin/reload, optional file watch)
 # -------------------------------------------------
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+# Poll COGNITIVESENSE_MODEL's mtime every N seconds (0 = off)
+MODEL_WATCH_SEC = float(os.environ.get("COGNITIVESENSE_MODEL_WATCH", 0))
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+# /admin/reload may only load other models from inside this directory
+MODEL_ROOT = os.environ.get("COGNITIVESENSE_MODEL_ROOT", "models")
 
-    def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+# Admin endpoints are off unless a token is set; requests must then
+# send it as the X-Admin-Token header
+ADMIN_TOKEN = os.environ.get("COGNITIVESENSE_ADMIN_TOKEN") or None
 
-    async def broadcast(self, message: dict):
-        for conn in list(self.active_connections):
-            try:
-                await conn.send_json(message)
-            except Exception:
-                self.disconnect(conn)
 
-manager = ConnectionManager()
+def require_admin(x_admin_token: str = Header(None)):
+    if ADMIN_TOKEN is None:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+def swap_model(new_server):
+    """
+    Install a validated ModelServer. Plain reference assignments: the
+    window / requests already running keep the old model, the next
+    ones pick up the new one. The worker pool (if any) is rolled first,
+    so a failure there leaves everything on the old model.
+    """
+    global model_server
+    if worker_pool is not None:
+        worker_pool.reload(new_server)
+    model_server = new_server
+    producer.model_server = new_server
+
+
+def _live_features():
+    return producer.latest["features"] if producer.latest else None
+
+
+reloader = ModelReloader(
+    DEFAULT_MODEL_PATH,
+    DEFAULT_METADATA,
+    get_current=lambda: model_server,
+    swap=swap_model,
+    sample_features=_live_features,
+    watch_interval=MODEL_WATCH_SEC,
+    model_root=MODEL_ROOT
+)
+
+# -------------------------------------------------
+# WebSocket broadcast hub (bounded per-client queues)
+# -------------------------------------------------
+WS_QUEUE_SIZE = 4        # frames buffered per client
+WS_SEND_TIMEOUT = 2.0    # seconds per send
+WS_MAX_TIMEOUTS = 3      # consecutive timeouts before eviction
+
+manager = BroadcastHub(
+    queue_size=WS_QUEUE_SIZE,
+    send_timeout=WS_SEND_TIMEOUT,
+    max_timeouts=WS_MAX_TIMEOUTS
+)
+
+
+# -------------------------------------------------
+# On-demand sampling profiler (POST /admin/profile); idle otherwise
+# -------------------------------------------------
+profiler = SamplingProfiler()
+
+# -------------------------------------------------
+# Metrics read at scrape time (hot-path histograms live in
+# src/realtime/metrics.py)
+# -------------------------------------------------
+def _ws_frames():
+    return [
+        ((outcome,), manager.stats[f"frames_{outcome}"])
+        for outcome in ("sent", "dropped", "skipped")
+    ]
+
+
+def _errors():
+    errors = [
+        (("producer",), producer.errors),
+        (("ws_send",), manager.stats["send_errors"]),
+        (("reload",), reloader.failures),
+    ]
+    if worker_pool is not None:
+        errors.append((("workers",), worker_pool.errors))
+    if batcher is not None:
+        errors.append((("microbatch",), batcher.errors))
+    return errors
+
+
+def _buffer_sizes():
+    aggregator = producer.aggregator
+    if aggregator is None:
+        return None
+    return [((name,), n) for name, n in aggregator.buffered().items()]
+
+
+def _events_lost():
+    aggregator = producer.aggregator
+    if aggregator is None:
+        return None
+    return [((name,), n) for name, n in aggregator.lost().items()]
+
+
+def _camera_fps():
+    eye = producer.aggregator.eye if producer.aggregator is not None else None
+    if eye is None or eye.safe_mode:
+        return None
+    return eye.fps
+
+
+METRICS.callback("cognitivesense_windows", "Live windows produced", "counter",
+                 lambda: producer.windows)
+METRICS.callback("cognitivesense_ws_connections_opened", "WebSocket connections accepted",
+                 "counter", lambda: manager.stats["connections_total"])
+METRICS.callback("cognitivesense_ws_connections", "Open WebSocket connections", "gauge",
+                 lambda: len(manager.clients))
+METRICS.callback("cognitivesense_ws_frames", "WebSocket frames by outcome", "counter",
+                 _ws_frames, ["outcome"])
+METRICS.callback("cognitivesense_ws_evictions", "Slow WebSocket clients evicted",
+                 "counter", lambda: manager.stats["evictions"])
+METRICS.callback("cognitivesense_ws_queued_frames", "Frames waiting in client queues",
+                 "gauge", lambda: sum(c.queue.qsize() for c in manager.clients.values()))
+METRICS.callback("cognitivesense_errors", "Errors by component", "counter",
+                 _errors, ["component"])
+METRICS.callback("cognitivesense_event_buffer_size", "Sensor events waiting for the next flush",
+                 "gauge", _buffer_sizes, ["sensor"])
+METRICS.callback("cognitivesense_events_lost", "Sensor events lost to buffer overflow",
+                 "counter", _events_lost, ["sensor"])
+METRICS.callback("cognitivesense_camera_fps", "Camera frames read per second",
+                 "gauge", _camera_fps)
+
+
+@app.on_event("startup")
+async def start_producer():
+    # first prediction pays lazy-import / allocation costs: do it now
+    t0 = time.perf_counter()
+    await asyncio.to_thread(model_server.warmup)
+    print(f"🔥 Model loaded in {MODEL_LOAD_SEC:.2f}s, warmed up in {time.perf_counter() - t0:.2f}s")
+
+    if worker_pool is not None:
+        await asyncio.to_thread(worker_pool.start)
+    producer.subscribe(manager.broadcast)
+    producer.start()
+    if batcher is not None:
+        batcher.start()
+    reloader.start_watch()
+
+
+@app.on_event("shutdown")
+async def stop_producer():
+    await reloader.stop_watch()
+    await producer.stop()
+    if batcher is not None:
+        await batcher.stop()
+    if worker_pool is not None:
+        await asyncio.to_thread(worker_pool.stop)
 
 # =================================================
 # HTTP ENDPOINTS
@@ -101,77 +361,244 @@ async def predict(feat: dict):
     Manual prediction (testing / legacy)
     """
     try:
-        res = model_server.predict_from_feature_dict(feat)
+        if batcher is not None:
+            res = await batcher.submit(feat)
+        elif worker_pool is not None:
+            res = await asyncio.to_thread(worker_pool.predict_from_feature_dict, feat)
+        else:
+            res = model_server.predict_from_feature_dict(feat)
         return JSONResponse(content=res)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.post("/predict_batch")
+async def predict_batch(request: Request, stream: bool = False):
+    """
+    Vectorized prediction for many windows.
+
+    Body: [{feature: value, ...}, ...]  (array of feature dicts)
+      or  {feature: [values...], ...}   (columnar)
+
+    Returns {"count": n, "predictions": [{"pred", "proba"}, ...]} in
+    input order. With ?stream=true, returns NDJSON (one prediction per
+    line) scored in chunks of MAX_BATCH_SIZE, for inputs of any size;
+    input is validated up front (400), and a failure while scoring
+    ends the stream with an {"error": ..., "row": ...} line.
+    """
+    try:
+        rows = decode_json(await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+
+    if isinstance(rows, dict):
+        if not all(isinstance(v, list) for v in rows.values()):
+            raise HTTPException(status_code=400, detail="Columnar input must map columns to lists")
+        lengths = {len(v) for v in rows.values()}
+        if len(lengths) > 1:
+            raise HTTPException(status_code=400, detail="Columnar input: all columns must have the same length")
+        n_rows = lengths.pop() if lengths else 0
+    elif isinstance(rows, list):
+        n_rows = len(rows)
+    else:
+        raise HTTPException(status_code=400, detail="Body must be a list or a columnar object")
+
+    if stream:
+        # convert every row before the 200 goes out, so bad input gets
+        # a 400 like the non-streaming path
+        try:
+            X = await asyncio.to_thread(model_server.rows_to_matrix, rows)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return StreamingResponse(
+            _stream_batch(X),
+            media_type="application/x-ndjson"
+        )
+
+    if n_rows > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {n_rows} exceeds {MAX_BATCH_SIZE}; use ?stream=true"
+        )
+
+    try:
+        preds = await asyncio.to_thread(inference_backend().predict_batch, rows)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"count": len(preds), "predictions": preds}
+
+
+def _stream_batch(X):
+    """
+    Sync generator (starlette runs it in a worker thread):
+    score MAX_BATCH_SIZE rows of the validated matrix at a time, one
+    NDJSON line per row. The status is already sent, so a failure
+    while scoring ends the body with an {"error": ...} line.
+    """
+    for start in range(0, len(X), MAX_BATCH_SIZE):
+        try:
+            preds = inference_backend().predict_batch_matrix(X[start:start + MAX_BATCH_SIZE])
+        except Exception as e:
+            yield encode_json({"error": str(e), "row": start}) + "\n"
+            return
+        yield "".join(encode_json(p) + "\n" for p in preds)
+
+
 @app.post("/predict_live")
 async def predict_live():
     """
-    Fully automated real-time prediction
+    Latest real-time prediction from the shared producer
+    (returns immediately; 503 until the first window completes)
+    """
+    if producer.latest is None:
+        raise HTTPException(
+            status_code=503,
+            detail="No live prediction yet (first window in progress)"
+        )
+
+    return producer.latest
+
+
+@app.get("/stats")
+async def stats():
+    """
+    Producer, WebSocket fan-out, micro-batching, worker-pool, model and
+    prediction-cache counters
+    """
+    return {
+        "producer": {
+            "running": producer.running,
+            "windows": producer.windows,
+            "errors": producer.errors,
+        },
+        "ws": manager.snapshot_stats(),
+        "microbatch": batcher.snapshot_stats() if batcher is not None else None,
+        "workers": worker_pool.snapshot_stats() if worker_pool is not None else None,
+        "model": reloader.snapshot_stats(),
+        "cache": model_server.cache.snapshot_stats() if model_server.cache is not None else None,
+        "cascade": model_server.cascade.snapshot_stats() if model_server.cascade is not None else None,
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus scrape endpoint (text exposition format 0.0.4)
+    """
+    return PlainTextResponse(
+        METRICS.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.post("/admin/profile", dependencies=[Depends(require_admin)])
+async def admin_profile(seconds: float = 5.0, interval_ms: float = 5.0, lines: bool = False):
+    """
+    Sample every thread (event loop, producer, camera, pynput
+    listeners, ...) for `seconds` (max 60) every `interval_ms` and
+    return collapsed stacks ("thread;frame;...;frame count" per line),
+    e.g. for flamegraph.pl or speedscope. The sampler runs in its own
+    thread, so the server keeps serving; 409 if a profile is running.
     """
     try:
-        out = model_server.predict_live()
-
-        pred = out["pred"]
-        proba = out.get("proba")
-
-        record = {
-            "time": time.time(),
-            "label": pred
-        }
-        STATE_HISTORY.append(record)
-
-        return {
-            "label_id": pred,
-            "label_name": LABEL_MAP.get(pred, "Unknown"),
-            "confidence": max(proba) if proba else None,
-            "features": out["features"],
-            "proba": proba,
-            "history": list(STATE_HISTORY)
-        }
+        text, stats = await asyncio.to_thread(
+            profiler.profile, seconds, interval_ms / 1e3, lines
+        )
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return PlainTextResponse(text, headers={
+        "X-Profile-Samples": str(stats["samples"]),
+        "X-Profile-Ticks": str(stats["ticks"]),
+        "X-Profile-Overhead": f"{stats['overhead']:.4f}",
+    })
+
+
+@app.post("/admin/reload", dependencies=[Depends(require_admin)])
+async def admin_reload(body: dict = None):
+    """
+    Load, validate and hot-swap a model without restarting.
+
+    Body (optional): {"model_path": ..., "metadata_path": ...}, string
+    paths (400 otherwise) inside MODEL_ROOT only (403 otherwise);
+    defaults to reloading the current paths. 409 if the new model is rejected (the current one
+    stays in service).
+    """
+    body = body or {}
+    try:
+        return await reloader.reload(
+            model_path=body.get("model_path"),
+            metadata_path=body.get("metadata_path")
+        )
+    except TypeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
 # =================================================
 # WEBSOCKET – TRUE REAL-TIME STREAMING
 # =================================================
 
 @app.websocket("/ws/live")
-async def websocket_live(websocket: WebSocket):
+async def websocket_live(websocket: WebSocket, protocol: int = 1, encoding: str = "json"):
     """
     Client receives continuous real-time predictions
-    """
-    await manager.connect(websocket)
-
-    try:
-        while True:
-            out = model_server.predict_live()
-
-            pred = out["pred"]
-            proba = out.get("proba")
+    (pushed by the producer through manager.broadcast)
 
-            STATE_HISTORY.append({
-                "time": time.time(),
-                "label": pred
-            })
+    protocol=1 (default): full payload every window
+    protocol=2:           snapshot on connect, then deltas
+                          (client may send {"type": "resync"})
+    encoding=msgpack:     binary frames (protocol 2 only)
 
-            payload = {
-                "engine_state": "RUNNING",   # ✅ NEW (IMPORTANT)
-                "label_id": pred,
-                "label_name": LABEL_MAP.get(pred, "Unknown"),
-                "confidence": max(proba) if proba else None,
-                "features": out["features"],
-                "proba": proba,
-                "history": list(STATE_HISTORY)
-            }
+    Clients may send {"type": "subscribe", "fields": [...],
+    "max_rate": ..., "on_change": ...} to filter what they receive
+    (see src/realtime/protocol.py).
+    """
+    if protocol not in (1, PROTOCOL_VERSION) or encoding not in ENCODINGS:
+        await websocket.close(code=1003)
+        return
 
-            await manager.broadcast(payload)
+    await manager.connect(websocket, protocol=protocol, encoding=encoding)
 
-            await asyncio.sleep(3)  # sliding window
+    try:
+        manager.send_snapshot(websocket)
 
-    except WebSocketDisconnect:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            msg = message.get("text")
+            if msg is None:
+                # binary frames carry no control messages
+                continue
+            try:
+                msg = json.loads(msg)
+            except ValueError:
+                continue
+
+            if not isinstance(msg, dict):
+                continue
+
+            if msg.get("type") == "resync":
+                manager.send_snapshot(websocket)
+
+            elif msg.get("type") == "subscribe":
+                try:
+                    manager.subscribe(
+                        websocket,
+                        fields=msg.get("fields"),
+                        max_rate=msg.get("max_rate"),
+                        on_change=msg.get("on_change", False)
+                    )
+                except (TypeError, ValueError) as e:
+                    manager.send_to(websocket, {"type": "error", "detail": str(e)})
+
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: socket already closed by the hub (evicted)
+        pass
+    finally:
+        # any other error must not leave the client in manager.clients
         manager.disconnect(websocket)
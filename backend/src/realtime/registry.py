@@ -0,0 +1,218 @@
+"""Local versioned model registry.
+
+Compiled forests (src/realtime/forest.py) are published as immutable
+versions:
+
+    <root>/<name>/v<N>/
+        manifest.json   name, version, created_at, content_hash, columns,
+                        classes, training data / source model (path +
+                        sha256), and per array: file, dtype, shape, sha256
+        <array>.npy     one uncompressed .npy file per array
+
+Every array, including the traversal tables the predictor would
+otherwise derive at load time, is its own .npy file, so load_forest()
+can np.load(..., mmap_mode="r") them: pages come from the OS page
+cache, are read-only and are shared by every process that maps the
+same version (uvicorn workers, process-pool inference workers), and
+untouched pages are never read at all.
+
+content_hash covers the arrays, columns and classes; publishing the
+same content again returns the existing version instead of a new one.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from src.realtime.forest import CompiledForest
+
+MANIFEST = "manifest.json"
+
+# CompiledForest attribute -> file stem
+_ARRAYS = {
+    "feature": "feature",
+    "threshold": "threshold",
+    "left": "left",
+    "right": "right",
+    "value": "value",
+    "roots": "roots",
+    "classes": "classes",
+    "_feature": "traverse_feature",
+    "_next": "traverse_next",
+}
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _content_hash(arrays, columns, classes):
+    h = hashlib.sha256()
+    for name in sorted(arrays):
+        h.update(f"{name}:{arrays[name]['sha256']}\n".encode())
+    h.update(json.dumps({"columns": columns, "classes": classes}).encode())
+    return h.hexdigest()
+
+
+def _versions(model_dir):
+    if not os.path.isdir(model_dir):
+        return []
+    return sorted(
+        int(d[1:]) for d in os.listdir(model_dir)
+        if d.startswith("v") and d[1:].isdigit()
+    )
+
+
+def is_registry_path(path):
+    """
+    A version directory, or a model directory holding versions.
+    """
+    return os.path.isdir(path) and (
+        os.path.exists(os.path.join(path, MANIFEST)) or bool(_versions(path))
+    )
+
+
+def load_forest(path, mmap=True, verify=False):
+    """
+    Load a published forest. `path` is a version directory, or a model
+    directory (latest version). Returns (CompiledForest, manifest).
+    mmap=False reads private copies; verify=True re-hashes every file.
+    """
+    if not os.path.exists(os.path.join(path, MANIFEST)):
+        versions = _versions(path)
+        if not versions:
+            raise FileNotFoundError(f"No versions in {path}")
+        path = os.path.join(path, f"v{versions[-1]}")
+
+    with open(os.path.join(path, MANIFEST)) as f:
+        manifest = json.load(f)
+
+    arrays = {}
+    for attr, info in manifest["arrays"].items():
+        file_path = os.path.join(path, info["file"])
+        if verify and file_sha256(file_path) != info["sha256"]:
+            raise ValueError(f"Hash mismatch for {file_path}")
+        data = np.load(file_path, mmap_mode="r" if mmap else None, allow_pickle=False)
+        # plain ndarray view of the mapping (memmap subclass overhead
+        # on every fancy-index result otherwise)
+        arrays[attr] = np.asarray(data)
+
+    forest = CompiledForest(
+        feature=arrays["feature"],
+        threshold=arrays["threshold"],
+        left=arrays["left"],
+        right=arrays["right"],
+        value=arrays["value"],
+        roots=arrays["roots"],
+        max_depth=manifest["max_depth"],
+        classes=np.asarray(arrays["classes"]),
+        columns=manifest["columns"],
+        tables=(arrays["_feature"], arrays["_next"]),
+    )
+    return forest, manifest
+
+
+class ModelRegistry:
+    def __init__(self, root="models/registry"):
+        self.root = root
+
+    def versions(self, name):
+        return _versions(os.path.join(self.root, name))
+
+    def path(self, name, version=None):
+        if version is None:
+            versions = self.versions(name)
+            if not versions:
+                raise FileNotFoundError(f"No versions of '{name}' in {self.root}")
+            version = versions[-1]
+        return os.path.join(self.root, name, f"v{version}")
+
+    def manifest(self, name, version=None):
+        with open(os.path.join(self.path(name, version), MANIFEST)) as f:
+            return json.load(f)
+
+    def load(self, name, version=None, mmap=True, verify=False):
+        return load_forest(self.path(name, version), mmap=mmap, verify=verify)
+
+    def verify(self, name, version=None):
+        """
+        Re-hash every array file; raises ValueError on a mismatch.
+        """
+        self.load(name, version, verify=True)
+        return True
+
+    def publish(self, forest, name, training_data=None, source=None, extra=None):
+        """
+        Store a CompiledForest as the next version of `name`.
+        training_data / source: file paths recorded with their sha256.
+        Returns the manifest (of the existing version if the content is
+        already published).
+        """
+        model_dir = os.path.join(self.root, name)
+        os.makedirs(model_dir, exist_ok=True)
+
+        # write into a scratch dir, move into place when complete
+        tmp = tempfile.mkdtemp(prefix=".publish-", dir=model_dir)
+        try:
+            arrays = {}
+            for attr, stem in _ARRAYS.items():
+                data = np.ascontiguousarray(getattr(forest, attr))
+                file_name = f"{stem}.npy"
+                np.save(os.path.join(tmp, file_name), data, allow_pickle=False)
+                arrays[attr] = {
+                    "file": file_name,
+                    "dtype": str(data.dtype),
+                    "shape": list(data.shape),
+                    "sha256": file_sha256(os.path.join(tmp, file_name)),
+                }
+
+            columns = list(forest.columns)
+            classes = np.asarray(forest.classes).tolist()
+            content_hash = _content_hash(arrays, columns, classes)
+
+            for version in reversed(self.versions(name)):
+                existing = self.manifest(name, version)
+                if existing["content_hash"] == content_hash:
+                    return existing
+
+            version = (self.versions(name) or [0])[-1] + 1
+            manifest = {
+                "name": name,
+                "version": version,
+                "created_at": time.time(),
+                "content_hash": content_hash,
+                "kind": "forest",
+                "n_trees": forest.n_trees,
+                "max_depth": forest.max_depth,
+                "columns": columns,
+                "classes": classes,
+                "training_data": _file_info(training_data),
+                "source": _file_info(source),
+                "arrays": arrays,
+            }
+            if extra:
+                manifest.update(extra)
+            with open(os.path.join(tmp, MANIFEST), "w") as f:
+                json.dump(manifest, f, indent=2)
+
+            os.chmod(tmp, 0o755)
+            os.rename(tmp, os.path.join(model_dir, f"v{version}"))
+            return manifest
+        finally:
+            if os.path.exists(tmp):
+                shutil.rmtree(tmp)
+
+
+def _file_info(path):
+    if path is None:
+        return None
+    return {"path": path, "sha256": file_sha256(path)}
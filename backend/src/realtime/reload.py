@@ -0,0 +1,193 @@
+"""Zero-downtime model hot-reload.
+
+A new artifact is loaded into a fresh ModelServer in a worker thread,
+validated (feature columns, warm-up prediction) and only then swapped
+in with a single reference assignment. Requests and the live window in
+flight finish on the old model; the next ones use the new one. Nothing
+is restarted: sensors, WebSocket clients and the producer keep running.
+
+Triggered by POST /admin/reload or, optionally, by watching the model
+file's mtime. Model files are unpickled (joblib / torch / pickle), so a
+reload only loads the configured paths or, when asked for another one,
+a path inside `model_root`.
+"""
+
+import asyncio
+import os
+import time
+
+from src.realtime.infer import ModelServer
+
+
+class ModelReloader:
+    def __init__(self, model_path, metadata_path, get_current, swap,
+                 sample_features=None, watch_interval=0.0, model_root=None):
+        """
+        get_current:     () -> current ModelServer
+        swap:            (new ModelServer) -> None, installs the new model
+                         (runs in a worker thread; may block, e.g. to
+                         roll a process pool; raising aborts the reload)
+        sample_features: () -> feature dict for the warm-up prediction
+                         (e.g. the latest live window), or None
+        watch_interval:  seconds between model-file mtime checks (0 = off)
+        model_root:      directory other model / metadata paths must be
+                         inside (None: only the configured paths)
+        """
+        self.model_path = model_path
+        self.metadata_path = metadata_path
+        self.get_current = get_current
+        self.swap = swap
+        self.sample_features = sample_features
+        self.watch_interval = watch_interval
+        self.model_root = model_root
+
+        self.version = 1
+        self.loaded_at = time.time()
+        self.reloads = 0
+        self.failures = 0
+        self.last_error = None
+
+        self._lock = asyncio.Lock()
+        self._watch_task = None
+        self._mtime = self._file_mtime()
+
+    # --------------------------------------------------
+    # RELOAD
+    # --------------------------------------------------
+    async def reload(self, model_path=None, metadata_path=None):
+        """
+        Load, validate and swap in a model. Raises TypeError for a path
+        that is not a string, PermissionError for a path outside
+        `model_root`, ValueError (and keeps the current model) if the
+        new artifact is unusable.
+        """
+        for name, path in (("model_path", model_path), ("metadata_path", metadata_path)):
+            if path is not None and not isinstance(path, str):
+                raise TypeError(f"{name} must be a string, got {type(path).__name__}")
+        if model_path is not None and model_path != self.model_path:
+            self._check_path(model_path)
+        if metadata_path is not None and metadata_path != self.metadata_path:
+            self._check_path(metadata_path)
+        model_path = model_path or self.model_path
+        metadata_path = metadata_path if metadata_path is not None else self.metadata_path
+
+        async with self._lock:
+            try:
+                new = await asyncio.to_thread(self._load_and_validate, model_path, metadata_path)
+                await asyncio.to_thread(self.swap, new)
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                raise ValueError(f"Reload rejected: {e}") from e
+
+            self.model_path = model_path
+            self.metadata_path = metadata_path
+            self._mtime = self._file_mtime()
+            self.version += 1
+            self.loaded_at = time.time()
+            self.reloads += 1
+            self.last_error = None
+
+            return self.snapshot_stats()
+
+    def _check_path(self, path):
+        if self.model_root is None:
+            raise PermissionError("Reloading from another path is disabled")
+        root = os.path.realpath(self.model_root)
+        if os.path.commonpath([root, os.path.realpath(path)]) != root:
+            raise PermissionError(f"{path} is outside the model root {self.model_root}")
+
+    def _load_and_validate(self, model_path, metadata_path):
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Model file not found: {model_path}")
+
+        current = self.get_current()
+        new = ModelServer(
+            model_path=model_path,
+            metadata_path=metadata_path,
+            **current.options
+        )
+
+        # every column the new model needs must be produced live
+        sample = self.sample_features() if self.sample_features else None
+        known = set(current.input_columns)
+        if sample:
+            known |= set(sample)
+        missing = [c for c in new.input_columns if c not in known]
+        if missing:
+            raise ValueError(f"Model expects features that are not produced: {missing}")
+
+        # the serving model is not asked to predict: that would add to
+        # its cache and counters
+        if new._n_classes() != current._n_classes():
+            raise ValueError(
+                f"Class count changed: {current._n_classes()} -> {new._n_classes()}"
+            )
+
+        # a prediction on the sample, then the warm-up (which also pays
+        # the first-call cost off the hot path and resets the new
+        # model's cache and cascade counters)
+        feat = sample or {c: 0.0 for c in new.input_columns}
+        new.predict_from_feature_dict(feat)
+        new.warmup()
+
+        return new
+
+    # --------------------------------------------------
+    # FILE WATCH
+    # --------------------------------------------------
+    def _file_mtime(self):
+        try:
+            return os.stat(self.model_path).st_mtime
+        except OSError:
+            return None
+
+    def start_watch(self):
+        if self.watch_interval > 0 and self._watch_task is None:
+            self._watch_task = asyncio.get_running_loop().create_task(self._watch())
+
+    async def stop_watch(self):
+        if self._watch_task is None:
+            return
+        self._watch_task.cancel()
+        try:
+            await self._watch_task
+        except asyncio.CancelledError:
+            pass
+        self._watch_task = None
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.watch_interval)
+            mtime = self._file_mtime()
+            if mtime is None or mtime == self._mtime:
+                continue
+
+            # wait until the writer is done (mtime stable for one interval)
+            await asyncio.sleep(self.watch_interval)
+            if self._file_mtime() != mtime:
+                continue
+
+            try:
+                await self.reload()
+                print("🔁 Model reloaded:", self.model_path)
+            except ValueError as e:
+                self._mtime = mtime   # don't retry the same broken file
+                print("⚠️", e)
+
+    def snapshot_stats(self):
+        # registry models: which published version is being served
+        manifest = getattr(self.get_current(), "manifest", None)
+        return {
+            "model_path": self.model_path,
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "registry": {
+                "name": manifest["name"],
+                "version": manifest["version"],
+                "content_hash": manifest["content_hash"],
+            } if manifest else None,
+        }
@@ -0,0 +1,127 @@
+"""Fixed-capacity event ring for one producer and one consumer.
+
+The producer is an input hook thread (pynput listener), the consumer
+is whoever flushes the window (aggregator). Events are stored as a
+struct of arrays: one preallocated numpy column per field, e.g.
+t float64, x / y int32, key code int32, down int8.
+
+No lock is taken. `head` (next sequence number to write) is only
+written by the producer and `tail` (next to read) only by the
+consumer; a slot is filled before `head` moves past it, and the GIL
+makes those stores visible in order.
+
+Overflow policy when the consumer falls `capacity` events behind
+(e.g. nobody flushes because no client is connected):
+
+- "drop_oldest" (default): the producer overwrites the oldest slots;
+  drain() skips what was overwritten and counts it in `overwritten`.
+- "drop_newest": the producer refuses the event and counts it in
+  `dropped`.
+
+Either way push() is O(1) and memory never grows.
+"""
+
+import numpy as np
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest")
+
+
+class EventRing:
+    def __init__(self, fields, capacity=4096, overflow="drop_oldest"):
+        """
+        fields:   sequence of (name, dtype), in push() argument order
+        capacity: rounded up to a power of two
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow} (use one of {OVERFLOW_POLICIES})")
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+
+        self.capacity = 1 << (int(capacity) - 1).bit_length()
+        self.overflow = overflow
+        self._mask = self.capacity - 1
+        self._drop_newest = overflow == "drop_newest"
+
+        self.names = tuple(name for name, _ in fields)
+        self.columns = {name: np.zeros(self.capacity, dtype=dtype) for name, dtype in fields}
+        self._columns = tuple(self.columns.values())
+
+        self.head = 0          # producer only
+        self.tail = 0          # consumer only
+        self.dropped = 0       # producer only: refused (drop_newest)
+        self.overwritten = 0   # consumer only: lost to overwrite (drop_oldest)
+
+    # -------------------------------------------------
+    # Producer side
+    # -------------------------------------------------
+    def push(self, *values):
+        """
+        Append one event (one value per field). Returns False if it was
+        refused (drop_newest and full).
+        """
+        head = self.head
+        if self._drop_newest and head - self.tail >= self.capacity:
+            self.dropped += 1
+            return False
+        i = head & self._mask
+        for column, value in zip(self._columns, values):
+            column[i] = value
+        self.head = head + 1
+        return True
+
+    # -------------------------------------------------
+    # Consumer side
+    # -------------------------------------------------
+    def __len__(self):
+        """
+        Events waiting to be drained (at most `capacity`).
+        """
+        return min(self.head - self.tail, self.capacity)
+
+    def drain(self):
+        """
+        Copy out every pending event, oldest first, as a dict of
+        arrays (one per field), and mark them consumed.
+        """
+        head = self.head
+        start = max(self.tail, head - self.capacity)
+        i, j = start & self._mask, head & self._mask
+        if start == head:
+            out = {name: column[:0].copy() for name, column in self.columns.items()}
+        elif i < j:
+            out = {name: column[i:j].copy() for name, column in self.columns.items()}
+        else:
+            # wrapped around the end of the arrays
+            out = {name: np.concatenate((column[i:], column[:j]))
+                   for name, column in self.columns.items()}
+
+        if not self._drop_newest:
+            # writing sequence s overwrites s - capacity: anything below
+            # (current head + 1 - capacity) may have changed under the copy
+            lost = self.head + 1 - self.capacity - start
+            if lost > 0:
+                lost = min(lost, head - start)
+                out = {name: values[lost:] for name, values in out.items()}
+                start += lost
+
+        self.overwritten += start - self.tail
+        self.tail = head
+        return out
+
+    def stats(self):
+        return {
+            "capacity": self.capacity,
+            "overflow": self.overflow,
+            "pending": len(self),
+            "pushed": self.head,
+            "dropped": self.dropped,
+            "overwritten": self.overwritten,
+        }
+
+    @property
+    def lost(self):
+        """
+        Events lost to overflow under either policy, including slots
+        already overwritten but not yet skipped by a drain().
+        """
+        return self.dropped + self.overwritten + max(self.head - self.tail - self.capacity, 0)
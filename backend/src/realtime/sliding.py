@@ -0,0 +1,283 @@
+"""Sliding-window features, updated as events enter and leave.
+
+The aggregator's sliding mode (RealTimeAggregator(hop_sec=...)) emits
+a window of `window_sec` every `hop_sec`: at each hop it drains the
+collectors' new raw events into these engines (add), drops what is now
+older than the window (evict) and reads the features. Nothing is
+recomputed from the window's raw events:
+
+- counts, sums (path length, idle time) and Welford's mean / M2 (std)
+  are adjusted per event in and out
+- quartiles and max come from a sorted list kept with bisect
+  (O(log n) search, memmove of at most the window's samples)
+
+Each engine produces the same keys as the tumbling flush
+(window_features.mouse_features / keyboard_features, EyeTracker.flush).
+Samples derived from several events (speed, acceleration, jerk, idle
+gap, flight) carry the time of their earliest event, so a sample stays
+in the window exactly as long as all its events do: those features
+equal window_features' over the events inside the window. Dwell is the
+exception: it is timed at the release (samples must arrive in time
+order, and overlapping keys release out of press order), so like the
+tumbling collector a key pressed before the window and released inside
+it counts.
+"""
+
+import math
+from bisect import bisect_left, insort
+from collections import Counter, deque
+
+from src.realtime.window_features import IDLE_GAP_SEC, STAT_NAMES
+
+# recompute sum / mean / M2 from the window every this many evictions,
+# so float error from adding and removing does not build up, and
+# whenever an evicted value dwarfs what is left (removing it would
+# cancel most significant digits)
+RESUM_EVERY = 4096
+RESUM_OUTLIER = 16.0
+
+
+class SlidingStats:
+    """
+    mean, std, quartiles and max of (time, value) samples added in time
+    order and evicted from the front.
+    """
+
+    def __init__(self):
+        self._window = deque()   # (t, value), oldest first
+        self._sorted = []
+        self.sum = 0.0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._evictions = 0
+
+    def __len__(self):
+        return len(self._window)
+
+    def add(self, t, x):
+        self._window.append((t, x))
+        insort(self._sorted, x)
+        self.sum += x
+        delta = x - self.mean
+        self.mean += delta / len(self._sorted)
+        self._m2 += delta * (x - self.mean)
+
+    def evict(self, t_min):
+        window = self._window
+        largest = 0.0
+        while window and window[0][0] < t_min:
+            _, x = window.popleft()
+            largest = max(largest, abs(x))
+            del self._sorted[bisect_left(self._sorted, x)]
+            self.sum -= x
+            n = len(self._sorted)
+            if n:
+                delta = x - self.mean
+                self.mean -= delta / n
+                self._m2 -= delta * (x - self.mean)
+            self._evictions += 1
+
+        if not window:
+            self.sum = self.mean = self._m2 = 0.0
+            self._evictions = 0
+        elif (self._evictions >= RESUM_EVERY
+              or largest > RESUM_OUTLIER * max(-self._sorted[0], self._sorted[-1])):
+            self.sum = math.fsum(self._sorted)
+            self.mean = self.sum / len(self._sorted)
+            self._m2 = math.fsum((x - self.mean) ** 2 for x in self._sorted)
+            self._evictions = 0
+
+    @property
+    def max(self):
+        return self._sorted[-1] if self._sorted else 0.0
+
+    def summary(self, prefix):
+        """
+        Same keys and empty-window zeros as window_features.distribution().
+        """
+        n = len(self._sorted)
+        if n == 0:
+            return {f"{prefix}_{name}": 0.0 for name in STAT_NAMES}
+        q = self._sorted
+        out = {f"{prefix}_mean": self.mean, f"{prefix}_std": math.sqrt(max(self._m2 / n, 0.0))}
+        for name, p in (("q25", 0.25), ("median", 0.5), ("q75", 0.75)):
+            pos = (n - 1) * p
+            lo = int(pos)
+            hi = min(lo + 1, n - 1)
+            out[f"{prefix}_{name}"] = q[lo] + (q[hi] - q[lo]) * (pos - lo)
+        out[f"{prefix}_max"] = q[-1]
+        return out
+
+
+class _TimedCount:
+    """
+    Number of event times inside the window.
+    """
+
+    def __init__(self):
+        self._times = deque()
+
+    def __len__(self):
+        return len(self._times)
+
+    def add(self, t):
+        self._times.append(t)
+
+    def evict(self, t_min):
+        times = self._times
+        while times and times[0] < t_min:
+            times.popleft()
+
+
+# -------------------------------------------------
+# Mouse
+# -------------------------------------------------
+class SlidingMouse:
+    def __init__(self, idle_gap=IDLE_GAP_SEC):
+        self.idle_gap = idle_gap
+        self._moves = deque()      # (t, x, y) inside the window
+        self._clicks = _TimedCount()
+        self.dist = SlidingStats()
+        self.idle = SlidingStats()
+        self.speed = SlidingStats()
+        self.acc = SlidingStats()
+        self.jerk = SlidingStats()
+
+        # chain over consecutive moves (kept across evictions)
+        self._last = None          # (t, x, y)
+        self._v = None             # (start time, speed) of the last moving segment
+        self._a = None             # (start time, acc) of the last acceleration
+
+    def add_move(self, t, x, y):
+        self._moves.append((t, x, y))
+        last = self._last
+        self._last = (t, x, y)
+        if last is None:
+            return
+
+        lt, lx, ly = last
+        dt = t - lt
+        dist = math.hypot(x - lx, y - ly)
+        self.dist.add(lt, dist)
+        if dt >= self.idle_gap:
+            self.idle.add(lt, dt)
+        if dt <= 0:
+            return
+
+        v = dist / dt
+        self.speed.add(lt, v)
+        if self._v is not None:
+            vt, pv = self._v
+            a = (v - pv) / dt
+            self.acc.add(vt, a)
+            if self._a is not None:
+                at, pa = self._a
+                self.jerk.add(at, (a - pa) / dt)
+            self._a = (vt, a)
+        self._v = (lt, v)
+
+    def add_click(self, t):
+        self._clicks.add(t)
+
+    def evict(self, t_min):
+        moves = self._moves
+        while moves and moves[0][0] < t_min:
+            moves.popleft()
+        self._clicks.evict(t_min)
+        for stats in (self.dist, self.idle, self.speed, self.acc, self.jerk):
+            stats.evict(t_min)
+
+    def features(self):
+        moves = self._moves
+        path = self.dist.sum if len(moves) > 1 else 0.0
+        displacement = 0.0
+        if len(moves) > 1:
+            displacement = math.hypot(moves[-1][1] - moves[0][1], moves[-1][2] - moves[0][2])
+        speed = self.speed.summary("mouse_speed")
+        features = {
+            "mouse_speed_mean": speed["mouse_speed_mean"],
+            "mouse_clicks": len(self._clicks),
+            "mouse_move_count": len(moves),
+            "mouse_path_length": path,
+            "mouse_straightness": displacement / path if path > 0 else 0.0,
+            "mouse_idle_count": len(self.idle),
+            "mouse_idle_total": self.idle.sum,
+            "mouse_idle_max": self.idle.max,
+        }
+        features.update(speed)
+        features.update(self.acc.summary("mouse_acc"))
+        features.update(self.jerk.summary("mouse_jerk"))
+        return features
+
+
+# -------------------------------------------------
+# Keyboard
+# -------------------------------------------------
+class SlidingKeyboard:
+    def __init__(self):
+        self._presses = deque()    # (t, code) inside the window
+        self._codes = Counter()
+        self.dwell = SlidingStats()
+        self.flight = SlidingStats()
+
+        # pairing state (kept across evictions)
+        self.held = {}
+        self.last_release = None
+
+    def add(self, t, code, down):
+        if down:
+            self._presses.append((t, code))
+            self._codes[code] += 1
+            self.held[code] = t
+            if self.last_release is not None:
+                self.flight.add(self.last_release, t - self.last_release)
+        else:
+            pressed = self.held.pop(code, None)
+            if pressed is not None:
+                self.dwell.add(t, t - pressed)
+            self.last_release = t
+
+    def evict(self, t_min):
+        presses = self._presses
+        while presses and presses[0][0] < t_min:
+            _, code = presses.popleft()
+            self._codes[code] -= 1
+            if not self._codes[code]:
+                del self._codes[code]
+        self.dwell.evict(t_min)
+        self.flight.evict(t_min)
+
+    def features(self, window_sec):
+        features = {
+            "key_count": len(self._presses),
+            "unique_keys": len(self._codes),
+            "key_rate": len(self._presses) / window_sec,
+        }
+        features.update(self.dwell.summary("dwell"))
+        features.update(self.flight.summary("flight"))
+        return features
+
+
+# -------------------------------------------------
+# Eye
+# -------------------------------------------------
+class SlidingEye:
+    def __init__(self):
+        self.ear = SlidingStats()
+        self._blinks = _TimedCount()
+
+    def add(self, t, ear, blink):
+        self.ear.add(t, ear)
+        if blink:
+            self._blinks.add(t)
+
+    def evict(self, t_min):
+        self.ear.evict(t_min)
+        self._blinks.evict(t_min)
+
+    def features(self):
+        n = len(self.ear)
+        return {
+            "eye_aspect_mean": self.ear.sum / n if n else 0.0,
+            "eye_blink_rate": len(self._blinks),
+        }
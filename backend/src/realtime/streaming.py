@@ -0,0 +1,122 @@
+"""Streaming (stateful) SimpleLSTM inference.
+
+SimpleLSTM is trained on sequences of `seq_len` consecutive windows
+(src/data/process_sessions.py). Re-running the whole sequence for every
+new window costs seq_len LSTM steps; a stream costs one.
+
+mode="window" (default): same answer as model(last seq_len windows).
+    Keeps seq_len LSTM states staggered by one window, stepped together
+    as one batch. Each window, one slot is reset to start a new
+    sequence, and the slot that has now seen exactly the last seq_len
+    windows (or everything, during the first seq_len - 1 windows)
+    produces the output.
+
+mode="carry": a single (h, c) carried across all windows, i.e. the same
+    answer as model(every window since the stream started).
+
+Both keep a ring buffer of the last seq_len feature vectors
+(`window()`), used to rebuild the batch input for verification.
+
+The step itself is the LSTM cell written out with the model's weights
+(two addmm + gates per layer): for a single time step this is about
+2x faster than calling nn.LSTM, whose per-call overhead dominates.
+LSTMs without float weights (the scripted int8 export from
+src/models/export_lstm.py) are stepped through the module itself, with
+the slots as the batch and a sequence length of one. Dynamic int8
+quantizes activations per call over the whole batch, so there the
+stream only approximates model(last seq_len windows) (same label for
+~99% of windows on random inputs, vs. exact in fp32).
+"""
+
+from collections import deque
+
+import numpy as np
+import torch
+
+MODES = ("window", "carry")
+
+
+class LSTMStream:
+    def __init__(self, model, seq_len, mode="window", device="cpu"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown stream mode: {mode}")
+
+        self.model = model
+        self.seq_len = seq_len
+        self.mode = mode
+        self.device = device
+
+        lstm = model.lstm
+        if lstm.bidirectional or not lstm.batch_first:
+            raise ValueError("Streaming needs a unidirectional, batch_first LSTM")
+
+        self._slots = seq_len if mode == "window" else 1
+        self._shape = (lstm.num_layers, self._slots, lstm.hidden_size)
+
+        # per layer: (W_ih^T, W_hh^T, b_ih + b_hh); None = packed int8
+        # weights, step through the module
+        self._layers = None
+        self._lstm = getattr(lstm, "forward_tensor", lstm)
+        if hasattr(lstm, "weight_ih_l0"):
+            with torch.no_grad():
+                self._layers = [
+                    (
+                        getattr(lstm, f"weight_ih_l{k}").t().contiguous(),
+                        getattr(lstm, f"weight_hh_l{k}").t().contiguous(),
+                        getattr(lstm, f"bias_ih_l{k}") + getattr(lstm, f"bias_hh_l{k}"),
+                    )
+                    for k in range(lstm.num_layers)
+                ]
+
+        self.buffer = deque(maxlen=seq_len)
+        self.reset()
+
+    def reset(self):
+        self.h = torch.zeros(self._shape, device=self.device)
+        self.c = torch.zeros(self._shape, device=self.device)
+        self.t = 0
+        self.buffer.clear()
+
+    def window(self):
+        """
+        Last seq_len feature vectors, oldest first (seq, features).
+        """
+        return np.stack(self.buffer)
+
+    @torch.no_grad()
+    def step(self, x):
+        """
+        Feed one window's feature vector; returns class probabilities.
+        """
+        x = np.asarray(x, dtype=np.float32)
+        self.buffer.append(x)
+
+        if self.mode == "window":
+            # slot t % seq_len starts a new sequence at this window
+            start = self.t % self.seq_len
+            self.h[:, start].zero_()
+            self.c[:, start].zero_()
+            # the slot that started seq_len - 1 windows ago (slot 0
+            # until the first full sequence) now covers the window
+            out_slot = 0 if self.t < self.seq_len - 1 else (self.t + 1) % self.seq_len
+        else:
+            out_slot = 0
+
+        inp = torch.from_numpy(x).to(self.device).expand(self._slots, -1)
+        if self._layers is None:
+            out, (self.h, self.c) = self._lstm(inp[:, None, :], (self.h, self.c))
+            inp = out[:, 0]
+        else:
+            for k, (w_ih, w_hh, bias) in enumerate(self._layers):
+                gates = torch.addmm(bias, inp, w_ih).addmm_(self.h[k], w_hh)
+                i, f, g, o = gates.chunk(4, dim=1)
+                c = torch.sigmoid(f) * self.c[k] + torch.sigmoid(i) * torch.tanh(g)
+                h = torch.sigmoid(o) * torch.tanh(c)
+                self.c[k] = c
+                self.h[k] = h
+                inp = h
+
+        logits = self.model.fc(inp[out_slot:out_slot + 1])
+
+        self.t += 1
+        return torch.softmax(logits, dim=1)[0].cpu().numpy()
@@ -0,0 +1,68 @@
+"""Fixed-deadline window clock.
+
+Windows are due on a fixed grid of the monotonic clock: window k ends
+at start + k * period. wait() sleeps until the next deadline rather
+than for `period` after the caller's own work (flush, predict,
+broadcast), so that work does not push later windows back: lengths
+stay even and the schedule does not drift.
+
+A caller that comes back after its deadline returns at once. If it
+missed whole periods, those deadlines are skipped (counted, not
+replayed back to back) and the window is due at the latest deadline
+passed, so lateness is always below one period.
+
+Lateness and skips go to /metrics (cognitivesense_window_lateness_seconds,
+cognitivesense_windows_skipped_total).
+"""
+
+import time
+
+from src.realtime.metrics import WINDOW_LATENESS, WINDOWS_SKIPPED
+
+
+class WindowClock:
+    def __init__(self, period, clock=time.monotonic, sleep=time.sleep):
+        """
+        period: seconds between deadlines; the first is one period
+                from now
+        """
+        if period <= 0:
+            raise ValueError("period must be > 0")
+        self.period = period
+        self._clock = clock
+        self._sleep = sleep
+
+        self.deadline = clock() + period
+        self.windows = 0
+        self.skipped = 0
+        self.last_lateness = 0.0
+
+    def wait(self):
+        """
+        Block until the next deadline. Returns how late this call
+        returned after the deadline it serves (seconds).
+        """
+        now = self._clock()
+        while now < self.deadline:
+            self._sleep(self.deadline - now)
+            now = self._clock()
+
+        missed = int((now - self.deadline) // self.period)
+        if missed:
+            self.skipped += missed
+            WINDOWS_SKIPPED.inc(missed)
+        served = self.deadline + missed * self.period
+        self.deadline = served + self.period
+
+        self.windows += 1
+        self.last_lateness = now - served
+        WINDOW_LATENESS.observe(self.last_lateness)
+        return self.last_lateness
+
+    def stats(self):
+        return {
+            "period": self.period,
+            "windows": self.windows,
+            "skipped": self.skipped,
+            "last_lateness": self.last_lateness,
+        }
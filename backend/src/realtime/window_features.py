@@ -0,0 +1,171 @@
+"""Window features from drained event arrays, vectorized.
+
+The collectors drain their rings (src/realtime/ringbuffer.py) into
+numpy arrays; these functions turn one window of events into features
+in a fixed number of numpy passes, with no per-event Python code.
+
+Distribution features follow the offline extractor
+(src/data/feature_extractor.py safe_stats): <name>_{mean, std, q25,
+median, q75, max}, all 0.0 for an empty window.
+"""
+
+import numpy as np
+
+STAT_NAMES = ("mean", "std", "q25", "median", "q75", "max")
+
+# seconds without mouse movement counted as an idle gap
+IDLE_GAP_SEC = 0.5
+
+
+def distribution(prefix, values):
+    """
+    {prefix_mean, prefix_std, prefix_q25, prefix_median, prefix_q75,
+    prefix_max} of a 1-d array. Quartiles interpolate linearly like
+    np.percentile, from a single partition that also yields the max.
+    """
+    n = len(values)
+    if n == 0:
+        return {f"{prefix}_{name}": 0.0 for name in STAT_NAMES}
+    pos = np.array((0.25, 0.5, 0.75)) * (n - 1)
+    lo = pos.astype(np.intp)
+    hi = np.minimum(lo + 1, n - 1)
+    part = np.partition(values, np.unique(np.concatenate([lo, hi, [n - 1]])))
+    q25, q50, q75 = part[lo] + (part[hi] - part[lo]) * (pos - lo)
+    return {
+        f"{prefix}_mean": float(values.mean()),
+        f"{prefix}_std": float(values.std()),
+        f"{prefix}_q25": float(q25),
+        f"{prefix}_median": float(q50),
+        f"{prefix}_q75": float(q75),
+        f"{prefix}_max": float(part[n - 1]),
+    }
+
+
+# -------------------------------------------------
+# Mouse
+# -------------------------------------------------
+def mouse_features(t, x, y, n_clicks=0, idle_gap=IDLE_GAP_SEC):
+    """
+    t, x, y: move events of one window, oldest first.
+
+    Speed (px/s), acceleration (px/s^2) and jerk (px/s^3) are taken
+    over consecutive moves with a positive time step, like the offline
+    extractor. Straightness is start-to-end displacement over path
+    length (1.0 = straight line). Idle gaps are pauses of at least
+    `idle_gap` seconds between moves.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    t = np.asarray(t, dtype=np.float64)
+
+    dx = np.diff(x)
+    dy = np.diff(y)
+    dt = np.diff(t)
+    dist = np.sqrt(dx * dx + dy * dy)   # pixel deltas: no overflow, faster than hypot
+
+    moving = dt > 0
+    step_dt = dt[moving]
+    speed = dist[moving] / step_dt
+    acc = np.diff(speed) / step_dt[1:]
+    jerk = np.diff(acc) / step_dt[2:]
+
+    path = float(dist.sum())
+    displacement = float(np.hypot(x[-1] - x[0], y[-1] - y[0])) if len(x) > 1 else 0.0
+    gaps = dt[dt >= idle_gap]
+
+    features = {
+        "mouse_speed_mean": float(speed.mean()) if len(speed) else 0.0,
+        "mouse_clicks": int(n_clicks),
+        "mouse_move_count": int(len(t)),
+        "mouse_path_length": path,
+        "mouse_straightness": displacement / path if path > 0 else 0.0,
+        "mouse_idle_count": int(len(gaps)),
+        "mouse_idle_total": float(gaps.sum()),
+        "mouse_idle_max": float(gaps.max()) if len(gaps) else 0.0,
+    }
+    features.update(distribution("mouse_speed", speed))
+    features.update(distribution("mouse_acc", acc))
+    features.update(distribution("mouse_jerk", jerk))
+    return features
+
+
+# -------------------------------------------------
+# Keyboard
+# -------------------------------------------------
+def _group_order(code):
+    """
+    Stable argsort of key codes; radix sort when they span < 2**16
+    (virtual key codes usually do).
+    """
+    lo = int(code.min())
+    if int(code.max()) - lo < 1 << 16:
+        return np.argsort((code - lo).astype(np.uint16), kind="stable")
+    return np.argsort(code, kind="stable")
+
+
+def pair_keys(t, code, down, held=None):
+    """
+    Pair presses with releases. t, code, down: key events of one
+    window, oldest first. `held` ({code: press time}) carries keys
+    still down from the previous window.
+
+    A release pairs with the latest press of the same key since that
+    key's previous release (auto-repeat presses restart the dwell).
+    Flight time is press time minus the latest release of any key in
+    the same window (like the offline extractor): presses before the
+    window's first release have none, so an idle gap between windows
+    never becomes a flight sample.
+
+    Returns (dwell, flight, held) with the keys to carry into the next
+    window.
+    """
+    held = held or {}
+    t = np.asarray(t, dtype=np.float64)
+    code = np.asarray(code)
+    down = np.asarray(down).astype(bool)
+
+    # held keys first, as synthetic presses
+    n_carried = len(held)
+    if held:
+        carried = sorted(held.items(), key=lambda kv: kv[1])
+        t = np.concatenate([np.array([p for _, p in carried], dtype=np.float64), t])
+        code = np.concatenate([np.array([c for c, _ in carried], dtype=code.dtype), code])
+        down = np.concatenate([np.ones(n_carried, dtype=bool), down])
+
+    if len(t) == 0:
+        return np.empty(0), np.empty(0), {}
+
+    # dwell: within each key's events (stable sort keeps time order),
+    # a release directly preceded by a press
+    order = _group_order(code)
+    c, d, ts = code[order], down[order], t[order]
+    paired = (c[1:] == c[:-1]) & d[:-1] & ~d[1:]
+    dwell = ts[1:][paired] - ts[:-1][paired]
+
+    # flight: each press of this window minus the running max of
+    # release times (carried presses come before any release)
+    last_rel = np.maximum.accumulate(np.where(down, -np.inf, t))
+    has_release = down & np.isfinite(last_rel)
+    flight = t[has_release] - last_rel[has_release]
+
+    # keys still down: last event of a code group is a press
+    group_end = np.append(c[1:] != c[:-1], True)
+    still = group_end & d
+    held = dict(zip(c[still].tolist(), ts[still].tolist()))
+    return dwell, flight, held
+
+
+def keyboard_features(code, down, dwell, flight, window_sec=3.0):
+    """
+    Counts over the window's own presses, distributions of the dwell
+    and flight times from pair_keys().
+    """
+    presses = np.asarray(code)[np.asarray(down).astype(bool)]
+    features = {
+        "key_count": int(len(presses)),
+        "unique_keys": int(len(np.unique(presses))),
+        "key_rate": len(presses) / window_sec,
+    }
+    features.update(distribution("dwell", dwell))
+    features.update(distribution("flight", flight))
+    return features
@@ -0,0 +1,397 @@
+"""Process-pool inference backend.
+
+Runs N worker processes, each holding its own loaded ModelServer, so
+/predict traffic does not compete for the GIL with the pynput listener
+threads, the EyeTracker camera thread and the event loop.
+
+The parent turns feature dicts into a float64 matrix (model column
+order) and ships it to an idle worker over a multiprocessing Pipe
+(numpy arrays pickle as one raw buffer); the worker returns
+(pred, proba) arrays, plus the answering stage per row when the model
+has a cascade (counted into the parent's cascade stats). Dead or hung workers are restarted; a request
+that hit a crashed worker is retried at once on another worker while
+the replacement starts in the background.
+
+reload() swaps the pool onto a new model without refusing requests:
+the new workers are started and ready before the old ones are retired,
+and a busy old worker is only stopped once its request completes.
+"""
+
+import multiprocessing as mp
+import queue
+import threading
+import time
+
+
+def _worker_main(conn, model_path, metadata_path, options):
+    """
+    Worker process entry point.
+    Protocol: ("predict", X) -> ("ok", pred, proba, stage) | ("error", msg)
+              (stage: None without a cascade)
+              ("ping", None) -> ("pong", pid)
+              ("stop", None) -> exits
+    """
+    import os
+    import sys
+    from src.realtime.infer import ModelServer
+
+    try:
+        # parallelism comes from the pool: no joblib / torch fan-out
+        # across every core inside each worker
+        server = ModelServer(model_path=model_path, metadata_path=metadata_path,
+                             **dict(options, batch_n_jobs=1))
+        if "torch" in sys.modules:
+            sys.modules["torch"].set_num_threads(1)
+        server.warmup()
+    except Exception as e:
+        conn.send(("error", f"model load failed: {e}"))
+        return
+    conn.send(("ready", os.getpid()))
+
+    while True:
+        try:
+            op, payload = conn.recv()
+        except (EOFError, OSError):
+            return
+
+        if op == "stop":
+            return
+        if op == "ping":
+            conn.send(("pong", os.getpid()))
+            continue
+
+        try:
+            if server.cascade is not None:
+                pred, proba, stage = server.cascade.predict_matrix(payload)
+            else:
+                (pred, proba), stage = server.predict_matrix(payload), None
+            conn.send(("ok", pred, proba, stage))
+        except Exception as e:
+            conn.send(("error", str(e)))
+
+
+class _Worker:
+    def __init__(self, ctx, model_path, metadata_path, options, start_timeout):
+        self.conn, child_conn = ctx.Pipe(duplex=True)
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, model_path, metadata_path, options),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+        if not self.conn.poll(start_timeout):
+            self.kill()
+            raise RuntimeError("Inference worker did not start in time")
+        status, info = self.conn.recv()
+        if status != "ready":
+            self.kill()
+            raise RuntimeError(f"Inference worker failed: {info}")
+        self.pid = info
+
+    def alive(self):
+        return self.process.is_alive()
+
+    def kill(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+
+    def stop(self):
+        try:
+            self.conn.send(("stop", None))
+        except Exception:
+            pass
+        self.process.join(timeout=2)
+        self.kill()
+
+
+class ProcessPoolModelServer:
+    """
+    Same prediction interface as ModelServer (predict_from_feature_dict,
+    predict_batch, predict_batch_matrix, predict_matrix), backed by
+    worker processes.
+    `model_server` is the in-process ModelServer, used for column order.
+    """
+
+    def __init__(self, model_server, n_workers=2, request_timeout=10.0,
+                 start_timeout=120.0, health_interval=5.0):
+        self.model_server = model_server
+        self.model_path = model_server.model_path
+        self.metadata_path = model_server.metadata_path
+        self.n_workers = n_workers
+        self.request_timeout = request_timeout
+        self.start_timeout = start_timeout
+        self.health_interval = health_interval
+
+        self._ctx = mp.get_context("spawn")
+        self._idle = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        self._running = False
+        self._monitor = None
+        self._generation = 0     # bumped by reload()
+        self._spawning = 0       # background replacements in progress
+
+        self.requests = 0
+        self.errors = 0
+        self.restarts = 0
+
+    # --------------------------------------------------
+    # LIFECYCLE
+    # --------------------------------------------------
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        for _ in range(self.n_workers):
+            self._add_worker(self._spawn())
+
+        self._monitor = threading.Thread(target=self._monitor_loop, daemon=True)
+        self._monitor.start()
+
+    def stop(self):
+        self._running = False
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for w in workers:
+            w.stop()
+
+    def _spawn(self):
+        return _Worker(self._ctx, self.model_path, self.metadata_path,
+                       self.model_server.options, self.start_timeout)
+
+    def _add_worker(self, worker):
+        with self._lock:
+            self._workers.append(worker)
+        self._idle.put(worker)
+
+    def _replace(self, worker):
+        """
+        Kill a broken worker and start a fresh one in its place, in a
+        background thread (neither a request nor the health check
+        waits for the new interpreter, model load and warmup).
+        """
+        worker.kill()
+        with self._lock:
+            current = worker in self._workers
+            if current:
+                self._workers.remove(worker)
+        if not current:
+            return              # retired by reload(), nothing to replace
+        self.restarts += 1
+        if self._running:
+            self._spawn_background()
+
+    def _spawn_background(self):
+        with self._lock:
+            self._spawning += 1
+            generation = self._generation
+        threading.Thread(target=self._respawn, args=(generation,), daemon=True).start()
+
+    def _respawn(self, generation):
+        worker = None
+        try:
+            worker = self._spawn()
+        except Exception as e:
+            print("⚠️ Inference worker restart failed:", e)
+
+        with self._lock:
+            self._spawning -= 1
+            # not if the pool was stopped or reloaded meanwhile
+            keep = worker is not None and self._running and generation == self._generation
+            if keep:
+                self._workers.append(worker)
+        if keep:
+            self._idle.put(worker)
+        elif worker is not None:
+            worker.stop()
+
+    def _is_current(self, worker):
+        with self._lock:
+            return worker in self._workers
+
+    def _acquire(self, timeout):
+        """
+        Next idle worker of the current generation; retired ones that
+        surface are stopped on the way.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            worker = self._idle.get(timeout=max(deadline - time.monotonic(), 0))
+            if self._is_current(worker):
+                return worker
+            worker.stop()
+
+    def _release(self, worker):
+        if self._is_current(worker):
+            self._idle.put(worker)
+        else:
+            worker.stop()
+
+    def reload(self, model_server):
+        """
+        Rolling swap onto a new (already validated) ModelServer.
+        Raises and keeps the old workers if the new ones fail to start.
+        """
+        fresh = []
+        try:
+            for _ in range(self.n_workers):
+                fresh.append(_Worker(self._ctx, model_server.model_path,
+                                     model_server.metadata_path, model_server.options,
+                                     self.start_timeout))
+        except Exception:
+            for w in fresh:
+                w.kill()
+            raise
+
+        with self._lock:
+            self.model_server = model_server
+            self.model_path = model_server.model_path
+            self.metadata_path = model_server.metadata_path
+            self._workers = list(fresh)
+            self._generation += 1
+        for w in fresh:
+            self._idle.put(w)
+
+        # stop old workers that are idle right now; busy ones retire in _release
+        drained = []
+        while True:
+            try:
+                drained.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        for w in drained:
+            self._release(w)
+
+    # --------------------------------------------------
+    # HEALTH
+    # --------------------------------------------------
+    def health_check(self):
+        """
+        Ping every idle worker; restart dead / unresponsive ones and
+        top the pool back up if a background restart failed.
+        Returns the number of workers replaced.
+        """
+        replaced = 0
+        # one pass over the workers idle now (released ones go to the
+        # back of the queue); each is back in service right after its
+        # pong, and replacements start in the background
+        for _ in range(self._idle.qsize()):
+            try:
+                w = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if not self._is_current(w):
+                w.stop()
+                continue
+            ok = False
+            if w.alive():
+                try:
+                    w.conn.send(("ping", None))
+                    ok = w.conn.poll(self.request_timeout) and w.conn.recv()[0] == "pong"
+                except (EOFError, OSError):
+                    ok = False
+            if ok:
+                self._release(w)
+            else:
+                replaced += 1
+                self._replace(w)
+
+        with self._lock:
+            missing = self.n_workers - len(self._workers) - self._spawning
+        for _ in range(missing if self._running else 0):
+            self._spawn_background()
+            replaced += 1
+        return replaced
+
+    def _monitor_loop(self):
+        while self._running:
+            time.sleep(self.health_interval)
+            if not self._running:
+                return
+            try:
+                self.health_check()
+            except Exception as e:
+                print("⚠️ Inference worker health check failed:", e)
+
+    # --------------------------------------------------
+    # PREDICTION
+    # --------------------------------------------------
+    def predict_matrix(self, X):
+        pred, proba, _ = self._predict(X)
+        return pred, proba
+
+    def _predict(self, X, _retry=True):
+        """
+        (pred, proba, stage) for raw matrix X; stage is None without a
+        cascade.
+        """
+        self.requests += 1
+        try:
+            worker = self._acquire(self.request_timeout)
+        except queue.Empty:
+            self.errors += 1
+            raise TimeoutError("No inference worker available")
+
+        try:
+            worker.conn.send(("predict", X))
+            if not worker.conn.poll(self.request_timeout):
+                raise TimeoutError("Inference worker timed out")
+            reply = worker.conn.recv()
+        except (EOFError, OSError, TimeoutError) as e:
+            # crashed or hung: retry once elsewhere right away, the
+            # replacement starts in the background
+            self.errors += 1
+            self._replace(worker)
+            if _retry:
+                self.requests -= 1
+                return self._predict(X, _retry=False)
+            raise RuntimeError(f"Inference worker failed: {e}")
+
+        self._release(worker)
+
+        if reply[0] != "ok":
+            self.errors += 1
+            raise RuntimeError(reply[1])
+
+        _, pred, proba, stage = reply
+        if stage is not None and self.model_server.cascade is not None:
+            self.model_server.cascade.add_answered(stage)
+        return pred, proba, stage
+
+    def predict_batch(self, rows):
+        return self.predict_batch_matrix(self.model_server.rows_to_matrix(rows))
+
+    def predict_batch_matrix(self, X):
+        pred, proba, stage = self._predict(X)
+        if stage is not None:
+            return [
+                {"pred": int(p), "proba": pr, "stage": int(k)}
+                for p, pr, k in zip(pred, proba.tolist(), stage)
+            ]
+        return [
+            {"pred": int(p), "proba": pr}
+            for p, pr in zip(pred, proba.tolist())
+        ]
+
+    def predict_from_feature_dict(self, feat_dict):
+        return self.predict_batch([feat_dict])[0]
+
+    def snapshot_stats(self):
+        with self._lock:
+            workers = list(self._workers)
+        return {
+            "workers": len(workers),
+            "alive": sum(w.alive() for w in workers),
+            "idle": self._idle.qsize(),
+            "pids": [w.pid for w in workers],
+            "requests": self.requests,
+            "errors": self.errors,
+            "restarts": self.restarts,
+        }